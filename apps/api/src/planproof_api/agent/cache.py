@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Callable, NamedTuple
+
+from planproof_api.config import settings
+
+
+def _warn(message: str) -> None:
+    print(f"CACHE WARNING: {message}", file=sys.stderr)
+
+
+def cache_key(model: str, prompt_version: str, context: str) -> str:
+    """Content address for one extraction request."""
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, context):
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ.
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    memory_hits: int
+    disk_hits: int
+    entries: int
+
+
+class ExtractionCache:
+    """Two-tier cache of serialized extraction results.
+
+    The memory tier is an LRU bounded by ``max_entries``; the optional SQLite
+    tier at ``path`` runs in WAL mode so every worker process on the host can
+    share it. Entries expire ``ttl_seconds`` after they were stored, and a
+    disk hit is promoted into memory with its original expiry. SQLite errors
+    are reported and treated as misses. ``max_entries=0`` disables the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        path: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._path = path
+        self._clock = clock
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._memory_hits = 0
+        self._disk_hits = 0
+        if self.enabled and path:
+            self._init_disk()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=5.0)
+
+    def _init_disk(self) -> None:
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS extractions ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL)"
+                )
+                # Every write purges expired rows; keep that off a full scan.
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS extractions_expires_at "
+                    "ON extractions (expires_at)"
+                )
+        except sqlite3.Error as exc:
+            _warn(f"Disabling disk tier at {self._path}. ({exc})")
+            self._path = None
+
+    def _disk_get(self, key: str, now: float) -> tuple[float, str] | None:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT expires_at, value FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[0] <= now:
+            return None
+        return row[0], row[1]
+
+    def _disk_set(self, key: str, value: str, expires_at: float) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            conn.execute(
+                "DELETE FROM extractions WHERE expires_at <= ?", (self._clock(),)
+            )
+
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> str | None:
+        if not self.enabled:
+            return None
+        now = self._clock()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                self._memory_hits += 1
+                return entry[1]
+            del self._memory[key]
+
+        if self._path:
+            try:
+                entry = await asyncio.to_thread(self._disk_get, key, now)
+            except sqlite3.Error as exc:
+                _warn(f"Disk lookup failed. ({exc})")
+                entry = None
+            if entry is not None:
+                self._remember(key, *entry)
+                self._hits += 1
+                self._disk_hits += 1
+                return entry[1]
+
+        self._misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+        expires_at = self._clock() + self._ttl
+        self._remember(key, expires_at, value)
+        if self._path:
+            try:
+                await asyncio.to_thread(self._disk_set, key, value, expires_at)
+            except sqlite3.Error as exc:
+                _warn(f"Disk write failed. ({exc})")
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            memory_hits=self._memory_hits,
+            disk_hits=self._disk_hits,
+            entries=len(self._memory),
+        )
+
+    def clear(self) -> None:
+        """Drop the memory tier and reset counters; the disk tier is kept."""
+        self._memory.clear()
+        self._hits = self._misses = self._memory_hits = self._disk_hits = 0
+
+
+extraction_cache = ExtractionCache(
+    max_entries=settings.EXTRACTION_CACHE_SIZE,
+    ttl_seconds=settings.EXTRACTION_CACHE_TTL_S,
+    path=settings.EXTRACTION_CACHE_PATH,
+)
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import re
+from collections import Counter
 
-from openai import OpenAI
-
+from eval.constraints import compile_constraint
+from planproof_api.agent import llm
+from planproof_api.agent.cache import cache_key, extraction_cache
+from planproof_api.agent.pre_extractor import pre_extract, supplement_constraints
 from planproof_api.agent.schemas import ExtractedMetadata
+from planproof_api.config import settings
 from planproof_api.observability.opik import opik
 
-_SYSTEM_PROMPT = (
+EXTRACTION_PROMPT = (
     "SYSTEM: You are a stateless extractor. Analyze ONLY the text provided "
     "in the CURRENT request. Do not include entities or keywords from any "
     "previous context. If the text does not mention milk, DO NOT include "
@@ -33,6 +39,14 @@ _SYSTEM_PROMPT = (
     "Do not invent requirements."
 )
 
+_MODEL = "gpt-4o-mini"
+# Any prompt edit changes the version, so stale cached extractions are skipped.
+_PROMPT_VERSION = hashlib.sha256(EXTRACTION_PROMPT.encode("utf-8")).hexdigest()[:16]
+# Segment entries hold pre-filter results, so they get their own key space.
+_SEGMENT_PROMPT_VERSION = f"{_PROMPT_VERSION}:segment"
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
 _PROJECT_PREFIX = re.compile(r"^\s*project\s+", re.IGNORECASE)
 _PROJECT_SUFFIX = re.compile(r"\s+project\s*$", re.IGNORECASE)
 # Generic nouns that should not be treated as standalone entities.
@@ -89,20 +103,85 @@ def _normalize_entities(entities: list[str]) -> list[str]:
     return normalized
 
 
+def _extraction_mode(context: str) -> str:
+    # Each mode can merge or filter differently, so each gets its own cache
+    # key space; rule supplementation changes the result too.
+    if settings.EXTRACTION_INCREMENTAL:
+        mode = "incremental"
+    elif 0 < settings.EXTRACTION_CHUNK_CHARS < len(context):
+        mode = f"chunked:{settings.EXTRACTION_CHUNK_CHARS}"
+    else:
+        mode = "single"
+    return f"{mode}+rules" if settings.PRE_EXTRACTION else mode
+
+
 @opik.track(name="extraction_step")
-def extract_metadata(context: str) -> ExtractedMetadata:
-    client = OpenAI()
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+async def extract_metadata(context: str) -> ExtractedMetadata:
+    key = cache_key(
+        _MODEL, f"{_PROMPT_VERSION}:{_extraction_mode(context)}", context
+    )
+    cached = await extraction_cache.get(key)
+    if cached is not None:
+        return ExtractedMetadata.model_validate_json(cached)
+    # Identical contexts already being extracted share that call.
+    return await llm.coalesced(
+        f"extract:{key}", lambda: _extract_uncached(context, key)
+    )
+
+
+async def _extract_uncached(context: str, key: str) -> ExtractedMetadata:
+    rules = None
+    if settings.PRE_EXTRACTION:
+        rules = pre_extract(context, settings.PRE_EXTRACTION_MAX_CHARS)
+    if rules is not None and rules.confidence >= settings.PRE_EXTRACTION_MIN_CONFIDENCE:
+        # Rule results are cheap to recompute and must not outlive the flag.
+        return _normalized_rules(rules.metadata)
+    metadata = await _extract_with_llm(context)
+    if rules is not None:
+        metadata = supplement_constraints(metadata, rules.metadata)
+    await extraction_cache.set(key, metadata.model_dump_json())
+    return metadata
+
+
+def extract_with_rules(context: str) -> ExtractedMetadata:
+    """Rule-only extraction for when no LLM call can be made in time."""
+    return _normalized_rules(pre_extract(context, len(context)).metadata)
+
+
+def _normalized_rules(metadata: ExtractedMetadata) -> ExtractedMetadata:
+    return metadata.model_copy(
+        update={
+            "ground_truth_entities": _normalize_entities(
+                metadata.ground_truth_entities
+            )
+        }
+    )
+
+
+async def _extract_with_llm(context: str) -> ExtractedMetadata:
+    if settings.EXTRACTION_INCREMENTAL:
+        return await _extract_incremental(context)
+    if 0 < settings.EXTRACTION_CHUNK_CHARS < len(context):
+        return await _extract_chunked(context, settings.EXTRACTION_CHUNK_CHARS)
+    return _finalize_extraction(await _extract_raw(context))
+
+
+async def _extract_raw(context: str) -> dict[str, list[str]]:
+    response = await llm.create_completion(
+        "extraction",
+        model=_MODEL,
         messages=[
-            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "system", "content": EXTRACTION_PROMPT},
             {"role": "user", "content": f"Context:\n{context}"},
         ],
         response_format={"type": "json_object"},
         temperature=0,
     )
     content = response.choices[0].message.content or "{}"
-    raw = json.loads(content)
+    return _coerce_extraction(json.loads(content))
+
+
+def _coerce_extraction(raw: object) -> dict[str, list[str]]:
     data: dict[str, list[str]] = {
         "temporal_constraints": [],
         "ground_truth_entities": [],
@@ -118,7 +197,10 @@ def extract_metadata(context: str) -> ExtractedMetadata:
             data["ground_truth_entities"] = _normalize_entities(list(entities))
         if isinstance(keywords, list):
             data["actionable_tasks"] = list(keywords)
+    return data
+
 
+def _finalize_extraction(data: dict[str, list[str]]) -> ExtractedMetadata:
     if data["actionable_tasks"] and data["temporal_constraints"]:
         boundary_words = {"leave", "until", "by", "before"}
         constraints_text = " ".join(data["temporal_constraints"]).lower()
@@ -133,3 +215,149 @@ def extract_metadata(context: str) -> ExtractedMetadata:
         ]
 
     return ExtractedMetadata(**data)
+
+
+def metadata_from_payload(raw: object) -> ExtractedMetadata:
+    """Build metadata from an extraction-shaped JSON object.
+
+    Applies the same coercion, entity normalization and boundary-word
+    filter as ``extract_metadata``; used when another call (the fused
+    variant) returns the extraction.
+    """
+    return _finalize_extraction(_coerce_extraction(raw))
+
+
+def _split_segments(context: str) -> list[str]:
+    segments: list[str] = []
+    for line in context.splitlines():
+        for sentence in _SENTENCE_BREAK.split(line):
+            sentence = sentence.strip()
+            if sentence:
+                segments.append(sentence)
+    return segments
+
+
+def _split_chunks(context: str, max_chars: int) -> list[str]:
+    """Pack whole paragraphs into chunks of at most ``max_chars``.
+
+    A single paragraph longer than the limit becomes its own chunk.
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for paragraph in _PARAGRAPH_BREAK.split(context):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and size + len(paragraph) + 2 > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += len(paragraph) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _constraint_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _merge_constraints(
+    parts: list[dict[str, list[str]]], collapse_repeats: bool
+) -> list[str]:
+    """Concatenate constraints, optionally collapsing cross-part restatements.
+
+    With ``collapse_repeats`` a bare time ("1 PM") is always kept, since each
+    one stands for a separate task; a deadline or start gate repeated in
+    several parts is kept once; any other phrase is kept as many times as
+    the part that repeats it most.
+    """
+    merged: list[str] = []
+    kept: Counter[str] = Counter()
+    for part in parts:
+        seen: Counter[str] = Counter()
+        for text in part["temporal_constraints"]:
+            if not collapse_repeats:
+                merged.append(text)
+                continue
+            key = _constraint_key(text)
+            seen[key] += 1
+            compiled = compile_constraint(text)
+            if compiled.token is not None and key == _constraint_key(compiled.token):
+                merged.append(text)
+            elif compiled.category in ("deadline", "start_gate"):
+                if not kept[key]:
+                    merged.append(text)
+                    kept[key] = 1
+            elif seen[key] > kept[key]:
+                merged.append(text)
+                kept[key] += 1
+    return merged
+
+
+def _merge_extractions(
+    parts: list[dict[str, list[str]]], collapse_repeats: bool = False
+) -> dict[str, list[str]]:
+    """Combine per-segment or per-chunk extractions in order.
+
+    Constraints are concatenated because repeats are meaningful (one per
+    task at the same time), unless ``collapse_repeats`` asks
+    ``_merge_constraints`` to fold restatements. Tasks keep their first
+    occurrence and entities go back through ``_normalize_entities``.
+    """
+    keywords: list[str] = []
+    entities: list[str] = []
+    for part in parts:
+        keywords.extend(part["actionable_tasks"])
+        entities.extend(part["ground_truth_entities"])
+    return {
+        "temporal_constraints": _merge_constraints(parts, collapse_repeats),
+        "ground_truth_entities": _normalize_entities(entities),
+        "actionable_tasks": list(dict.fromkeys(keywords)),
+    }
+
+
+async def _extract_chunked(context: str, max_chars: int) -> ExtractedMetadata:
+    """Extract paragraph-aligned chunks of a long context concurrently.
+
+    The same deadline or phrase restated in several chunks is collapsed,
+    and the boundary-word task filter runs once on the merged result.
+    """
+    chunks = _split_chunks(context, max_chars)
+    if len(chunks) <= 1:
+        return _finalize_extraction(await _extract_raw(context))
+    parts = await asyncio.gather(*map(_extract_raw, chunks))
+    return _finalize_extraction(_merge_extractions(list(parts), collapse_repeats=True))
+
+
+async def _extract_incremental(context: str) -> ExtractedMetadata:
+    """Extract each line/sentence separately, reusing cached segments.
+
+    Only segments missing from the cache reach the LLM (concurrently), so
+    an edit to one line costs one small call. The boundary-word task filter
+    runs on the merged result, since it depends on every constraint.
+    """
+    segments = _split_segments(context)
+    if len(segments) <= 1:
+        return _finalize_extraction(await _extract_raw(context))
+
+    keys = [
+        cache_key(_MODEL, _SEGMENT_PROMPT_VERSION, segment) for segment in segments
+    ]
+    results: dict[str, dict[str, list[str]]] = {}
+    pending: dict[str, str] = {}
+    for key, segment, cached in zip(
+        keys, segments, await asyncio.gather(*map(extraction_cache.get, keys))
+    ):
+        if cached is not None:
+            results[key] = json.loads(cached)
+        else:
+            pending[key] = segment
+
+    fresh = await asyncio.gather(*map(_extract_raw, pending.values()))
+    for key, data in zip(pending, fresh):
+        results[key] = data
+        await extraction_cache.set(key, json.dumps(data))
+
+    return _finalize_extraction(_merge_extractions([results[key] for key in keys]))
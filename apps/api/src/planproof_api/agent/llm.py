@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import importlib.util
+import math
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Literal, TypeVar
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+from planproof_api.agent.rate_limiter import estimate_tokens, llm_scheduler
+from planproof_api.agent.singleflight import llm_flight
+from planproof_api.config import Settings, settings
+
+T = TypeVar("T")
+LLMStage = Literal["extraction", "generation", "repair"]
+
+
+# Monotonic deadline of the request being served, if it set a latency budget.
+_deadline: ContextVar[float | None] = ContextVar("llm_deadline", default=None)
+_MIN_TIMEOUT_S = 0.1
+
+
+def _warn(message: str) -> None:
+    print(f"LLM WARNING: {message}", file=sys.stderr)
+
+
+class LLMClientManager:
+    """Owns the process-wide AsyncOpenAI client and its connection pool.
+
+    The client is created on first use and reused by every agent call, so
+    keep-alive connections and TLS sessions survive across requests.
+    ``aclose`` releases the pool on shutdown.
+    """
+
+    def __init__(self, config: Settings = settings) -> None:
+        self._settings = config
+        self._client: AsyncOpenAI | None = None
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> AsyncOpenAI:
+        http2 = self._settings.LLM_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            _warn("LLM_HTTP2 is set but the 'h2' package is missing; using HTTP/1.1.")
+            http2 = False
+        http_client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=self._settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=self._settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=self._settings.LLM_KEEPALIVE_EXPIRY_S,
+            ),
+            timeout=httpx.Timeout(
+                self._settings.LLM_GENERATION_TIMEOUT_S,
+                connect=self._settings.LLM_CONNECT_TIMEOUT_S,
+            ),
+        )
+        # 429s are retried by llm_scheduler and dropped connections by
+        # create_completion, so the SDK must not retry behind their backs.
+        return AsyncOpenAI(
+            api_key=self._settings.OPENAI_API_KEY,
+            http_client=http_client,
+            max_retries=0,
+        )
+
+    @property
+    def connection_retries(self) -> int:
+        return self._settings.LLM_MAX_RETRIES
+
+    def timeout_for(self, stage: LLMStage) -> float:
+        if stage == "extraction":
+            return self._settings.LLM_EXTRACTION_TIMEOUT_S
+        if stage == "repair":
+            return self._settings.LLM_REPAIR_TIMEOUT_S
+        return self._settings.LLM_GENERATION_TIMEOUT_S
+
+    async def aclose(self) -> None:
+        if self._client is None:
+            return
+        client, self._client = self._client, None
+        await client.close()
+
+
+manager = LLMClientManager()
+
+
+@contextmanager
+def latency_budget(budget_ms: int | None) -> Iterator[None]:
+    """Bound every LLM call made inside the block by one shared deadline.
+
+    The deadline lives in a context variable, so tasks and worker threads
+    started inside the block inherit it. ``None`` leaves calls unbounded.
+    """
+    deadline = None if budget_ms is None else time.monotonic() + budget_ms / 1000
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> float | None:
+    """Seconds left in the current latency budget, or ``None`` if unbounded."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def budget_allows_call() -> bool:
+    """Whether the remaining budget still covers one more LLM round trip."""
+    remaining = remaining_budget()
+    return remaining is None or remaining >= settings.LLM_MIN_CALL_S
+
+
+async def coalesced(key: str, fn: Callable[[], Awaitable[T]]) -> T:
+    """Run ``fn`` through ``llm_flight``, joining only calls with a like budget.
+
+    The shared call runs under its first caller's deadline, so callers are
+    joined only when their deadlines fall in the same second, and each one
+    stops waiting once its own budget runs out.
+    """
+    deadline = _deadline.get()
+    if deadline is not None:
+        key = f"{key}@{math.floor(deadline)}"
+    return await llm_flight.do(key, fn, timeout=remaining_budget())
+
+
+def get_client() -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client; its SDK retries are off."""
+    return manager.client
+
+
+def stage_timeout(stage: LLMStage) -> float:
+    """Request timeout in seconds for one pipeline stage.
+
+    Never longer than what is left of the current latency budget.
+    """
+    timeout = manager.timeout_for(stage)
+    remaining = remaining_budget()
+    if remaining is None:
+        return timeout
+    return max(_MIN_TIMEOUT_S, min(timeout, remaining))
+
+
+async def create_completion(stage: LLMStage, **kwargs: Any) -> Any:
+    """Send one ``chat.completions.create`` call through ``llm_scheduler``.
+
+    Every agent call goes through here so rate limits, priorities and
+    upstream backoff are shared. The queue wait counts against the latency
+    budget, and the stage timeout is taken from what is left afterwards.
+    Dropped connections are retried up to ``LLM_MAX_RETRIES`` times, but
+    not under a latency budget, where each retry would restart the full
+    per-call timeout.
+    """
+    retries = 0 if _deadline.get() is not None else manager.connection_retries
+
+    async def send() -> Any:
+        attempt = 0
+        while True:
+            try:
+                return await get_client().chat.completions.create(
+                    timeout=stage_timeout(stage), **kwargs
+                )
+            except openai.APIConnectionError:
+                if attempt >= retries:
+                    raise
+                attempt += 1
+
+    return await llm_scheduler.call(
+        send,
+        stage=stage,
+        tokens=estimate_tokens(kwargs.get("messages", [])),
+        max_wait=remaining_budget,
+    )
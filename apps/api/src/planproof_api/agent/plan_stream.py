@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, tzinfo
+
+from eval.constraints import align_timezone, format_time, resolve_constraints
+from eval.timeline import parse_time
+from planproof_api.agent.schemas import ExtractedMetadata, PlanItem
+
+_WHITESPACE = " \t\r\n"
+
+
+class PlanItemStream:
+    """Incremental parser for the ``plan`` array of a streamed completion.
+
+    ``feed`` takes text chunks as they arrive and returns every object of
+    the top-level ``plan`` array that closed within them, already decoded.
+    Nothing else is parsed: the full text stays available in ``text`` for
+    the final ``json.loads``.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: list[str] = []
+        self._length = 0
+        self._text = ""
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_key: str | None = None
+        self._expect_plan = False
+        self._plan_depth: int | None = None
+        self._item_start: int | None = None
+
+    @property
+    def text(self) -> str:
+        if len(self._text) != self._length:
+            self._text = "".join(self._buffer)
+        return self._text
+
+    def feed(self, chunk: str) -> list[dict]:
+        offset = self._length
+        self._buffer.append(chunk)
+        self._length += len(chunk)
+        closed: list[dict] = []
+        for position, char in enumerate(chunk, start=offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_key = self.text[self._string_start + 1 : position]
+                continue
+            if char in _WHITESPACE:
+                continue
+            if char == ":":
+                self._expect_plan = len(self._stack) == 1 and self._last_key == "plan"
+                continue
+            expect_plan, self._expect_plan = self._expect_plan, False
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char in "{[":
+                if char == "[" and expect_plan and self._plan_depth is None:
+                    self._plan_depth = len(self._stack) + 1
+                elif char == "{" and len(self._stack) == self._plan_depth:
+                    self._item_start = position
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if (
+                    char == "}"
+                    and self._item_start is not None
+                    and len(self._stack) == self._plan_depth
+                ):
+                    raw = self.text[self._item_start : position + 1]
+                    self._item_start = None
+                    item = json.loads(raw)
+                    if isinstance(item, dict):
+                        closed.append(item)
+        return closed
+
+
+class EarlyPlanCheck:
+    """Hard-constraint checks that hold for a plan prefix.
+
+    ``add`` takes each item as soon as it streams in and returns the
+    violations no later item can undo: a start in the past, an overlap with
+    an earlier item, an end after the earliest deadline, or a start before
+    the latest "until" gate. Fixed points and recall need the full plan and
+    are left to ``_validate_plan``.
+    """
+
+    def __init__(
+        self,
+        metadata: ExtractedMetadata,
+        current_time: str,
+        local_tz: tzinfo | None = None,
+    ) -> None:
+        self._metadata = metadata
+        self._current_time = parse_time(current_time)
+        self._local_tz = local_tz
+        self._intervals: list[tuple[datetime, datetime, str]] = []
+        self._deadline: tuple[datetime, str] | None = None
+        self._gate: tuple[datetime, str] | None = None
+
+    def _resolve(self, reference: datetime) -> None:
+        current_dt = align_timezone(self._current_time, reference)
+        for entry in resolve_constraints(
+            self._metadata.compiled_constraints, current_dt, reference
+        ):
+            # Boundaries already behind "now" cannot be met by any plan.
+            if entry.at is None or entry.at <= current_dt:
+                continue
+            category = entry.constraint.category
+            if category == "deadline" and (
+                self._deadline is None or entry.at < self._deadline[0]
+            ):
+                self._deadline = (entry.at, entry.constraint.text)
+            elif category == "start_gate" and (
+                self._gate is None or entry.at > self._gate[0]
+            ):
+                self._gate = (entry.at, entry.constraint.text)
+
+    def add(self, item: PlanItem) -> list[str]:
+        start = parse_time(item.start_time, self._local_tz)
+        end = parse_time(item.end_time, self._local_tz)
+        if not self._intervals:
+            self._resolve(start)
+        reference = self._intervals[0][0] if self._intervals else start
+        start = align_timezone(start, reference)
+        end = align_timezone(end, reference)
+
+        errors: list[str] = []
+        if start < align_timezone(self._current_time, reference):
+            errors.append(f'Task "{item.task}" starts in the past.')
+        for other_start, other_end, other_task in self._intervals:
+            if start < other_end and other_start < end and end > start:
+                minutes = int(
+                    (min(end, other_end) - max(start, other_start)).total_seconds()
+                    // 60
+                )
+                if minutes == 0:
+                    # The validator does not fail sub-minute overlaps either.
+                    continue
+                errors.append(
+                    f'Tasks "{other_task}" and "{item.task}" '
+                    f"overlap by {minutes} minutes."
+                )
+        if self._deadline is not None and end > self._deadline[0]:
+            errors.append(
+                f"'{self._deadline[1]}' constraint not met "
+                f"(Task ends after {format_time(self._deadline[0])})."
+            )
+        if self._gate is not None and start < self._gate[0]:
+            errors.append(
+                f"'{self._gate[1]}' constraint not met "
+                f"(Task starts before {format_time(self._gate[0])})."
+            )
+        self._intervals.append((start, end, item.task))
+        return errors
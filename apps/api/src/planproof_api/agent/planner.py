@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import json
+from typing import Callable
 
-from openai import OpenAI
+import openai
 
+from planproof_api.agent import llm
+from planproof_api.agent.cache import cache_key
+from planproof_api.agent.extractor import EXTRACTION_PROMPT
+from planproof_api.agent.extractor import metadata_from_payload
+from planproof_api.agent.plan_stream import PlanItemStream
 from planproof_api.agent.schemas import ExtractedMetadata, PlanItem
 from planproof_api.observability.opik import opik
 
@@ -53,17 +60,165 @@ _SYSTEM_PROMPT = (
 )
 
 
+_FUSED_SYSTEM_PROMPT = (
+    "You extract and plan in a single response. Return ONLY valid JSON with "
+    "keys: metadata, plan, assumptions, questions. "
+    "First fill metadata (keys actionable_tasks, temporal_constraints, "
+    "ground_truth_entities) by following the EXTRACTION RULES. Then build "
+    "plan, assumptions and questions from that metadata by following the "
+    "PLANNING RULES. "
+    f"EXTRACTION RULES: {EXTRACTION_PROMPT} "
+    f"PLANNING RULES: {_SYSTEM_PROMPT}"
+)
+
+_STRING_ARRAY = {"type": "array", "items": {"type": "string"}}
+
+
+def _strict_object(properties: dict) -> dict:
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+_FUSED_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "fused_plan",
+        "strict": True,
+        "schema": _strict_object(
+            {
+                "metadata": _strict_object(
+                    {
+                        "actionable_tasks": _STRING_ARRAY,
+                        "temporal_constraints": _STRING_ARRAY,
+                        "ground_truth_entities": _STRING_ARRAY,
+                    }
+                ),
+                "plan": {
+                    "type": "array",
+                    "items": _strict_object(
+                        {
+                            "task": {"type": "string"},
+                            "start_time": {"type": "string"},
+                            "end_time": {"type": "string"},
+                            "timebox_minutes": {"type": "integer"},
+                            "why": {"type": "string"},
+                        }
+                    ),
+                },
+                "assumptions": _STRING_ARRAY,
+                "questions": _STRING_ARRAY,
+            }
+        ),
+    },
+}
+
+
 class PlanGenerationError(RuntimeError):
     pass
 
 
+# Raised by llm_scheduler when 429 retries run out or the queue wait outlasts
+# the latency budget; callers answer these with Retry-After or a fallback.
+_SCHEDULER_ERRORS = (openai.RateLimitError, asyncio.TimeoutError)
+
+
+class PlanAborted(PlanGenerationError):
+    """A streamed plan was cut off because an item broke a hard constraint.
+
+    ``plan`` holds the items received so far (including the offending one)
+    and ``errors`` the violations, ready to hand to the repair step.
+    """
+
+    def __init__(self, plan: list[PlanItem], errors: list[str]) -> None:
+        super().__init__("Plan generation aborted: " + " ".join(errors))
+        self.plan = plan
+        self.errors = errors
+
+
+def _local_time_note(current_time: str, timezone: str) -> str:
+    return (
+        f"The user is in {timezone}. "
+        f"Current local time is {current_time}. "
+        "All constraints like '1 PM' refer to this local time. "
+        "Do not confuse UTC with Local. "
+        "Do not schedule any tasks before this time. "
+        "Explicit times in the context are fixed points."
+    )
+
+
+def _parse_plan_payload(
+    data: object,
+) -> tuple[list[PlanItem], list[str], list[str]]:
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object.")
+    raw_plan = data.get("plan")
+    raw_assumptions = data.get("assumptions")
+    raw_questions = data.get("questions")
+
+    if not isinstance(raw_plan, list):
+        raise ValueError("Expected 'plan' to be a list.")
+    if not isinstance(raw_assumptions, list):
+        raise ValueError("Expected 'assumptions' to be a list.")
+    if not isinstance(raw_questions, list):
+        raise ValueError("Expected 'questions' to be a list.")
+
+    plan = [PlanItem(**item) for item in raw_plan]
+    assumptions = [str(item) for item in raw_assumptions]
+    questions = [str(item) for item in raw_questions]
+    return plan, assumptions, questions
+
+
+def _plan_messages(
+    context: str,
+    metadata: ExtractedMetadata,
+    current_time: str,
+    timezone: str,
+    repair_prompt: str | None,
+) -> list[dict[str, str]]:
+    user_content = (
+        "Context:\n"
+        f"{context}\n\n"
+        "Extracted metadata:\n"
+        f"{metadata.model_dump_json()}\n\n"
+        f"{_local_time_note(current_time, timezone)}"
+    )
+    if repair_prompt:
+        user_content = f"{user_content}\n\nRepair instructions:\n{repair_prompt}"
+    return [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": user_content,
+        },
+    ]
+
+
+async def _complete_plan(
+    messages: list[dict[str, str]], stage: llm.LLMStage, temperature: float
+) -> tuple[list[PlanItem], list[str], list[str]]:
+    response = await llm.create_completion(
+        stage,
+        model="gpt-4o-mini",
+        messages=messages,
+        response_format={"type": "json_object"},
+        temperature=temperature,
+    )
+    content = response.choices[0].message.content or "{}"
+    return _parse_plan_payload(json.loads(content))
+
+
 @opik.track(name="generate_plan")
-def generate_plan(
+async def generate_plan(
     context: str,
     metadata: ExtractedMetadata,
     current_time: str,
     timezone: str,
     repair_prompt: str | None = None,
+    temperature: float = 0,
 ) -> tuple[list[PlanItem], list[str], list[str]]:
     """Generate a plan from context and extracted metadata using the LLM.
 
@@ -74,56 +229,144 @@ def generate_plan(
         metadata: Extracted constraints, entities, and task keywords.
         current_time: ISO-8601 timestamp representing "now".
         timezone: IANA timezone string for the user.
+        repair_prompt: Repair instructions appended to the user message.
+        temperature: Sampling temperature; best-of-N candidates vary it.
 
     Returns:
         Tuple of (plan_items, assumptions, questions).
     """
+    messages = _plan_messages(context, metadata, current_time, timezone, repair_prompt)
+    stage: llm.LLMStage = "repair" if repair_prompt else "generation"
     try:
-        client = OpenAI()
-        user_content = (
-            "Context:\n"
-            f"{context}\n\n"
-            "Extracted metadata:\n"
-            f"{metadata.model_dump_json()}\n\n"
-            f"The user is in {timezone}. "
-            f"Current local time is {current_time}. "
-            "All constraints like '1 PM' refer to this local time. "
-            "Do not confuse UTC with Local. "
-            "Do not schedule any tasks before this time. "
-            "Explicit times in the context are fixed points."
-        )
-        if repair_prompt:
-            user_content = f"{user_content}\n\nRepair instructions:\n{repair_prompt}"
+        if temperature:
+            # Sampled candidates must stay independent, so only deterministic
+            # calls are coalesced.
+            plan, assumptions, questions = await _complete_plan(
+                messages, stage, temperature
+            )
+        else:
+            key = cache_key("gpt-4o-mini", stage, json.dumps(messages))
+            plan, assumptions, questions = await llm.coalesced(
+                f"plan:{key}", lambda: _complete_plan(messages, stage, temperature)
+            )
+        # Coalesced callers share one result; give each its own lists.
+        return list(plan), list(assumptions), list(questions)
+    except _SCHEDULER_ERRORS:
+        raise
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as exc:
+        raise PlanGenerationError(
+            "Plan generation failed due to invalid JSON output."
+        ) from exc
+    except Exception as exc:
+        raise PlanGenerationError("Plan generation failed due to API error.") from exc
+
+
+@opik.track(name="generate_plan_streaming")
+async def generate_plan_streaming(
+    context: str,
+    metadata: ExtractedMetadata,
+    current_time: str,
+    timezone: str,
+    check: Callable[[PlanItem], list[str]] | None = None,
+    temperature: float = 0,
+) -> tuple[list[PlanItem], list[str], list[str]]:
+    """Streaming counterpart of ``generate_plan``.
+
+    Plan items are parsed and validated as soon as each one closes in the
+    token stream. ``check`` is called with every item in order and returns
+    the hard violations it causes; the first non-empty result closes the
+    stream and raises ``PlanAborted`` so the caller can repair instead of
+    paying for the rest of the completion.
 
-        response = client.chat.completions.create(
+    Returns:
+        Tuple of (plan_items, assumptions, questions).
+    """
+    try:
+        stream = await llm.create_completion(
+            "generation",
             model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": _SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": user_content,
-                },
-            ],
+            messages=_plan_messages(context, metadata, current_time, timezone, None),
             response_format={"type": "json_object"},
-            temperature=0,
+            temperature=temperature,
+            stream=True,
+        )
+        parser = PlanItemStream()
+        partial: list[PlanItem] = []
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                for raw_item in parser.feed(chunk.choices[0].delta.content or ""):
+                    item = PlanItem(**raw_item)
+                    partial.append(item)
+                    errors = check(item) if check is not None else []
+                    if errors:
+                        raise PlanAborted(partial, errors)
+        finally:
+            await stream.close()
+        return _parse_plan_payload(json.loads(parser.text or "{}"))
+    except PlanAborted:
+        raise
+    except _SCHEDULER_ERRORS:
+        raise
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as exc:
+        raise PlanGenerationError(
+            "Plan generation failed due to invalid JSON output."
+        ) from exc
+    except Exception as exc:
+        raise PlanGenerationError("Plan generation failed due to API error.") from exc
+
+
+async def _complete_fused(
+    user_content: str,
+) -> tuple[ExtractedMetadata, list[PlanItem], list[str], list[str]]:
+    response = await llm.create_completion(
+        "generation",
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": _FUSED_SYSTEM_PROMPT},
+            {"role": "user", "content": user_content},
+        ],
+        response_format=_FUSED_RESPONSE_FORMAT,
+        temperature=0,
+    )
+    content = response.choices[0].message.content or "{}"
+    data = json.loads(content)
+    if not isinstance(data, dict) or not isinstance(data.get("metadata"), dict):
+        raise ValueError("Expected 'metadata' to be an object.")
+    metadata = metadata_from_payload(data["metadata"])
+    plan, assumptions, questions = _parse_plan_payload(data)
+    return metadata, plan, assumptions, questions
+
+
+@opik.track(name="generate_fused")
+async def generate_fused(
+    context: str,
+    current_time: str,
+    timezone: str,
+) -> tuple[ExtractedMetadata, list[PlanItem], list[str], list[str]]:
+    """Extract metadata and generate the plan in one structured-output call.
+
+    Used by the ``v4_fused`` variant. The returned metadata gets the same
+    normalization as ``extract_metadata`` so the deterministic validators
+    treat both paths alike.
+
+    Returns:
+        Tuple of (metadata, plan_items, assumptions, questions).
+    """
+    user_content = (
+        "Context:\n"
+        f"{context}\n\n"
+        f"{_local_time_note(current_time, timezone)}"
+    )
+    key = cache_key("gpt-4o-mini", "fused", user_content)
+    try:
+        metadata, plan, assumptions, questions = await llm.coalesced(
+            f"fused:{key}", lambda: _complete_fused(user_content)
         )
-        content = response.choices[0].message.content or "{}"
-        data = json.loads(content)
-        raw_plan = data.get("plan")
-        raw_assumptions = data.get("assumptions")
-        raw_questions = data.get("questions")
-
-        if not isinstance(raw_plan, list):
-            raise ValueError("Expected 'plan' to be a list.")
-        if not isinstance(raw_assumptions, list):
-            raise ValueError("Expected 'assumptions' to be a list.")
-        if not isinstance(raw_questions, list):
-            raise ValueError("Expected 'questions' to be a list.")
-
-        plan = [PlanItem(**item) for item in raw_plan]
-        assumptions = [str(item) for item in raw_assumptions]
-        questions = [str(item) for item in raw_questions]
-        return plan, assumptions, questions
+        return metadata, list(plan), list(assumptions), list(questions)
+    except _SCHEDULER_ERRORS:
+        raise
     except (json.JSONDecodeError, KeyError, TypeError, ValueError) as exc:
         raise PlanGenerationError(
             "Plan generation failed due to invalid JSON output."
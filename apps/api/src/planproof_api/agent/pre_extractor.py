@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+from eval.constraints import (
+    CLOCK_BASE,
+    TIME_PATTERN,
+    categorize_constraint,
+    compile_constraint,
+    parse_time_token,
+)
+from planproof_api.agent.schemas import ExtractedMetadata
+
+_TIME = f"(?:{TIME_PATTERN.pattern})"
+_BARE_HOUR = r"(?:[01]?\d|2[0-3])(?::[0-5]\d)?"
+# "from 4 to 6 PM" shares the trailing meridiem; "from 4 to 6" has none and
+# stays ambiguous.
+_WINDOW = re.compile(
+    rf"\bfrom\s+(?P<start>{_TIME}|{_BARE_HOUR})\s+(?:to|until|-)\s+(?P<end>{_TIME})",
+    re.IGNORECASE,
+)
+_ANCHORED = re.compile(
+    rf"\b(?P<keyword>no later than|by|before|until|at)\s+(?P<time>{_TIME})",
+    re.IGNORECASE,
+)
+_LEADING_FILLER = re.compile(
+    r"^(?:(?:i|we)(?:'m| am| are)?|i've|we've|(?:need|have|want|got) to|must|"
+    r"should|will|please|also|and|then|to)\s+",
+    re.IGNORECASE,
+)
+_DIGIT = re.compile(r"\d")
+_CAPITALIZED_RUN = re.compile(r"\b[A-Z][\w'&-]*(?:\s+[A-Z][\w'&-]*)*")
+
+# Clauses led by these words describe availability, not work to schedule.
+_BOUNDARY_WORDS = frozenset(
+    {"leave", "busy", "free", "out", "away", "home", "back", "unavailable", "off"}
+)
+_TASK_VERBS = frozenset(
+    {
+        "attend", "book", "buy", "call", "check", "clean", "cook", "do", "draft",
+        "email", "exercise", "file", "finish", "fix", "get", "go", "meet",
+        "pay", "pick", "plan", "prepare", "read", "renew", "review", "run",
+        "send", "ship", "start", "study", "submit", "take", "text", "update",
+        "visit", "walk", "wash", "work", "write",
+    }
+)
+# "and" only separates clauses when a new task verb follows it.
+_CLAUSE_BREAK = re.compile(
+    r"(?<=[.!?;])\s+|\n+|,\s*|\s+then\s+"
+    rf"|\s+and\s+(?=(?:{'|'.join(sorted(_TASK_VERBS))})\b)",
+    re.IGNORECASE,
+)
+# Words whose meaning the rules cannot resolve (conditions, relative days,
+# approximate times); any of them sends the context to the LLM.
+_HEDGE_WORDS = frozenset(
+    {
+        "if", "unless", "or", "maybe", "except", "around", "ish", "between",
+        "after", "tomorrow", "tonight", "next", "every", "later", "sometime",
+    }
+)
+_NOT_ENTITIES = frozenset(
+    {
+        "i", "am", "pm", "monday", "tuesday", "wednesday", "thursday", "friday",
+        "saturday", "sunday", "today",
+    }
+)
+# Capitalized only by position when they open a clause.
+_CLAUSE_LEADERS = _TASK_VERBS | _BOUNDARY_WORDS | {
+    "i'm", "we're", "need", "must", "please", "also", "then",
+}
+_MAX_TASK_WORDS = 6
+
+
+class PreExtraction(NamedTuple):
+    """Rule-based extraction plus how far it can be trusted.
+
+    ``confidence`` starts at 1.0 and is multiplied down for every feature the
+    rules handle poorly; ``reasons`` names each penalty for debugging.
+    """
+
+    metadata: ExtractedMetadata
+    confidence: float
+    reasons: list[str]
+
+
+def _clock_label(token: str) -> str | None:
+    parsed = parse_time_token(token, CLOCK_BASE)
+    if parsed is None:
+        return None
+    return parsed.strftime("%I:%M %p").lstrip("0").replace(":00", "")
+
+
+def _window_text(start: str, end: str) -> str | None:
+    end_label = _clock_label(end)
+    if end_label is None:
+        return None
+    start_label = _clock_label(start)
+    if start_label is None:
+        # Bare start hour: borrow the end's meridiem, or the other one when
+        # that would start the window after it ends ("from 11 to 1 PM").
+        meridiem = end_label[-2:]
+        start_label = _clock_label(f"{start} {meridiem}")
+        end_at = parse_time_token(end, CLOCK_BASE)
+        start_at = parse_time_token(f"{start} {meridiem}", CLOCK_BASE)
+        if start_at is not None and end_at is not None and start_at > end_at:
+            other = "AM" if meridiem == "PM" else "PM"
+            start_label = _clock_label(f"{start} {other}")
+    if start_label is None:
+        return None
+    return f"from {start_label} to {end_label}"
+
+
+def _strip_filler(text: str) -> str:
+    previous = None
+    while previous != text:
+        previous = text
+        text = _LEADING_FILLER.sub("", text).strip()
+    return text
+
+
+def _clean_remainder(text: str) -> str:
+    remainder = re.sub(r"\s+", " ", text).strip(" .,;:!?-")
+    return _strip_filler(remainder)
+
+
+def _entities(clause: str) -> list[str]:
+    found: list[str] = []
+    for match in _CAPITALIZED_RUN.finditer(clause):
+        words = match.group(0).split()
+        if match.start() == 0 and words[0].lower() in _CLAUSE_LEADERS:
+            words = words[1:]
+        words = [word for word in words if word.lower() not in _NOT_ENTITIES]
+        if words:
+            found.append(" ".join(words))
+    return found
+
+
+def pre_extract(context: str, max_chars: int = 280) -> PreExtraction:
+    """Extract tasks, constraints and entities with regex rules only.
+
+    Each clause (split on sentence ends, commas, "then" and "and" before a
+    task verb) yields at most one task and its anchored times: "from X to Y"
+    windows and "at/by/before/until/no later than" times. A clause led by an
+    availability word ("Leave by 5 PM", "Busy until 10 AM") is a pure
+    constraint. Capitalized runs outside clause-initial verbs become
+    entities.
+    """
+    constraints: list[str] = []
+    tasks: list[str] = []
+    entities: list[str] = []
+    reasons: list[str] = []
+    confidence = 1.0
+
+    def penalize(factor: float, reason: str) -> None:
+        nonlocal confidence
+        confidence *= factor
+        reasons.append(reason)
+
+    if len(context) > max_chars:
+        penalize(0.0, "context too long")
+    hedges = _HEDGE_WORDS.intersection(re.findall(r"[a-z]+", context.lower()))
+    if hedges:
+        penalize(0.3, f"ambiguous wording: {', '.join(sorted(hedges))}")
+
+    for clause in _CLAUSE_BREAK.split(context):
+        clause = clause.strip(" .;!?")
+        if not clause:
+            continue
+        entities.extend(_entities(clause))
+
+        phrases: list[str] = []
+        remainder = clause
+        window = _WINDOW.search(remainder)
+        if window:
+            text = _window_text(window.group("start"), window.group("end"))
+            if text is None:
+                penalize(0.3, f"unparseable window: {window.group(0)}")
+            else:
+                phrases.append(text)
+            remainder = remainder.replace(window.group(0), " ")
+        for match in list(_ANCHORED.finditer(remainder)):
+            label = _clock_label(match.group("time"))
+            if label is None:
+                penalize(0.3, f"unparseable time: {match.group(0)}")
+                continue
+            phrases.append(f"{match.group('keyword').lower()} {label}")
+            remainder = remainder.replace(match.group(0), " ")
+        for match in list(TIME_PATTERN.finditer(remainder)):
+            label = _clock_label(match.group(0))
+            if label is None:
+                penalize(0.3, f"unparseable time: {match.group(0)}")
+                continue
+            penalize(0.7, f"time without anchor word: {match.group(0)}")
+            phrases.append(label)
+            remainder = remainder.replace(match.group(0), " ")
+        if _DIGIT.search(remainder):
+            penalize(0.3, f"unrecognized number in: {clause}")
+
+        remainder = _clean_remainder(remainder)
+        first_word = remainder.split()[0].lower() if remainder else ""
+        if not remainder or first_word in _BOUNDARY_WORDS:
+            if phrases:
+                constraints.append(_strip_filler(clause))
+            continue
+
+        if first_word not in _TASK_VERBS:
+            penalize(0.6, f"task without a known verb: {remainder}")
+        if len(remainder.split()) > _MAX_TASK_WORDS:
+            penalize(0.7, f"long task phrase: {remainder}")
+        tasks.append(remainder)
+        for phrase in phrases:
+            # Keep the task in the text unless its words change the category
+            # (e.g. a task containing "by" would turn a fixed point into a
+            # deadline).
+            combined = f"{remainder} {phrase}"
+            same_kind = categorize_constraint(combined) == categorize_constraint(
+                phrase
+            )
+            constraints.append(combined if same_kind else phrase)
+
+    if not tasks:
+        penalize(0.5, "no tasks found")
+
+    metadata = ExtractedMetadata(
+        temporal_constraints=constraints,
+        actionable_tasks=list(dict.fromkeys(tasks)),
+        ground_truth_entities=list(dict.fromkeys(entities)),
+    )
+    return PreExtraction(metadata, round(confidence, 4), reasons)
+
+
+def supplement_constraints(
+    metadata: ExtractedMetadata, rules: ExtractedMetadata
+) -> ExtractedMetadata:
+    """Add rule-found constraints whose kind and time the LLM output lacks."""
+    covered = {
+        (compiled.category, compiled.at)
+        for compiled in map(compile_constraint, metadata.temporal_constraints)
+    }
+    missing = [
+        text
+        for text in rules.temporal_constraints
+        if (compiled := compile_constraint(text)).at is not None
+        and (compiled.category, compiled.at) not in covered
+    ]
+    if not missing:
+        return metadata
+    return metadata.model_copy(
+        update={"temporal_constraints": metadata.temporal_constraints + missing}
+    )
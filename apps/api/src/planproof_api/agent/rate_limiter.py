@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, Literal, NamedTuple, TypeVar
+
+import openai
+
+from planproof_api.config import settings
+
+T = TypeVar("T")
+Lane = Literal["interactive", "batch"]
+
+_lane: ContextVar[Lane] = ContextVar("llm_lane", default="interactive")
+_LANE_RANK = {"interactive": 0, "batch": 1}
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+_MAX_BACKOFF_S = 60.0
+# Rough completion size charged up front; corrected from usage afterwards.
+_COMPLETION_TOKENS = 800
+
+
+@contextmanager
+def lane(name: Lane) -> Iterator[None]:
+    """Mark LLM calls made inside the block as ``interactive`` or ``batch``."""
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def estimate_tokens(messages: list[dict[str, str]]) -> int:
+    """Prompt tokens at ~4 characters each plus a completion allowance."""
+    characters = sum(len(str(message.get("content", ""))) for message in messages)
+    return characters // 4 + _COMPLETION_TOKENS
+
+
+def _parse_duration(value: str | None) -> float | None:
+    # OpenAI reset headers look like "20ms", "1s" or "6m0s".
+    if not value:
+        return None
+    parts = list(_DURATION_PART.finditer(value))
+    if not parts or "".join(part.group(0) for part in parts) != value:
+        return None
+    return sum(float(part.group(1)) * _UNIT_SECONDS[part.group(2)] for part in parts)
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """How long the upstream asked us to wait, read from its 429 headers."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass  # HTTP-date form; fall through to the reset headers.
+    resets = [
+        _parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+        for kind in ("requests", "tokens")
+        if headers.get(f"x-ratelimit-remaining-{kind}") == "0"
+    ]
+    known = [reset for reset in resets if reset is not None]
+    return max(known) if known else None
+
+
+class TokenBucket:
+    """Budget that refills ``per_minute`` units a minute, up to a minute's worth.
+
+    ``per_minute <= 0`` means unlimited. ``adjust`` may push the level below
+    zero, so an underestimated call is paid back before the next one runs.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float]) -> None:
+        self._capacity = float(per_minute)
+        self._rate = self._capacity / 60
+        self._level = self._capacity
+        self._clock = clock
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self._capacity <= 0
+
+    @property
+    def rate(self) -> float:
+        """Units per second."""
+        return self._rate
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(
+            self._capacity, self._level + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self._capacity)
+        if self._level >= amount:
+            return 0.0
+        return (amount - self._level) / self._rate
+
+    def take(self, amount: float) -> None:
+        if self.unlimited:
+            return
+        self._refill()
+        self._level -= min(amount, self._capacity)
+
+    def adjust(self, delta: float) -> None:
+        if self.unlimited:
+            return
+        self._refill()
+        self._level = min(self._capacity, self._level - delta)
+
+
+class _Waiter(NamedTuple):
+    priority: tuple[int, int]
+    sequence: int
+    tokens: int
+    future: asyncio.Future[None]
+
+
+class SchedulerStats(NamedTuple):
+    admitted: int
+    rate_limited: int
+    queued: int
+    backoff_s: float
+
+
+class LLMScheduler:
+    """Admits LLM calls within requests/minute and tokens/minute budgets.
+
+    Waiting calls are served by priority: interactive before batch (see
+    ``lane``), then initial calls before repairs, then arrival order. A
+    429 from upstream pauses every call for as long as its headers ask
+    (exponential backoff when they say nothing) and the call is queued
+    again, up to ``max_rate_limit_retries`` times. ``admission_error``
+    lets routes turn requests away before they join an overlong queue.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_queue_depth: int,
+        max_rate_limit_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._requests = TokenBucket(requests_per_minute, clock)
+        self._tokens = TokenBucket(tokens_per_minute, clock)
+        self._max_queue_depth = max_queue_depth
+        self._max_retries = max_rate_limit_retries
+        self._clock = clock
+        self._heap: list[_Waiter] = []
+        self._sequence = itertools.count()
+        self._queued = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._backoff_until = 0.0
+        self._consecutive_limits = 0
+        self._admitted = 0
+        self._rate_limited = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def backoff_remaining(self) -> float:
+        return max(0.0, self._backoff_until - self._clock())
+
+    def admission_error(self) -> tuple[int, float] | None:
+        """``(status, retry_after_s)`` when a new request should be rejected.
+
+        429 while upstream has us backing off, 503 when the queue is merely
+        full; ``None`` admits the request.
+        """
+        if self._max_queue_depth <= 0 or self._queued < self._max_queue_depth:
+            return None
+        backoff = self.backoff_remaining()
+        if backoff > 0:
+            return 429, backoff
+        if self._requests.unlimited:
+            return 503, 1.0
+        return 503, max(1.0, self._queued / self._requests.rate)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _dispatch(self) -> None:
+        while self._heap:
+            waiter = self._heap[0]
+            if waiter.future.done():
+                heapq.heappop(self._heap)
+                continue
+            wait = max(
+                self.backoff_remaining(),
+                self._requests.wait_time(1),
+                self._tokens.wait_time(waiter.tokens),
+            )
+            if wait > 0:
+                self._schedule(wait)
+                return
+            heapq.heappop(self._heap)
+            self._requests.take(1)
+            self._tokens.take(waiter.tokens)
+            waiter.future.set_result(None)
+
+    async def _acquire(
+        self, priority: tuple[int, int], tokens: int, max_wait: float | None
+    ) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._heap, _Waiter(priority, next(self._sequence), tokens, future)
+        )
+        self._queued += 1
+        try:
+            self._dispatch()
+            await asyncio.wait_for(future, max_wait)
+        finally:
+            self._queued -= 1
+
+    def _back_off(self, delay: float | None) -> None:
+        self._consecutive_limits += 1
+        if delay is None:
+            delay = min(_MAX_BACKOFF_S, 2.0 ** (self._consecutive_limits - 1))
+        self._backoff_until = max(self._backoff_until, self._clock() + delay)
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        stage: str,
+        tokens: int,
+        max_wait: Callable[[], float | None] = lambda: None,
+    ) -> T:
+        """Run ``fn`` once admitted; ``max_wait`` bounds each queue wait.
+
+        Raises ``asyncio.TimeoutError`` if admission takes longer than
+        ``max_wait()`` seconds, and the last ``openai.RateLimitError`` once
+        retries run out.
+        """
+        priority = (_LANE_RANK[_lane.get()], 1 if stage == "repair" else 0)
+        attempts = 0
+        while True:
+            await self._acquire(priority, tokens, max_wait())
+            self._admitted += 1
+            try:
+                result = await fn()
+            except openai.RateLimitError as exc:
+                self._rate_limited += 1
+                self._back_off(retry_after_seconds(exc))
+                attempts += 1
+                if attempts > self._max_retries:
+                    raise
+                continue
+            self._consecutive_limits = 0
+            used = getattr(getattr(result, "usage", None), "total_tokens", None)
+            if isinstance(used, int):
+                self._tokens.adjust(used - tokens)
+            return result
+
+    def stats(self) -> SchedulerStats:
+        return SchedulerStats(
+            admitted=self._admitted,
+            rate_limited=self._rate_limited,
+            queued=self._queued,
+            backoff_s=self.backoff_remaining(),
+        )
+
+
+llm_scheduler = LLMScheduler(
+    requests_per_minute=settings.LLM_RPM_LIMIT,
+    tokens_per_minute=settings.LLM_TPM_LIMIT,
+    max_queue_depth=settings.LLM_MAX_QUEUE_DEPTH,
+    max_rate_limit_retries=settings.LLM_RATE_LIMIT_RETRIES,
+)
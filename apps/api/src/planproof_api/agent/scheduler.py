@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Mapping, NamedTuple
+
+from dateutil import tz
+
+from eval.constraints import ResolvedConstraint, resolve_constraints
+from eval.timeline import parse_time
+from planproof_api.agent.schemas import ExtractedMetadata, PlanItem
+from planproof_api.agent.solver import (
+    MAX_PIN_SHIFT_MINUTES,
+    MIN_TASK_MINUTES,
+    Gap,
+    Placement,
+    free_gaps,
+    span_minutes,
+    word_set,
+)
+
+DEFAULT_TASK_MINUTES = 30
+
+
+class _Task(NamedTuple):
+    index: int
+    name: str
+    minutes: int
+    priority: int
+    position: int | None
+
+
+class _Slot(NamedTuple):
+    task: _Task
+    start: datetime
+    end: datetime
+    why: str
+
+
+def _key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def _clock(value: datetime) -> str:
+    return value.strftime("%I:%M %p").lstrip("0")
+
+
+def _tasks(
+    metadata: ExtractedMetadata,
+    context: str,
+    durations: Mapping[str, int],
+    priorities: Mapping[str, int],
+) -> list[_Task]:
+    lowered = context.lower()
+    tasks: list[_Task] = []
+    for name in dict.fromkeys(task for task in metadata.actionable_tasks if task):
+        key = _key(name)
+        position = lowered.find(name.lower())
+        tasks.append(
+            _Task(
+                index=len(tasks),
+                name=name,
+                minutes=max(
+                    MIN_TASK_MINUTES, durations.get(key, DEFAULT_TASK_MINUTES)
+                ),
+                priority=priorities.get(key, 0),
+                position=position if position >= 0 else None,
+            )
+        )
+    return tasks
+
+
+def _claim(
+    entry: ResolvedConstraint, tasks: list[_Task], taken: set[int], context: str
+) -> _Task | None:
+    """Pick the task a fixed point or window belongs to.
+
+    Prefer tasks named in the constraint text, then the task mentioned
+    closest before the constraint's time in the context ("Call Bob at 2
+    PM"), then priority and order.
+    """
+    words = word_set(entry.constraint.text)
+    anchor = context.lower().find((entry.constraint.token or "").lower())
+    best: tuple[int, bool, float, int, int] | None = None
+    chosen: _Task | None = None
+    for task in tasks:
+        if task.index in taken:
+            continue
+        after, distance = True, float("inf")
+        if anchor >= 0 and task.position is not None:
+            after, distance = task.position > anchor, abs(anchor - task.position)
+        shared = len(words & word_set(task.name))
+        key = (-shared, after, distance, -task.priority, task.index)
+        if best is None or key < best:
+            best, chosen = key, task
+    return chosen
+
+
+def _pin_time(entry: ResolvedConstraint, lower: datetime) -> datetime | None:
+    """Start time a fixed point or window asks for, or ``None``.
+
+    Past fixed points (and those before the latest "until" gate, which the
+    checker skips) pin nothing; a window already under way pins at ``lower``.
+    """
+    kind = entry.constraint.kind
+    if kind == "fixed_point" and entry.at is not None and entry.at >= lower:
+        return entry.at
+    if kind == "window" and entry.window_start is not None:
+        if entry.window_end is not None and entry.window_end > lower:
+            return max(entry.window_start, lower)
+    return None
+
+
+def _place_first_fit(
+    task: _Task, gaps: list[Gap]
+) -> tuple[datetime, datetime] | None:
+    length = timedelta(minutes=task.minutes)
+    for position, gap in enumerate(gaps):
+        if gap.end is None or gap.start + length <= gap.end:
+            start, end = gap.start, gap.start + length
+            gaps[position] = Gap(end, gap.end)
+            return start, end
+    return None
+
+
+def schedule_plan(
+    context: str,
+    metadata: ExtractedMetadata,
+    current_time: str,
+    timezone: str,
+    durations: Mapping[str, int] | None = None,
+    priorities: Mapping[str, int] | None = None,
+) -> tuple[list[PlanItem], list[str], list[str]]:
+    """Generate a plan deterministically from extracted metadata.
+
+    The LLM-free counterpart of ``generate_plan``: fixed points and windows
+    pin the task they name (or the one mentioned nearest to them); every
+    other task, highest ``priorities`` first, takes the earliest free slot
+    between now or the latest "until" gate and the earliest deadline.
+    ``durations`` and ``priorities`` are keyed by task name
+    (case-insensitive); durations default to ``DEFAULT_TASK_MINUTES``.
+    Tasks that do not fit are left out and raised in the questions.
+
+    Returns:
+        Tuple of (plan_items, assumptions, questions).
+    """
+    durations = {_key(name): value for name, value in (durations or {}).items()}
+    priorities = {_key(name): value for name, value in (priorities or {}).items()}
+    tasks = _tasks(metadata, context, durations, priorities)
+
+    current_dt = parse_time(current_time, tz.gettz(timezone) if timezone else None)
+    resolved = resolve_constraints(
+        metadata.compiled_constraints, current_dt, current_dt
+    )
+    deadlines = [
+        entry
+        for entry in resolved
+        if entry.at is not None and entry.constraint.category == "deadline"
+    ]
+    gates = [
+        entry
+        for entry in resolved
+        if entry.at is not None and entry.constraint.category == "start_gate"
+    ]
+    deadline = min(deadlines, key=lambda entry: entry.at) if deadlines else None
+    gate = max(gates, key=lambda entry: entry.at) if gates else None
+    lower = max(current_dt, gate.at) if gate else current_dt
+    upper = deadline.at if deadline else None
+
+    questions: list[str] = []
+    slots: list[_Slot] = []
+    taken: set[int] = set()
+    pins = sorted(
+        (
+            (target, entry)
+            for entry in resolved
+            if (target := _pin_time(entry, lower)) is not None
+        ),
+        key=lambda pin: pin[0],
+    )
+    for target, entry in pins:
+        if upper is not None and target >= upper:
+            continue
+        task = _claim(entry, tasks, taken, context)
+        if task is None:
+            break
+        start = target
+        while True:
+            end = start + timedelta(minutes=task.minutes)
+            if upper is not None:
+                end = min(end, upper)
+            # Pins shifted past their own target can sit anywhere after it.
+            blocking = [
+                slot.end for slot in slots if slot.start < end and start < slot.end
+            ]
+            if not blocking:
+                break
+            start = max(blocking)
+        shift = span_minutes(start - target)
+        if shift > max(MAX_PIN_SHIFT_MINUTES, task.minutes) or (
+            span_minutes(end - start) < MIN_TASK_MINUTES
+        ):
+            questions.append(
+                f'"{entry.constraint.text}" could not be kept; '
+                "should another task move instead?"
+            )
+            continue
+        taken.add(task.index)
+        if entry.constraint.kind == "window":
+            why = f'Placed in the requested window ("{entry.constraint.text}").'
+        else:
+            why = (
+                f"Starts at {_clock(start)} as requested "
+                f'("{entry.constraint.text}").'
+            )
+        slots.append(_Slot(task, start, end, why))
+
+    pinned = [Placement(slot.task.index, slot.start, slot.end) for slot in slots]
+    gaps = free_gaps(pinned, lower, upper)
+    deadline_note = f' Ends before "{deadline.constraint.text}".' if deadline else ""
+    flexible = sorted(
+        (task for task in tasks if task.index not in taken),
+        key=lambda task: (-task.priority, task.index),
+    )
+    for task in flexible:
+        placed = _place_first_fit(task, gaps)
+        if placed is None:
+            questions.append(
+                f'"{task.name}" ({task.minutes} min) did not fit before '
+                f"{_clock(upper)}. Should it be shortened or moved to another day?"
+            )
+            continue
+        start, end = placed
+        why = f"Earliest free {task.minutes}-minute slot"
+        if task.priority:
+            why = f"{why} (priority {task.priority})"
+        slots.append(_Slot(task, start, end, f"{why}.{deadline_note}"))
+
+    slots.sort(key=lambda slot: (slot.start, slot.task.index))
+    plan = [
+        PlanItem(
+            task=slot.task.name,
+            start_time=slot.start.isoformat(),
+            end_time=slot.end.isoformat(),
+            timebox_minutes=int(round(span_minutes(slot.end - slot.start))),
+            why=slot.why,
+        )
+        for slot in slots
+    ]
+
+    start_note = f"Scheduling starts at {_clock(lower)}"
+    if gate and gate.at >= current_dt:
+        start_note = f'{start_note}, after "{gate.constraint.text}"'
+    assumptions = [f"{start_note}."]
+    defaulted = [task.name for task in tasks if _key(task.name) not in durations]
+    if defaulted:
+        assumptions.append(
+            f"Assumed {DEFAULT_TASK_MINUTES} minutes for: {', '.join(defaulted)}."
+        )
+    assumptions.append(
+        "Tasks without a fixed time are placed by priority, then in the order "
+        "they were mentioned."
+    )
+    return plan, assumptions, questions
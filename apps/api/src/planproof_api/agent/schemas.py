@@ -1,17 +1,19 @@
 from __future__ import annotations
 
-from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel, Field, StrictStr, field_validator
+from dateutil.parser import isoparse
+from pydantic import BaseModel, Field, PrivateAttr, StrictStr, field_validator
+
+from eval.constraints import TemporalConstraint, compile_constraints
 
 
 def _parse_iso8601(value: str) -> str:
     if not isinstance(value, str):
         raise TypeError("must be a string")
-    candidate = value.replace("Z", "+00:00") if value.endswith("Z") else value
+    # The pipeline parses with isoparse, so accept exactly what it accepts.
     try:
-        datetime.fromisoformat(candidate)
+        isoparse(value)
     except ValueError as exc:
         raise ValueError("must be ISO-8601 timestamp") from exc
     return value
@@ -21,13 +23,32 @@ class PlanRequest(BaseModel):
     context: StrictStr
     current_time: StrictStr
     timezone: StrictStr
-    variant: Literal["v1_naive", "v2_structured", "v3_agentic_repair"]
+    variant: Literal[
+        "v1_naive", "v2_structured", "v3_agentic_repair", "v4_fused", "v5_scheduled"
+    ]
+
+    # Only used by v5_scheduled; keyed by task name, case-insensitive.
+    task_durations: dict[StrictStr, int] | None = None
+    task_priorities: dict[StrictStr, int] | None = None
+    # Best-of-N: generate this many plans concurrently and keep the best.
+    candidates: int = Field(default=1, ge=1, le=8)
+    # End-to-end deadline; the X-Latency-Budget-Ms header takes precedence.
+    latency_budget_ms: int | None = Field(default=None, ge=1)
 
     @field_validator("current_time")
     @classmethod
     def validate_current_time(cls, value: str) -> str:
         return _parse_iso8601(value)
 
+    @field_validator("task_durations")
+    @classmethod
+    def validate_task_durations(
+        cls, value: dict[str, int] | None
+    ) -> dict[str, int] | None:
+        if value and any(minutes < 5 for minutes in value.values()):
+            raise ValueError("task durations must be at least 5 minutes")
+        return value
+
 
 class PlanItem(BaseModel):
     task: StrictStr
@@ -52,6 +73,22 @@ class ExtractedMetadata(BaseModel):
     ground_truth_entities: list[StrictStr]
     actionable_tasks: list[StrictStr]
 
+    _compiled: tuple[tuple[str, ...], list[TemporalConstraint]] | None = PrivateAttr(
+        default=None
+    )
+
+    @property
+    def compiled_constraints(self) -> list[TemporalConstraint]:
+        """``temporal_constraints`` compiled once and reused by every check.
+
+        Not part of the JSON schema. Recompiled only if the constraint
+        strings are replaced.
+        """
+        source = tuple(self.temporal_constraints)
+        if self._compiled is None or self._compiled[0] != source:
+            self._compiled = (source, compile_constraints(source))
+        return self._compiled[1]
+
 
 class ValidationMetrics(BaseModel):
     constraint_violation_count: int = Field(ge=0)
@@ -70,7 +107,27 @@ class PlanValidation(BaseModel):
 class DebugInfo(BaseModel):
     repair_attempted: bool
     repair_success: bool
-    variant: Literal["v1_naive", "v2_structured", "v3_agentic_repair"]
+    repair_mode: Literal["local", "llm"] | None = None
+    candidates_evaluated: int | None = None
+    generation_aborted: bool | None = None
+    latency_budget_ms: int | None = None
+    # Steps given up to stay within the latency budget.
+    degraded: (
+        list[
+            Literal[
+                "extraction_skipped",
+                "extraction_timeout",
+                "generation_timeout",
+                "scheduled_fallback",
+                "repair_skipped",
+                "repair_timeout",
+            ]
+        ]
+        | None
+    ) = None
+    variant: Literal[
+        "v1_naive", "v2_structured", "v3_agentic_repair", "v4_fused", "v5_scheduled"
+    ]
     trace_id: StrictStr | None = None
 
 
@@ -82,3 +139,55 @@ class PlanResponse(BaseModel):
     confidence: Literal["low", "medium", "high"]
     validation: PlanValidation
     debug: DebugInfo
+
+
+class LLMStats(BaseModel):
+    # Process-wide counters from rate_limiter.llm_scheduler.
+    scheduler: dict[str, float]
+    # Upstream calls made vs. joined onto an identical in-flight call.
+    coalescing: dict[str, int]
+    # Extraction cache hits (per tier), misses and in-memory entries.
+    extraction_cache: dict[str, int]
+
+
+class PlanBatchRequest(BaseModel):
+    requests: list[PlanRequest] = Field(min_length=1)
+    # Stream results as NDJSON in completion order instead of one response.
+    stream: bool = False
+
+
+class PlanBatchItem(BaseModel):
+    # Position in PlanBatchRequest.requests; exactly one of response/error is set.
+    index: int
+    response: PlanResponse | None = None
+    error: StrictStr | None = None
+
+
+class PlanBatchResponse(BaseModel):
+    results: list[PlanBatchItem]
+
+
+class ValidateRequest(BaseModel):
+    plan: list[PlanItem]
+    extracted_metadata: ExtractedMetadata
+    current_time: StrictStr
+    timezone: StrictStr
+
+    @field_validator("current_time")
+    @classmethod
+    def validate_current_time(cls, value: str) -> str:
+        return _parse_iso8601(value)
+
+
+class ValidateResponse(BaseModel):
+    # The submitted plan with timebox_minutes recomputed from its times.
+    plan: list[PlanItem]
+    confidence: Literal["low", "medium", "high"]
+    validation: PlanValidation
+
+
+class ValidateBulkItem(BaseModel):
+    # Line number (0-based) in the NDJSON request body.
+    index: int
+    result: ValidateResponse | None = None
+    error: StrictStr | None = None
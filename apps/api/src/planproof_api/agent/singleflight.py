@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+
+class FlightStats(NamedTuple):
+    calls: int
+    coalesced: int
+    in_flight: int
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task[Any]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one upstream call.
+
+    The first caller for a key starts ``fn()`` as a task; callers arriving
+    while it runs await the same task. A cancelled caller only stops
+    waiting: the call keeps running for the others and is cancelled once
+    no one is waiting. Results and exceptions reach every waiter, and the
+    key is forgotten as soon as the call finishes, so nothing is cached.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight] = {}
+        self._calls = 0
+        self._coalesced = 0
+
+    def _drop(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        self._drop(key, flight)
+        if not flight.task.cancelled():
+            # Mark the exception retrieved if every waiter was cancelled.
+            flight.task.exception()
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        timeout: float | None = None,
+    ) -> T:
+        """Await the call for ``key``, starting ``fn()`` if none is running.
+
+        ``timeout`` bounds this caller's wait only; on expiry it raises
+        ``asyncio.TimeoutError`` and leaves like a cancelled caller.
+        """
+        flight = self._flights.get(key)
+        if flight is not None and (
+            flight.task.done()
+            or flight.task.cancelled()
+            or flight.task.get_loop() is not asyncio.get_running_loop()
+        ):
+            flight = None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(
+                lambda _task, flight=flight: self._forget(key, flight)
+            )
+            self._calls += 1
+        else:
+            self._coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if flight.waiters == 1 and not flight.task.done():
+                # Forget it now so a caller arriving before the task winds
+                # down starts a fresh call instead of inheriting the cancel.
+                self._drop(key, flight)
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def stats(self) -> FlightStats:
+        return FlightStats(
+            calls=self._calls,
+            coalesced=self._coalesced,
+            in_flight=len(self._flights),
+        )
+
+    def clear(self) -> None:
+        """Reset counters; calls still in flight are left alone."""
+        self._calls = self._coalesced = 0
+
+
+llm_flight = SingleFlight()
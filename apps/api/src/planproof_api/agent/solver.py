@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, tzinfo
+from typing import NamedTuple
+
+from eval.constraints import ResolvedConstraint, align_timezone, resolve_constraints
+from eval.timeline import ParsedItem, parse_plan, parse_time
+from planproof_api.agent.schemas import ExtractedMetadata, PlanItem
+
+MIN_TASK_MINUTES = 5
+# Mirrors check_constraints: a fixed point is still met by an item pushed back
+# by up to max(30 minutes, its own duration) when nothing overlaps.
+MAX_PIN_SHIFT_MINUTES = 30
+_SHRINK_STEP = 0.9
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class Placement(NamedTuple):
+    index: int
+    start: datetime
+    end: datetime
+
+
+class Gap(NamedTuple):
+    start: datetime
+    end: datetime | None
+
+
+def word_set(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def span_minutes(delta: timedelta) -> float:
+    return delta.total_seconds() / 60
+
+
+def _pin_targets(
+    resolved: list[ResolvedConstraint],
+    lower: datetime,
+    upper: datetime | None,
+    latest_gate: datetime | None,
+) -> list[tuple[datetime, ResolvedConstraint]]:
+    """Times an item must start at, in the order they should be claimed.
+
+    Fixed points before the latest start gate or after the earliest deadline
+    are skipped because ``check_constraints`` skips them too; past ones are
+    left for the checker to report. A window pins an item at its (clamped)
+    start unless a fixed point already lands in it.
+    """
+    fixed: list[tuple[datetime, ResolvedConstraint]] = []
+    for entry in resolved:
+        if entry.constraint.kind != "fixed_point" or entry.at is None:
+            continue
+        if latest_gate is not None and entry.at < latest_gate:
+            continue
+        # Past or post-deadline times cannot be met by moving items.
+        if entry.at < lower or (upper is not None and entry.at > upper):
+            continue
+        fixed.append((entry.at, entry))
+
+    windows: list[tuple[datetime, ResolvedConstraint]] = []
+    for entry in resolved:
+        if entry.constraint.kind != "window":
+            continue
+        if entry.window_start is None or entry.window_end is None:
+            continue
+        start = max(entry.window_start, lower)
+        end = entry.window_end if upper is None else min(entry.window_end, upper)
+        if start > end or any(start <= at <= end for at, _ in fixed):
+            continue
+        windows.append((start, entry))
+
+    return sorted(fixed, key=lambda pin: pin[0]) + sorted(
+        windows, key=lambda pin: pin[0]
+    )
+
+
+def _claim_item(
+    target: datetime,
+    constraint_text: str,
+    entries: list[ParsedItem],
+    starts: list[datetime],
+    claimed: set[int],
+) -> int | None:
+    # Prefer the task named by the constraint, then the one planned nearest.
+    constraint_words = word_set(constraint_text)
+    best: tuple[int, float, int] | None = None
+    for entry in entries:
+        if entry.index in claimed:
+            continue
+        shared = len(constraint_words & word_set(entry.item.task))
+        distance = abs(span_minutes(starts[entry.index] - target))
+        key = (-shared, distance, entry.index)
+        if best is None or key < best:
+            best = key
+    return None if best is None else best[2]
+
+
+def free_gaps(
+    pins: list[Placement], lower: datetime, upper: datetime | None
+) -> list[Gap]:
+    gaps: list[Gap] = []
+    cursor = lower
+    for pin in sorted(pins, key=lambda placement: placement.start):
+        if pin.start > cursor:
+            gaps.append(Gap(cursor, pin.start))
+        cursor = max(cursor, pin.end)
+    if upper is None or cursor < upper:
+        gaps.append(Gap(cursor, upper))
+    return gaps
+
+
+def _place_in_order(
+    order: list[int],
+    durations: dict[int, float],
+    preferred: dict[int, datetime] | None,
+    gaps: list[Gap],
+) -> list[Placement] | None:
+    """Place items in ``order`` into ``gaps`` without reordering them.
+
+    Each item goes at the earliest free time after the previous one (and
+    after its ``preferred`` start, if given). ``None`` if one does not fit.
+    """
+    placements: list[Placement] = []
+    cursor = gaps[0].start if gaps else None
+    for index in order:
+        if cursor is None:
+            return None
+        length = timedelta(minutes=durations[index])
+        earliest = cursor
+        if preferred is not None and preferred[index] > earliest:
+            earliest = preferred[index]
+        for gap in gaps:
+            start = max(gap.start, earliest)
+            if gap.end is None or start + length <= gap.end:
+                placements.append(Placement(index, start, start + length))
+                cursor = start + length
+                break
+        else:
+            return None
+    return placements
+
+
+def _schedule_flexible(
+    order: list[int],
+    durations: dict[int, float],
+    preferred: dict[int, datetime],
+    gaps: list[Gap],
+) -> list[Placement] | None:
+    # 1) keep planned starts where possible, 2) pack items back to back,
+    # 3) shrink durations toward 5 minutes until everything fits.
+    placed = _place_in_order(order, durations, preferred, gaps)
+    if placed is not None:
+        return placed
+    placed = _place_in_order(order, durations, None, gaps)
+    if placed is not None or not order or any(gap.end is None for gap in gaps):
+        return placed
+
+    available = sum(span_minutes(gap.end - gap.start) for gap in gaps)
+    factor = available / sum(durations[index] for index in order)
+    while True:
+        shrunk = {
+            index: max(MIN_TASK_MINUTES, float(int(durations[index] * factor)))
+            for index in order
+        }
+        placed = _place_in_order(order, shrunk, None, gaps)
+        if placed is not None:
+            return placed
+        if all(shrunk[index] <= MIN_TASK_MINUTES for index in order):
+            return None
+        factor *= _SHRINK_STEP
+
+
+def solve_locally(
+    plan: list[PlanItem],
+    metadata: ExtractedMetadata,
+    current_time: str,
+    local_tz: tzinfo | None = None,
+) -> list[PlanItem] | None:
+    """Mechanically repair a failed plan without calling the LLM.
+
+    Every task is kept. Items claimed by fixed points (and windows without
+    one) start at their constraint time; the rest keep their relative
+    order and move into the free time between the latest "until" gate (or
+    now) and the earliest deadline, shortened if needed but never below 5
+    minutes. Returns ``None`` when no such schedule exists; the caller
+    still re-validates the result.
+    """
+    if not plan:
+        return None
+    timeline = parse_plan(plan, local_tz)
+    reference = timeline[0].start
+    current_dt = align_timezone(parse_time(current_time), reference)
+    resolved = resolve_constraints(metadata.compiled_constraints, current_dt, reference)
+    starts = [align_timezone(entry.start, reference) for entry in timeline]
+    ends = [align_timezone(entry.end, reference) for entry in timeline]
+
+    deadlines = [
+        entry.at
+        for entry in resolved
+        if entry.at is not None and entry.constraint.category == "deadline"
+    ]
+    gates = [
+        entry.at
+        for entry in resolved
+        if entry.at is not None and entry.constraint.category == "start_gate"
+    ]
+    upper = min(deadlines) if deadlines else None
+    latest_gate = max(gates) if gates else None
+    lower = max([current_dt, *gates])
+    if upper is not None and upper <= lower:
+        return None
+
+    durations = {
+        index: max(MIN_TASK_MINUTES, span_minutes(end - start))
+        for index, (start, end) in enumerate(zip(starts, ends))
+    }
+
+    pins: list[Placement] = []
+    claimed: set[int] = set()
+    for target, entry in _pin_targets(resolved, lower, upper, latest_gate):
+        index = _claim_item(
+            target, entry.constraint.text, list(timeline), starts, claimed
+        )
+        if index is None:
+            break
+        start = max([target, *(pin.end for pin in pins if pin.start <= target)])
+        if span_minutes(start - target) > max(MAX_PIN_SHIFT_MINUTES, durations[index]):
+            return None
+        end = start + timedelta(minutes=durations[index])
+        later_pins = [pin.start for pin in pins if pin.start >= start]
+        limits = [*later_pins, *([upper] if upper is not None else [])]
+        if limits:
+            end = min(end, min(limits))
+        if span_minutes(end - start) < MIN_TASK_MINUTES:
+            return None
+        claimed.add(index)
+        pins.append(Placement(index, start, end))
+
+    order = sorted(
+        (entry.index for entry in timeline if entry.index not in claimed),
+        key=lambda index: (starts[index], index),
+    )
+    flexible = _schedule_flexible(
+        order, durations, dict(enumerate(starts)), free_gaps(pins, lower, upper)
+    )
+    if flexible is None:
+        return None
+
+    placements = {placement.index: placement for placement in [*pins, *flexible]}
+    repaired: list[PlanItem] = []
+    for entry in timeline:
+        placement = placements[entry.index]
+        repaired.append(
+            entry.item.model_copy(
+                update={
+                    "start_time": placement.start.isoformat(),
+                    "end_time": placement.end.isoformat(),
+                    "timebox_minutes": int(
+                        round(span_minutes(placement.end - placement.start))
+                    ),
+                }
+            )
+        )
+    return repaired
@@ -8,6 +8,36 @@ class Settings(BaseSettings):
     OPIK_API_KEY: str | None = None
     OPIK_PROJECT_NAME: str = "Hackaton"
     OPIK_WORKSPACE: str = "silviu-druma"
+    RECALL_PREFILTER: bool = False
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY_S: float = 30.0
+    LLM_HTTP2: bool = False
+    LLM_MAX_RETRIES: int = 2
+    LLM_CONNECT_TIMEOUT_S: float = 5.0
+    LLM_EXTRACTION_TIMEOUT_S: float = 20.0
+    LLM_GENERATION_TIMEOUT_S: float = 45.0
+    LLM_REPAIR_TIMEOUT_S: float = 45.0
+    # Under a latency budget, no LLM call starts with less time than this left.
+    LLM_MIN_CALL_S: float = 2.0
+    # Upstream rate limits enforced locally (0 disables a bucket).
+    LLM_RPM_LIMIT: int = 500
+    LLM_TPM_LIMIT: int = 200000
+    LLM_RATE_LIMIT_RETRIES: int = 3
+    # Routes answer 429/503 once this many LLM calls are waiting (0 disables).
+    LLM_MAX_QUEUE_DEPTH: int = 256
+    EXTRACTION_CACHE_SIZE: int = 1024
+    EXTRACTION_CACHE_TTL_S: float = 3600.0
+    EXTRACTION_CACHE_PATH: str | None = None
+    EXTRACTION_INCREMENTAL: bool = False
+    EXTRACTION_CHUNK_CHARS: int = 12000
+    PRE_EXTRACTION: bool = False
+    PRE_EXTRACTION_MIN_CONFIDENCE: float = 0.8
+    PRE_EXTRACTION_MAX_CHARS: int = 280
+    PLAN_STREAMING: bool = False
+    PLAN_BATCH_CONCURRENCY: int = 8
+    PLAN_BATCH_MAX_ITEMS: int = 1000
+    VALIDATE_TRACING: bool = False
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import os
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from planproof_api.agent import llm
 from planproof_api.config import settings
 from planproof_api.observability.opik import opik
 from opik import config as opik_config
@@ -24,7 +26,15 @@ try:
 except Exception as exc:
     print(f"OPIK WARNING: Failed to initialize. ({exc})", file=sys.stderr)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # The pooled LLM client is created on first use; close its connections here.
+    yield
+    await llm.manager.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(router)
 
@@ -1,36 +1,97 @@
 from __future__ import annotations
 
+import asyncio
 import json
-import re
+import math
 import uuid
+from datetime import tzinfo
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    NamedTuple,
+)
 
-from fastapi import APIRouter
+import openai
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 
 from dateutil import tz
 from dateutil.parser import isoparse
 
-from eval.constraints import check_constraints
+from eval.constraints import check_constraints, resolve_constraints
 from eval.feasibility import check_feasibility
 from eval.hallucination import check_hallucinations
-from eval.recall import calculate_recall
-from eval.time_math import calculate_overlaps
-from thefuzz import process, fuzz
-from planproof_api.agent.extractor import extract_metadata
-from planproof_api.agent.planner import PlanGenerationError, generate_plan
+from eval.recall import KeywordCoverage, keyword_coverage
+from eval.time_math import OverlapPair, find_overlaps
+from eval.timeline import ParsedPlan, PlanLike, ensure_parsed, parse_plan
+from planproof_api.config import settings
+from planproof_api.agent import llm, rate_limiter, singleflight
+from planproof_api.agent.cache import extraction_cache
+from planproof_api.agent.extractor import extract_metadata, extract_with_rules
+from planproof_api.agent.plan_stream import EarlyPlanCheck
+from planproof_api.agent.planner import (
+    PlanAborted,
+    PlanGenerationError,
+    generate_fused,
+    generate_plan,
+    generate_plan_streaming,
+)
 from planproof_api.agent.schemas import (
     DebugInfo,
     ExtractedMetadata,
+    LLMStats,
+    PlanBatchItem,
+    PlanBatchRequest,
+    PlanBatchResponse,
     PlanItem,
     PlanRequest,
     PlanResponse,
     PlanValidation,
+    ValidateBulkItem,
+    ValidateRequest,
+    ValidateResponse,
     ValidationMetrics,
 )
+from planproof_api.agent.scheduler import schedule_plan
+from planproof_api.agent.solver import solve_locally
 from opik import opik_context
 from planproof_api.observability.opik import opik
 
 router = APIRouter()
 
+PlanEmitter = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+
+async def _emit_nothing(_event: str, _data: dict[str, Any]) -> None:
+    return None
+
+
+# Candidate i of a best-of-N request samples at _CANDIDATE_TEMPERATURES[i % 4];
+# the first keeps the deterministic temperature=0 output.
+_CANDIDATE_TEMPERATURES = (0.0, 0.4, 0.7, 1.0)
+
+
+class _Candidate(NamedTuple):
+    index: int
+    plan: list[PlanItem]
+    assumptions: list[str]
+    questions: list[str]
+    validation: PlanValidation
+    coverage: KeywordCoverage
+
+    @property
+    def rank(self) -> tuple[bool, int, float, int]:
+        metrics = self.validation.metrics
+        return (
+            self.validation.status == "pass",
+            -metrics.overlap_minutes,
+            metrics.keyword_recall_score,
+            -self.index,
+        )
+
 
 def _derive_confidence(validation: PlanValidation) -> str:
     if validation.status == "fail":
@@ -48,16 +109,11 @@ def _format_plan(plan: list[PlanItem]) -> str:
     return json.dumps([item.model_dump() for item in plan], indent=2)
 
 
-def _normalize_timeboxes(plan: list[PlanItem]) -> list[PlanItem]:
+def _normalize_timeboxes(timeline: ParsedPlan) -> ParsedPlan:
     normalized: list[PlanItem] = []
-    for item in plan:
-        try:
-            start_dt = isoparse(item.start_time)
-            end_dt = isoparse(item.end_time)
-        except (TypeError, ValueError):
-            normalized.append(item)
-            continue
-        delta_minutes = int(round((end_dt - start_dt).total_seconds() / 60))
+    for entry in timeline:
+        item = entry.item
+        delta_minutes = int(round((entry.end - entry.start).total_seconds() / 60))
         if delta_minutes < 0:
             delta_minutes = 0
         if delta_minutes != item.timebox_minutes:
@@ -66,97 +122,141 @@ def _normalize_timeboxes(plan: list[PlanItem]) -> list[PlanItem]:
             )
         else:
             normalized.append(item)
-    return normalized
-
-
-def _missing_keywords(plan: list[PlanItem], keywords: list[str]) -> list[str]:
-    candidates: list[str] = []
-    for item in plan:
-        if item.task:
-            candidates.append(item.task)
-        if item.why:
-            candidates.append(item.why)
-
-    def _normalize(text: str) -> str:
-        lowered = text.lower()
-        stripped = re.sub(r"[^\w\s]", "", lowered)
-        return re.sub(r"\s+", " ", stripped).strip()
-
-    normalized_candidates = [_normalize(text) for text in candidates]
-    missing: list[str] = []
-    for keyword in keywords or []:
-        if not keyword:
-            continue
-        normalized_keyword = _normalize(keyword)
-        match = process.extractOne(
-            normalized_keyword,
-            normalized_candidates,
-            scorer=fuzz.token_set_ratio,
-        )
-        if match is None or match[1] < 75:
-            missing.append(keyword)
-    return missing
+    return timeline.with_items(normalized)
+
+
+def _describe_overlaps(plan: list[PlanItem], pairs: list[OverlapPair]) -> list[str]:
+    # A sub-minute collision would read "overlap by 0 minutes"; leave it out.
+    return [
+        f'Tasks "{plan[pair.first].task}" and "{plan[pair.second].task}" '
+        f"overlap by {pair.minutes} minutes."
+        for pair in pairs
+        if pair.minutes > 0
+    ]
+
+
+def _format_resolved_constraints(
+    metadata: ExtractedMetadata, current_time: str
+) -> list[str]:
+    lines: list[str] = []
+    for entry in resolve_constraints(metadata.compiled_constraints, current_time):
+        constraint = entry.constraint
+        if entry.window_start is not None and entry.window_end is not None:
+            lines.append(
+                f'- window "{constraint.text}": '
+                f"{entry.window_start.isoformat()} to {entry.window_end.isoformat()}"
+            )
+        elif entry.at is not None and constraint.kind != "window":
+            lines.append(
+                f'- {constraint.kind} "{constraint.text}": {entry.at.isoformat()}'
+            )
+    return lines
 
 
 @opik.track(name="initial_planning_step")
-def _initial_planning_step(
+async def _initial_planning_step(
+    request: PlanRequest,
+    metadata: ExtractedMetadata,
+    current_time: str,
+    local_tz: tzinfo | None = None,
+) -> tuple[list[PlanItem], list[str], list[str]]:
+    if settings.PLAN_STREAMING:
+        # Only the repair variant can use an early abort; the others stream
+        # to parse items as they arrive but always take the full plan.
+        check = None
+        if request.variant == "v3_agentic_repair":
+            check = EarlyPlanCheck(metadata, current_time, local_tz).add
+        return await generate_plan_streaming(
+            request.context,
+            metadata,
+            current_time,
+            request.timezone,
+            check=check,
+        )
+    return await generate_plan(
+        request.context,
+        metadata,
+        current_time,
+        request.timezone,
+    )
+
+
+@opik.track(name="fused_planning_step")
+async def _fused_planning_step(
+    request: PlanRequest, current_time: str
+) -> tuple[ExtractedMetadata, list[PlanItem], list[str], list[str]]:
+    return await generate_fused(request.context, current_time, request.timezone)
+
+
+@opik.track(name="scheduled_planning_step")
+async def _scheduled_planning_step(
     request: PlanRequest, metadata: ExtractedMetadata, current_time: str
 ) -> tuple[list[PlanItem], list[str], list[str]]:
-    return generate_plan(
+    return await asyncio.to_thread(
+        schedule_plan,
         request.context,
         metadata,
         current_time,
         request.timezone,
+        request.task_durations,
+        request.task_priorities,
     )
 
 
-@opik.track(name="validation_step")
-def _validate_plan(
-    plan: list[PlanItem],
+def _run_checks(
+    plan: PlanLike,
     metadata: ExtractedMetadata,
     current_time: str,
     match_threshold: int = 80,
     variant: str | None = None,
-) -> PlanValidation:
-    """Validate a generated plan using deterministic checks.
+    coverage: KeywordCoverage | None = None,
+    verbose: bool = True,
+) -> tuple[PlanValidation, list[str]]:
+    """Run every deterministic check; no tracing.
 
-    This is the "Validation" step of the Sandwich Architecture.
-
-    Args:
-        plan: Generated plan items to validate.
-        metadata: Extracted metadata used for grounding.
-        current_time: ISO-8601 timestamp representing "now".
-
-    Returns:
-        PlanValidation containing metrics and errors.
+    Returns the validation and the raw constraint errors. ``verbose=False``
+    silences the checkers' debug output.
     """
-    overlap_minutes = calculate_overlaps(plan)
+    timeline = ensure_parsed(plan)
+    plan = timeline.items
+    current_dt = isoparse(current_time)
+    overlap_pairs = find_overlaps(timeline)
+    overlap_minutes = sum(pair.minutes for pair in overlap_pairs)
     constraint_violation_count, constraint_errors = check_constraints(
-        plan, metadata.temporal_constraints, current_time, overlap_minutes
+        timeline,
+        metadata.compiled_constraints,
+        current_dt,
+        overlap_minutes,
+        verbose=verbose,
     )
     hallucination_candidates = (
         (metadata.actionable_tasks or []) + (metadata.temporal_constraints or [])
     )
     hallucination_count = check_hallucinations(
-        plan,
+        timeline,
         metadata.ground_truth_entities,
         hallucination_candidates,
         match_threshold=match_threshold,
         variant=variant,
         detected_constraints=metadata.temporal_constraints,
     )
-    keyword_recall_score = calculate_recall(
-        plan, metadata.actionable_tasks
-    )
-    missing_keywords = _missing_keywords(plan, metadata.actionable_tasks)
-    human_feasibility_flags = check_feasibility(plan)
+    if coverage is None:
+        coverage = keyword_coverage(
+            timeline,
+            metadata.actionable_tasks,
+            prefilter=settings.RECALL_PREFILTER,
+            verbose=verbose,
+        )
+    keyword_recall_score = coverage.score
+    missing_keywords = coverage.missing
+    human_feasibility_flags = check_feasibility(timeline)
     zero_duration_flags = 0
 
     errors: list[str] = list(constraint_errors)
-    current_dt = isoparse(current_time)
-    for item in plan:
-        start_dt = isoparse(item.start_time)
-        end_dt = isoparse(item.end_time)
+    for entry in timeline:
+        item = entry.item
+        start_dt = entry.start
+        end_dt = entry.end
 
         if start_dt < current_dt:
             constraint_violation_count += 1
@@ -176,6 +276,7 @@ def _validate_plan(
 
     if overlap_minutes > 0:
         errors.append("overlap_minutes > 0")
+        errors.extend(_describe_overlaps(plan, overlap_pairs))
     if hallucination_count > 0:
         errors.append("hallucination_count > 0")
     if keyword_recall_score < 0.7:
@@ -194,25 +295,55 @@ def _validate_plan(
         keyword_recall_score=keyword_recall_score,
         human_feasibility_flags=human_feasibility_flags + zero_duration_flags,
     )
+    return PlanValidation(status=status, metrics=metrics, errors=errors), list(
+        constraint_errors
+    )
+
+
+@opik.track(name="validation_step")
+def _validate_plan(
+    plan: PlanLike,
+    metadata: ExtractedMetadata,
+    current_time: str,
+    match_threshold: int = 80,
+    variant: str | None = None,
+    coverage: KeywordCoverage | None = None,
+) -> PlanValidation:
+    """Validate a generated plan using deterministic checks.
+
+    This is the "Validation" step of the Sandwich Architecture.
+
+    Args:
+        plan: Generated plan items (or an already parsed timeline) to validate.
+        metadata: Extracted metadata used for grounding.
+        current_time: ISO-8601 timestamp representing "now".
+        coverage: Keyword coverage already computed for this plan, if any.
+
+    Returns:
+        PlanValidation containing metrics and errors.
+    """
+    validation, constraint_errors = _run_checks(
+        plan, metadata, current_time, match_threshold, variant, coverage
+    )
+    metrics = validation.metrics
     try:
         opik_context.update_current_span(
             metadata={
-                "constraint_violation_count": constraint_violation_count,
+                "constraint_violation_count": metrics.constraint_violation_count,
                 "constraint_errors": constraint_errors,
-                "overlap_minutes": overlap_minutes,
-                "hallucination_count": hallucination_count,
-                "keyword_recall_score": keyword_recall_score,
-                "human_feasibility_flags": human_feasibility_flags
-                + zero_duration_flags,
+                "overlap_minutes": metrics.overlap_minutes,
+                "hallucination_count": metrics.hallucination_count,
+                "keyword_recall_score": metrics.keyword_recall_score,
+                "human_feasibility_flags": metrics.human_feasibility_flags,
             }
         )
     except Exception:
         pass
-    return PlanValidation(status=status, metrics=metrics, errors=errors)
+    return validation
 
 
 @opik.track(name="repair_step")
-def _repair_plan(
+async def _repair_plan(
     request: PlanRequest,
     metadata: ExtractedMetadata,
     failed_plan: list[PlanItem],
@@ -229,6 +360,17 @@ def _repair_plan(
         f"{_format_plan(failed_plan)}\n\n"
         "Detected constraints:\n"
         f"{json.dumps(metadata.temporal_constraints, indent=2)}\n\n"
+    )
+    resolved_constraints = _format_resolved_constraints(metadata, current_time)
+    if resolved_constraints:
+        repair_prompt = (
+            f"{repair_prompt}"
+            "Resolved constraint times (local):\n"
+            + "\n".join(resolved_constraints)
+            + "\n\n"
+        )
+    repair_prompt = (
+        f"{repair_prompt}"
         "Validation errors:\n"
         f"{json.dumps(errors, indent=2)}"
     )
@@ -269,7 +411,7 @@ def _repair_plan(
             f"You MUST include ALL requested tasks: {missing_list}. "
             "If they overlap, SHIFT their start times. DO NOT delete them."
         )
-    return generate_plan(
+    return await generate_plan(
         request.context,
         metadata,
         current_time,
@@ -278,6 +420,116 @@ def _repair_plan(
     )
 
 
+def _check_plan(
+    plan: list[PlanItem],
+    metadata: ExtractedMetadata,
+    current_time: str,
+    local_tz: tzinfo | None,
+    match_threshold: int,
+    variant: str | None,
+) -> tuple[list[PlanItem], PlanValidation, KeywordCoverage]:
+    """Parse, normalize and validate a generated plan (CPU-bound, sync)."""
+    timeline = _normalize_timeboxes(parse_plan(plan, local_tz))
+    coverage = keyword_coverage(
+        timeline, metadata.actionable_tasks, prefilter=settings.RECALL_PREFILTER
+    )
+    validation = _validate_plan(
+        timeline,
+        metadata,
+        current_time,
+        match_threshold,
+        variant,
+        coverage=coverage,
+    )
+    return timeline.items, validation, coverage
+
+
+def _repair_locally(
+    plan: list[PlanItem],
+    metadata: ExtractedMetadata,
+    current_time: str,
+    local_tz: tzinfo | None,
+    match_threshold: int,
+    variant: str | None,
+) -> tuple[list[PlanItem], PlanValidation] | None:
+    """Run the deterministic solver and keep its plan only if it passes."""
+    solved = solve_locally(plan, metadata, current_time, local_tz)
+    if solved is None:
+        return None
+    solved, validation, _ = _check_plan(
+        solved, metadata, current_time, local_tz, match_threshold, variant
+    )
+    if validation.status != "pass":
+        return None
+    return solved, validation
+
+
+@opik.track(name="best_of_n_planning_step")
+async def _best_of_n_planning_step(
+    request: PlanRequest,
+    metadata: ExtractedMetadata,
+    current_time: str,
+    local_tz: tzinfo | None,
+    match_threshold: int,
+) -> tuple[_Candidate, int]:
+    """Generate ``request.candidates`` plans concurrently and keep the best.
+
+    Each finished candidate is validated right away; the first passing one
+    cancels the rest. Otherwise the best by (pass, least overlap, highest
+    recall, earliest candidate) wins. Returns it with the number of
+    candidates that were validated.
+    """
+
+    async def run(index: int) -> _Candidate:
+        plan, assumptions, questions = await generate_plan(
+            request.context,
+            metadata,
+            current_time,
+            request.timezone,
+            temperature=_CANDIDATE_TEMPERATURES[index % len(_CANDIDATE_TEMPERATURES)],
+        )
+        plan, validation, coverage = await asyncio.to_thread(
+            _check_plan,
+            plan,
+            metadata,
+            current_time,
+            local_tz,
+            match_threshold,
+            request.variant,
+        )
+        return _Candidate(index, plan, assumptions, questions, validation, coverage)
+
+    tasks = [asyncio.create_task(run(index)) for index in range(request.candidates)]
+    best: _Candidate | None = None
+    first_error: Exception | None = None
+    completed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                candidate = await next_done
+            except (
+                PlanGenerationError,
+                openai.RateLimitError,
+                asyncio.TimeoutError,
+            ) as exc:
+                # Another candidate may still finish; re-raised if none does.
+                first_error = first_error or exc
+                continue
+            completed += 1
+            if best is None or candidate.rank > best.rank:
+                best = candidate
+            if candidate.validation.status == "pass":
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if best is None:
+        raise first_error or PlanGenerationError("No plan candidates completed.")
+    return best, completed
+
+
 def _normalize_current_time(current_time: str, timezone: str) -> str:
     current_dt = isoparse(current_time)
     local_tz = tz.gettz(timezone) if timezone else None
@@ -289,9 +541,65 @@ def _normalize_current_time(current_time: str, timezone: str) -> str:
     return local_dt.isoformat()
 
 
-@router.post("/api/plan", response_model=PlanResponse)
-@opik.track(name="plan_request")
-def create_plan(request: PlanRequest) -> PlanResponse:
+def _draft_payload(
+    plan: list[PlanItem], assumptions: list[str], questions: list[str]
+) -> dict[str, Any]:
+    return {
+        "plan": [
+            item.model_dump() for item in sorted(plan, key=lambda item: item.start_time)
+        ],
+        "assumptions": assumptions,
+        "questions": questions,
+    }
+
+
+async def _run_plan_pipeline(
+    request: PlanRequest,
+    emit: PlanEmitter = _emit_nothing,
+    budget_ms: int | None = None,
+) -> PlanResponse:
+    """Extraction, generation, validation and repair for one request.
+
+    ``emit`` receives each stage's result as it completes ("metadata",
+    "draft", "validation", "repair"), which lets the streaming endpoint
+    forward progress; the returned response is the same either way.
+
+    ``budget_ms`` (or ``request.latency_budget_ms``) bounds every LLM call
+    by the time left. When extraction is skipped or times out the rules
+    extract instead; when too little remains for generation the
+    deterministic scheduler plans instead, and when too little remains for
+    an LLM repair it is skipped.
+    """
+    if budget_ms is None:
+        budget_ms = request.latency_budget_ms
+    with llm.latency_budget(budget_ms):
+        return await _plan_stages(request, emit, budget_ms)
+
+
+async def _extraction_step(context: str, degraded: list[str]) -> ExtractedMetadata:
+    """Extract metadata, or fall back to the rules when the LLM cannot answer.
+
+    Extraction is skipped when the latency budget no longer covers a call,
+    and abandoned when the call or its queue wait times out. Either way
+    ``degraded`` records it and the deterministic scheduler plans next.
+    Still being rate limited after the scheduler's retries answers 429 with
+    ``Retry-After``, like ``_admit``; generation and repair do the same.
+    """
+    if not llm.budget_allows_call():
+        degraded.append("extraction_skipped")
+        return extract_with_rules(context)
+    try:
+        return await extract_metadata(context)
+    except (asyncio.TimeoutError, openai.APITimeoutError):
+        degraded.append("extraction_timeout")
+        return extract_with_rules(context)
+    except openai.RateLimitError as exc:
+        raise _rate_limited(exc) from exc
+
+
+async def _plan_stages(
+    request: PlanRequest, emit: PlanEmitter, budget_ms: int | None
+) -> PlanResponse:
     try:
         opik_context.update_current_trace(metadata={"variant": request.variant})
     except Exception:
@@ -300,17 +608,73 @@ def create_plan(request: PlanRequest) -> PlanResponse:
     local_current_time = _normalize_current_time(
         request.current_time, request.timezone
     )
-    metadata = extract_metadata(request.context)
+    local_tz = tz.gettz(request.timezone) if request.timezone else None
+    degraded: list[str] = []
+    fused = request.variant == "v4_fused"
+    if fused:
+        # Filled by the fused call; stays empty if that call fails.
+        metadata = ExtractedMetadata(
+            temporal_constraints=[], ground_truth_entities=[], actionable_tasks=[]
+        )
+    else:
+        metadata = await _extraction_step(request.context, degraded)
+        await emit("metadata", metadata.model_dump())
     plan: list[PlanItem] = []
     assumptions: list[str] = []
     questions: list[str] = []
     repair_attempted = False
     repair_success = False
+    repair_mode: str | None = None
     validation: PlanValidation
+    checked: tuple[list[PlanItem], PlanValidation, KeywordCoverage] | None = None
+    candidates_evaluated: int | None = None
+    generation_aborted: bool | None = None
+    match_threshold = 70 if request.variant == "v3_agentic_repair" else 80
     try:
-        plan, assumptions, questions = _initial_planning_step(
-            request, metadata, local_current_time
-        )
+        try:
+            if fused:
+                metadata, plan, assumptions, questions = await _fused_planning_step(
+                    request, local_current_time
+                )
+            elif (
+                request.variant == "v5_scheduled"
+                or degraded
+                or not llm.budget_allows_call()
+            ):
+                if request.variant != "v5_scheduled":
+                    # Extraction fell back or used up the budget; skip the LLM.
+                    degraded.append("scheduled_fallback")
+                plan, assumptions, questions = await _scheduled_planning_step(
+                    request, metadata, local_current_time
+                )
+            elif request.candidates > 1:
+                best, candidates_evaluated = await _best_of_n_planning_step(
+                    request, metadata, local_current_time, local_tz, match_threshold
+                )
+                plan, assumptions, questions = (
+                    best.plan,
+                    best.assumptions,
+                    best.questions,
+                )
+                checked = (best.plan, best.validation, best.coverage)
+            else:
+                try:
+                    plan, assumptions, questions = await _initial_planning_step(
+                        request, metadata, local_current_time, local_tz
+                    )
+                except PlanAborted as exc:
+                    # Validate what arrived; the repair step takes it from here.
+                    plan, generation_aborted = exc.plan, True
+        except asyncio.TimeoutError:
+            # Queued past the latency budget; plan without the LLM.
+            degraded.append("generation_timeout")
+            if fused:
+                metadata = extract_with_rules(request.context)
+            plan, assumptions, questions = await _scheduled_planning_step(
+                request, metadata, local_current_time
+            )
+        except openai.RateLimitError as exc:
+            raise _rate_limited(exc) from exc
     except PlanGenerationError as exc:
         validation = PlanValidation(
             status="fail",
@@ -324,46 +688,89 @@ def create_plan(request: PlanRequest) -> PlanResponse:
             errors=[str(exc)],
         )
     else:
-        plan = _normalize_timeboxes(plan)
-        match_threshold = 70 if request.variant == "v3_agentic_repair" else 80
-        validation = _validate_plan(
-            plan, metadata, local_current_time, match_threshold, request.variant
-        )
-        missing_keywords = _missing_keywords(plan, metadata.actionable_tasks)
+        if fused:
+            await emit("metadata", metadata.model_dump())
+        await emit("draft", _draft_payload(plan, assumptions, questions))
+        if checked is None:
+            # Deterministic checks run in a worker thread to keep the loop free.
+            checked = await asyncio.to_thread(
+                _check_plan,
+                plan,
+                metadata,
+                local_current_time,
+                local_tz,
+                match_threshold,
+                request.variant,
+            )
+        plan, validation, coverage = checked
+        await emit("validation", validation.model_dump())
         if validation.status == "fail" and request.variant == "v3_agentic_repair":
             repair_attempted = True
-            try:
-                plan, assumptions, questions = _repair_plan(
-                    request,
-                    metadata,
-                    plan,
-                    validation.errors,
-                    local_current_time,
-                    validation.metrics.keyword_recall_score,
-                    missing_keywords,
-                    validation.metrics.constraint_violation_count,
-                )
-                plan = _normalize_timeboxes(plan)
-                validation = _validate_plan(
-                    plan,
-                    metadata,
-                    local_current_time,
-                    match_threshold,
-                    request.variant,
-                )
-                repair_success = validation.status == "pass"
-            except PlanGenerationError as exc:
-                validation = PlanValidation(
-                    status="fail",
-                    metrics=ValidationMetrics(
-                        constraint_violation_count=0,
-                        overlap_minutes=0,
-                        hallucination_count=0,
-                        keyword_recall_score=0.0,
-                        human_feasibility_flags=0,
-                    ),
-                    errors=[str(exc)],
-                )
+            await emit("repair", {"mode": "local", "status": "started"})
+            local_repair = await asyncio.to_thread(
+                _repair_locally,
+                plan,
+                metadata,
+                local_current_time,
+                local_tz,
+                match_threshold,
+                request.variant,
+            )
+            if local_repair is not None:
+                plan, validation = local_repair
+                repair_success = True
+                repair_mode = "local"
+            elif not llm.budget_allows_call():
+                degraded.append("repair_skipped")
+            else:
+                # Fall back to the LLM when the solver cannot reach a pass.
+                repair_mode = "llm"
+                await emit("repair", {"mode": "llm", "status": "started"})
+                try:
+                    plan, assumptions, questions = await _repair_plan(
+                        request,
+                        metadata,
+                        plan,
+                        validation.errors,
+                        local_current_time,
+                        validation.metrics.keyword_recall_score,
+                        coverage.missing,
+                        validation.metrics.constraint_violation_count,
+                    )
+                    plan, validation, _ = await asyncio.to_thread(
+                        _check_plan,
+                        plan,
+                        metadata,
+                        local_current_time,
+                        local_tz,
+                        match_threshold,
+                        request.variant,
+                    )
+                    repair_success = validation.status == "pass"
+                except asyncio.TimeoutError:
+                    # Queued past the latency budget; keep the unrepaired plan.
+                    degraded.append("repair_timeout")
+                except openai.RateLimitError as exc:
+                    raise _rate_limited(exc) from exc
+                except PlanGenerationError as exc:
+                    validation = PlanValidation(
+                        status="fail",
+                        metrics=ValidationMetrics(
+                            constraint_violation_count=0,
+                            overlap_minutes=0,
+                            hallucination_count=0,
+                            keyword_recall_score=0.0,
+                            human_feasibility_flags=0,
+                        ),
+                        errors=[str(exc)],
+                    )
+            # A skipped LLM repair leaves the failed local attempt as the last.
+            await emit(
+                "repair",
+                {"mode": repair_mode or "local", "status": validation.status},
+            )
+            await emit("draft", _draft_payload(plan, assumptions, questions))
+            await emit("validation", validation.model_dump())
 
     try:
         opik_context.update_current_trace(
@@ -421,7 +828,260 @@ def create_plan(request: PlanRequest) -> PlanResponse:
         debug=DebugInfo(
             repair_attempted=repair_attempted,
             repair_success=repair_success,
+            repair_mode=repair_mode,
+            candidates_evaluated=candidates_evaluated,
+            generation_aborted=generation_aborted,
+            latency_budget_ms=budget_ms,
+            degraded=degraded or None,
             variant=request.variant,
             trace_id=trace_id,
         ),
     )
+
+
+def _capacity_exhausted(status_code: int, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail="LLM capacity exhausted; retry later.",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def _rate_limited(exc: openai.RateLimitError) -> HTTPException:
+    """429 for a call still rate limited after the scheduler's retries."""
+    retry_after = rate_limiter.retry_after_seconds(exc)
+    if retry_after is None:
+        retry_after = rate_limiter.llm_scheduler.backoff_remaining()
+    return _capacity_exhausted(429, retry_after)
+
+
+def _admit() -> None:
+    """Reject a request up front when the LLM queue is already too deep."""
+    rejection = rate_limiter.llm_scheduler.admission_error()
+    if rejection is None:
+        return
+    raise _capacity_exhausted(*rejection)
+
+
+@router.get("/api/llm/stats", response_model=LLMStats)
+def llm_stats() -> LLMStats:
+    """Scheduler, coalescing and cache counters for this worker process."""
+    return LLMStats(
+        scheduler=rate_limiter.llm_scheduler.stats()._asdict(),
+        coalescing=singleflight.llm_flight.stats()._asdict(),
+        extraction_cache=extraction_cache.stats()._asdict(),
+    )
+
+
+@router.post("/api/plan", response_model=PlanResponse)
+@opik.track(name="plan_request")
+async def create_plan(
+    request: PlanRequest,
+    x_latency_budget_ms: Annotated[int | None, Header(ge=1)] = None,
+) -> PlanResponse:
+    _admit()
+    return await _run_plan_pipeline(request, budget_ms=x_latency_budget_ms)
+
+
+@opik.track(name="plan_stream_request")
+async def _stream_plan_pipeline(
+    request: PlanRequest, emit: PlanEmitter, budget_ms: int | None
+) -> PlanResponse:
+    return await _run_plan_pipeline(request, emit, budget_ms)
+
+
+def _sse(event: str, data: object) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/api/plan/stream")
+async def stream_plan(
+    request: PlanRequest,
+    x_latency_budget_ms: Annotated[int | None, Header(ge=1)] = None,
+) -> StreamingResponse:
+    """Server-Sent Events version of ``/api/plan``.
+
+    Emits ``metadata``, ``draft``, ``validation`` and ``repair`` events as
+    the stages finish, then ``final`` with the full PlanResponse (or
+    ``error``). The pipeline is cancelled if the client disconnects.
+    """
+    _admit()
+    queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def emit(event: str, data: dict[str, Any]) -> None:
+        await queue.put(_sse(event, data))
+
+    async def run() -> None:
+        try:
+            response = await _stream_plan_pipeline(
+                request, emit, x_latency_budget_ms
+            )
+            await emit("final", response.model_dump(mode="json"))
+        except Exception as exc:
+            await emit("error", {"detail": str(exc)})
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(run())
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+        finally:
+            task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@opik.track(name="plan_request")
+async def _batch_item_pipeline(
+    index: int, request: PlanRequest, semaphore: asyncio.Semaphore
+) -> PlanBatchItem:
+    async with semaphore:
+        try:
+            # Batch calls queue behind interactive ones at the LLM scheduler.
+            with rate_limiter.lane("batch"):
+                response = await _run_plan_pipeline(request)
+        except Exception as exc:
+            # One bad item must not take the rest of the batch down.
+            return PlanBatchItem(index=index, error=f"{type(exc).__name__}: {exc}")
+    return PlanBatchItem(index=index, response=response)
+
+
+@router.post("/api/plan/batch", response_model=PlanBatchResponse)
+async def create_plan_batch(
+    batch: PlanBatchRequest,
+) -> PlanBatchResponse | StreamingResponse:
+    """Run many plan requests with at most PLAN_BATCH_CONCURRENCY in flight.
+
+    Items share the extraction cache and the pooled LLM client. Results come
+    back in request order, or as NDJSON lines in completion order when
+    ``stream`` is set; a failed item carries ``error`` instead of
+    ``response``.
+    """
+    if len(batch.requests) > settings.PLAN_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.PLAN_BATCH_MAX_ITEMS} requests.",
+        )
+    _admit()
+    semaphore = asyncio.Semaphore(max(1, settings.PLAN_BATCH_CONCURRENCY))
+    tasks = [
+        asyncio.create_task(_batch_item_pipeline(index, request, semaphore))
+        for index, request in enumerate(batch.requests)
+    ]
+    if not batch.stream:
+        return PlanBatchResponse(results=await asyncio.gather(*tasks))
+
+    async def lines() -> AsyncIterator[str]:
+        try:
+            for finished in asyncio.as_completed(tasks):
+                item = await finished
+                yield item.model_dump_json() + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _validate_submitted(request: ValidateRequest) -> ValidateResponse:
+    """Deterministic checks only, for a plan the client already has."""
+    local_tz = tz.gettz(request.timezone) if request.timezone else None
+    # Without a known timezone, naive times are read as UTC so the checks
+    # never compare naive and aware datetimes.
+    timezone = request.timezone if local_tz is not None else "UTC"
+    current_time = _normalize_current_time(request.current_time, timezone)
+    metadata = request.extracted_metadata
+    timeline = _normalize_timeboxes(parse_plan(request.plan, local_tz or tz.UTC))
+    validation, _ = _run_checks(timeline, metadata, current_time, verbose=False)
+    return ValidateResponse(
+        plan=timeline.items,
+        confidence=_derive_confidence(validation),
+        validation=validation,
+    )
+
+
+_traced_validate_submitted = opik.track(name="validate_request")(_validate_submitted)
+
+
+def _validate_one(request: ValidateRequest) -> ValidateResponse:
+    if settings.VALIDATE_TRACING:
+        return _traced_validate_submitted(request)
+    return _validate_submitted(request)
+
+
+@router.post("/api/validate", response_model=ValidateResponse)
+def validate_plan(request: ValidateRequest) -> Response:
+    """Validate a client-supplied plan against supplied metadata.
+
+    No extraction or generation runs, tracing is off unless
+    VALIDATE_TRACING is set, and the response is serialized once by
+    pydantic instead of going through FastAPI's encoder.
+    """
+    return Response(
+        content=_validate_one(request).model_dump_json(),
+        media_type="application/json",
+    )
+
+
+async def _body_lines(request: Request) -> AsyncIterator[bytes]:
+    """Yield the request body line by line as it arrives."""
+    pending = b""
+    async for chunk in request.stream():
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+def _validate_line(index: int, line: bytes) -> str:
+    try:
+        item = ValidateBulkItem(
+            index=index,
+            result=_validate_one(ValidateRequest.model_validate_json(line)),
+        )
+    except Exception as exc:
+        # One bad line must not cut off the lines after it.
+        item = ValidateBulkItem(index=index, error=str(exc) or type(exc).__name__)
+    return item.model_dump_json() + "\n"
+
+
+class _UploadStreamingResponse(StreamingResponse):
+    """A streamed response whose content still reads the request body.
+
+    Starlette's disconnect listener would consume the body messages, so
+    only the body iterator calls ``receive``; it raises on disconnect.
+    """
+
+    async def listen_for_disconnect(self, receive: Any) -> None:
+        await asyncio.Event().wait()
+
+
+async def _validate_lines(request: Request) -> AsyncIterator[str]:
+    index = 0
+    async for line in _body_lines(request):
+        if line.strip():
+            # Deterministic checks run in a worker thread to keep the loop free.
+            yield await asyncio.to_thread(_validate_line, index, line)
+        index += 1
+
+
+@router.post("/api/validate/bulk")
+async def validate_plans_bulk(request: Request) -> StreamingResponse:
+    """NDJSON in, NDJSON out: one ValidateRequest per line.
+
+    Results stream back in input order; a malformed line, or one whose
+    checks fail to run, yields an item with ``error`` set. The body is read
+    line by line while results stream out, so large uploads are never
+    held in memory whole.
+    """
+    return _UploadStreamingResponse(
+        _validate_lines(request), media_type="application/x-ndjson"
+    )
@@ -461,7 +461,10 @@ function renderRepairLog(debug) {
   section.classList.remove('repair-section--hidden');
 
   // Update status text and styling
-  if (debug.repair_success) {
+  if (debug.repair_in_progress) {
+    statusEl.textContent = 'Repairing…';
+    statusEl.className = 'repair-status';
+  } else if (debug.repair_success) {
     statusEl.textContent = 'Success';
     statusEl.className = 'repair-status repair-status--success';
   } else {
@@ -910,7 +913,74 @@ function renderApiError(message) {
 // ==========================================================================
 
 /**
- * Generates a plan by calling the /api/plan endpoint.
+ * Reads a Server-Sent Events body from a fetch response.
+ * EventSource cannot POST, so the stream is parsed by hand.
+ * @param {Response} response - Streaming fetch response
+ * @param {Function} onEvent - Called with (eventName, parsedData) per event
+ */
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      const dataLines = [];
+      block.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) {
+          event = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+          dataLines.push(line.slice(5).trimStart());
+        }
+      });
+      if (dataLines.length) {
+        onEvent(event, JSON.parse(dataLines.join('\n')));
+      }
+    }
+  }
+}
+
+/**
+ * Renders the final PlanResponse once the pipeline has finished.
+ * @param {Object} data - Full PlanResponse from the API
+ */
+function renderPlanResponse(data) {
+  // DEBUG: Log full API response for field verification
+  console.log('DEBUG: Full API Response:', data);
+
+  // Determine if plan is rejected (PR 3.3)
+  const isRejected = data.validation?.status === 'fail';
+  
+  // Render the response
+  renderTimeline(data.plan || [], isRejected);
+  renderValidation(data.validation || null);
+  
+  // Render extracted metadata (PR 2.1)
+  const metadata = data.extracted_metadata || {};
+  const constraints = metadata.detected_constraints || metadata.temporal_constraints || [];
+  renderConstraints(constraints);
+  
+  // Render repair log (PR 2.3)
+  renderRepairLog(data.debug || null);
+  
+  // Render assumptions & questions (PR 3.4)
+  renderAssumptions(data.assumptions || null);
+  renderQuestions(data.questions || null);
+}
+
+/**
+ * Generates a plan by streaming /api/plan/stream.
+ * Each pipeline stage is rendered as soon as its event arrives, so the
+ * draft timeline shows before validation and repair have finished.
  */
 async function generatePlan() {
   const context = elements.contextInput?.value || '';
@@ -936,7 +1006,7 @@ async function generatePlan() {
   };
 
   try {
-    const response = await fetch('/api/plan', {
+    const response = await fetch('/api/plan/stream', {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -948,28 +1018,43 @@ async function generatePlan() {
       throw new Error(`API error: ${response.status} ${response.statusText}`);
     }
 
-    const data = await response.json();
-    
-    // DEBUG: Log full API response for field verification
-    console.log('DEBUG: Full API Response:', data);
+    let finished = false;
+    await readEventStream(response, (event, data) => {
+      switch (event) {
+        case 'metadata':
+          renderConstraints(data.detected_constraints || data.temporal_constraints || []);
+          break;
+        case 'draft':
+          // First usable result: show it and drop the spinner.
+          hideLoadingState();
+          renderTimeline(data.plan || [], false);
+          renderAssumptions(data.assumptions || null);
+          renderQuestions(data.questions || null);
+          break;
+        case 'validation':
+          renderValidation(data);
+          break;
+        case 'repair':
+          renderRepairLog({
+            repair_attempted: true,
+            repair_in_progress: data.status === 'started',
+            repair_success: data.status === 'pass',
+          });
+          break;
+        case 'final':
+          finished = true;
+          renderPlanResponse(data);
+          break;
+        case 'error':
+          throw new Error(data.detail || 'Plan generation failed');
+        default:
+          break;
+      }
+    });
 
-    // Determine if plan is rejected (PR 3.3)
-    const isRejected = data.validation?.status === 'fail';
-    
-    // Render the response
-    renderTimeline(data.plan || [], isRejected);
-    renderValidation(data.validation || null);
-    
-    // Render extracted metadata (PR 2.1)
-    const constraints = data.extracted_metadata?.detected_constraints || [];
-    renderConstraints(constraints);
-    
-    // Render repair log (PR 2.3)
-    renderRepairLog(data.debug || null);
-    
-    // Render assumptions & questions (PR 3.4)
-    renderAssumptions(data.assumptions || null);
-    renderQuestions(data.questions || null);
+    if (!finished) {
+      throw new Error('Plan stream ended before the final result');
+    }
     
     // Hide loading state (PR 3.1)
     hideLoadingState();
@@ -1003,6 +1088,8 @@ window.PlanProof = {
   resetCoverage,
   renderRepairLog,
   resetRepairLog,
+  readEventStream,
+  renderPlanResponse,
   renderAssumptions,
   renderQuestions,
   resetInsights,
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from planproof_api.agent.schemas import ExtractedMetadata, PlanItem
+from planproof_api.config import settings
+from planproof_api.routes import router
+
+_METADATA = ExtractedMetadata(
+    temporal_constraints=[],
+    ground_truth_entities=["alpha"],
+    actionable_tasks=["alpha"],
+)
+_PLAN = [
+    PlanItem(
+        task="Alpha",
+        start_time="2025-01-18T09:00:00-05:00",
+        end_time="2025-01-18T10:00:00-05:00",
+        timebox_minutes=60,
+        why="",
+    )
+]
+
+
+async def _extract(context: str) -> ExtractedMetadata:
+    if context == "boom":
+        raise RuntimeError("extraction exploded")
+    return _METADATA
+
+
+def _body(contexts: list[str], stream: bool = False) -> dict:
+    return {
+        "requests": [
+            {
+                "context": context,
+                "current_time": "2025-01-18T08:00:00-05:00",
+                "timezone": "America/New_York",
+                "variant": "v2_structured",
+            }
+            for context in contexts
+        ],
+        "stream": stream,
+    }
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    monkeypatch.setattr(settings, "PLAN_BATCH_CONCURRENCY", 2)
+    app = FastAPI()
+    app.include_router(router)
+    with patch("planproof_api.routes.extract_metadata", side_effect=_extract), patch(
+        "planproof_api.routes.generate_plan", return_value=(_PLAN, [], [])
+    ):
+        yield TestClient(app)
+
+
+def test_batch_returns_results_in_order_with_item_errors(client: TestClient) -> None:
+    response = client.post("/api/plan/batch", json=_body(["Alpha", "boom", "Alpha"]))
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert results[0]["response"]["validation"]["status"] == "pass"
+    assert results[1]["response"] is None
+    assert results[1]["error"] == "RuntimeError: extraction exploded"
+    assert results[2]["error"] is None
+
+
+def test_batch_streams_ndjson(client: TestClient) -> None:
+    response = client.post(
+        "/api/plan/batch", json=_body(["Alpha", "boom", "Alpha"], stream=True)
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    assert sum(line["error"] is not None for line in lines) == 1
+
+
+def test_batch_rejects_oversized_requests(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "PLAN_BATCH_MAX_ITEMS", 2)
+
+    response = client.post("/api/plan/batch", json=_body(["a", "b", "c"]))
+
+    assert response.status_code == 413
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+from planproof_api.agent.cache import ExtractionCache, cache_key
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_key_separates_parts() -> None:
+    assert cache_key("m", "v1", "ctx") == cache_key("m", "v1", "ctx")
+    assert cache_key("m", "v1", "ctx") != cache_key("m", "v2", "ctx")
+    assert cache_key("ab", "c", "") != cache_key("a", "bc", "")
+
+
+def test_memory_tier_evicts_least_recently_used() -> None:
+    cache = ExtractionCache(max_entries=2)
+
+    async def scenario() -> list[str | None]:
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        await cache.get("a")
+        await cache.set("c", "3")
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == ["1", None, "3"]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (3, 1, 2)
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = _Clock()
+    cache = ExtractionCache(ttl_seconds=10, clock=clock)
+
+    asyncio.run(cache.set("a", "1"))
+    clock.now += 11
+
+    assert asyncio.run(cache.get("a")) is None
+    assert cache.stats().entries == 0
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path: Path) -> None:
+    path = str(tmp_path / "extractions.sqlite")
+    writer = ExtractionCache(path=path)
+    reader = ExtractionCache(path=path)
+
+    asyncio.run(writer.set("a", "1"))
+
+    assert asyncio.run(reader.get("a")) == "1"
+    assert reader.stats().disk_hits == 1
+    assert asyncio.run(reader.get("a")) == "1"
+    assert reader.stats().memory_hits == 1
+
+
+def test_expiry_purge_uses_an_index(tmp_path: Path) -> None:
+    path = str(tmp_path / "extractions.sqlite")
+    ExtractionCache(path=path)
+
+    with closing(sqlite3.connect(path)) as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM extractions WHERE expires_at <= ?", (0,)
+        ).fetchall()
+
+    assert "extractions_expires_at" in " ".join(str(row[-1]) for row in plan)
+
+
+def test_disabled_cache_stores_nothing() -> None:
+    cache = ExtractionCache(max_entries=0)
+
+    asyncio.run(cache.set("a", "1"))
+
+    assert asyncio.run(cache.get("a")) is None
+    assert cache.stats().misses == 0
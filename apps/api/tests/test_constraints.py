@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from planproof_api.agent.schemas import PlanItem
+from datetime import time
 
-from eval.constraints import check_constraints
+import eval.constraints as constraints_module
+from planproof_api.agent.schemas import ExtractedMetadata, PlanItem
+
+from eval.constraints import check_constraints, compile_constraint, resolve_constraints
 
 
 def _item(start_time: str, end_time: str) -> PlanItem:
@@ -42,3 +45,96 @@ def test_check_constraints_deadline_violation() -> None:
 
     assert count == 1
     assert errors
+
+
+def test_compile_constraint_kinds() -> None:
+    deadline = compile_constraint("Leave by 5 PM")
+    gate = compile_constraint("Busy until 10 AM")
+    fixed = compile_constraint("Meeting at 1:30 PM")
+    window = compile_constraint("Deep work from 4 PM to 6 PM")
+
+    assert (deadline.kind, deadline.at) == ("deadline", time(17, 0))
+    assert (gate.kind, gate.at) == ("start_gate", time(10, 0))
+    assert (fixed.kind, fixed.token) == ("fixed_point", "1:30 PM")
+    assert window.kind == "window"
+    assert (window.window_start, window.window_end) == (time(16, 0), time(18, 0))
+
+
+def test_resolve_constraints_uses_local_day() -> None:
+    resolved = resolve_constraints(
+        [compile_constraint("Leave by 5 PM")], "2025-01-18T08:00:00-05:00"
+    )
+
+    assert resolved[0].at.isoformat() == "2025-01-18T17:00:00-05:00"
+
+
+def test_check_constraints_compiled_matches_strings(monkeypatch) -> None:
+    items = [
+        _item("2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00"),
+        _item("2025-01-18T13:00:00-05:00", "2025-01-18T18:00:00-05:00"),
+    ]
+    texts = ["Busy until 10 AM", "Meeting at 1 PM", "Leave by 5 PM"]
+    now = "2025-01-18T08:00:00-05:00"
+    metadata = ExtractedMetadata(
+        temporal_constraints=texts, ground_truth_entities=[], actionable_tasks=[]
+    )
+    compiled = metadata.compiled_constraints
+    expected = check_constraints(items, texts, now)
+
+    def fail_parse(*_: object) -> None:
+        raise AssertionError("compiled constraints must not be re-parsed")
+
+    monkeypatch.setattr(constraints_module, "parse_time_token", fail_parse)
+
+    assert check_constraints(items, compiled, now) == expected
+    assert metadata.compiled_constraints is compiled
+
+
+def test_check_constraints_fixed_points_claim_distinct_items() -> None:
+    items = [
+        _item("2025-01-18T15:00:00-05:00", "2025-01-18T15:30:00-05:00"),
+        _item("2025-01-18T13:00:00-05:00", "2025-01-18T13:30:00-05:00"),
+        _item("2025-01-18T13:30:00-05:00", "2025-01-18T14:00:00-05:00"),
+    ]
+    constraints = ["Meeting at 1 PM", "Meeting at 1 PM", "Call at 3:05 PM"]
+
+    count, errors = check_constraints(
+        items, constraints, "2025-01-18T08:00:00-05:00"
+    )
+
+    assert (count, errors) == (0, [])
+
+
+def test_check_constraints_fixed_point_without_nearby_task() -> None:
+    items = [
+        _item("2025-01-18T09:00:00-05:00", "2025-01-18T09:30:00-05:00"),
+        _item("2025-01-18T16:00:00-05:00", "2025-01-18T16:30:00-05:00"),
+    ]
+
+    count, errors = check_constraints(
+        items, ["Meeting at 1 PM"], "2025-01-18T08:00:00-05:00"
+    )
+
+    assert count == 1
+    assert errors[0].startswith("'1 PM' constraint not met (No task found within 5")
+
+
+def test_start_index_skips_claimed_items() -> None:
+    from datetime import datetime, timedelta
+
+    base = datetime(2025, 1, 18, 9, 0)
+    # Later original indices start earlier, so "first" means lowest index.
+    starts = [base + timedelta(minutes=4 - offset) for offset in range(5)]
+    index = constraints_module._StartIndex(
+        starts, [start + timedelta(minutes=30) for start in starts]
+    )
+
+    claimed = []
+    for _ in range(5):
+        idx = index.first_near(base)
+        claimed.append(idx)
+        index.claim(idx)
+
+    assert claimed == [0, 1, 2, 3, 4]
+    assert index.first_near(base) is None
+    assert index.first_shifted(base) is None
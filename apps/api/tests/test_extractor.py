@@ -1,22 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 from types import SimpleNamespace
 
 import pytest
 
-from planproof_api.agent import extractor
+from planproof_api.agent import extractor, llm
+from planproof_api.agent.cache import extraction_cache
 
 
-def _fake_openai(payload: dict) -> object:
+@pytest.fixture(autouse=True)
+def _empty_extraction_cache() -> None:
+    extraction_cache.clear()
+
+
+def _fake_openai(payload: dict, calls: list | None = None) -> object:
     message = SimpleNamespace(content=json.dumps(payload))
     choice = SimpleNamespace(message=message)
     response = SimpleNamespace(choices=[choice])
 
     class _Completions:
         @staticmethod
-        def create(**_: object) -> object:
+        async def create(**kwargs: object) -> object:
+            if calls is not None:
+                calls.append(kwargs)
             return response
 
     class _Chat:
@@ -35,22 +44,171 @@ def test_extract_metadata_mocked(monkeypatch: pytest.MonkeyPatch) -> None:
         "actionable_tasks": ["call", "project"],
     }
 
-    monkeypatch.setattr(extractor, "OpenAI", lambda: _fake_openai(payload))
+    monkeypatch.setattr(llm, "get_client", lambda: _fake_openai(payload))
 
-    result = extractor.extract_metadata("Need to call Bob about the Apollo project.")
+    result = asyncio.run(
+        extractor.extract_metadata("Need to call Bob about the Apollo project.")
+    )
 
     assert result.temporal_constraints == payload["temporal_constraints"]
     assert result.ground_truth_entities == payload["ground_truth_entities"]
     assert result.actionable_tasks == payload["actionable_tasks"]
 
 
+def test_extract_metadata_reuses_cached_result(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    payload = {
+        "temporal_constraints": ["Leave by 5 PM"],
+        "ground_truth_entities": ["Bob"],
+        "actionable_tasks": ["call Bob"],
+    }
+    calls: list = []
+    monkeypatch.setattr(llm, "get_client", lambda: _fake_openai(payload, calls))
+
+    async def run_twice() -> tuple:
+        first = await extractor.extract_metadata("Call Bob, leave by 5 PM.")
+        second = await extractor.extract_metadata("Call Bob, leave by 5 PM.")
+        other = await extractor.extract_metadata("Call Bob, leave by 6 PM.")
+        return first, second, other
+
+    first, second, _ = asyncio.run(run_twice())
+
+    assert second == first
+    assert len(calls) == 2
+    assert extraction_cache.stats().hits == 1
+
+
+def test_incremental_extraction_only_sends_changed_segments(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    payloads = {
+        "Call Bob at 1 PM.": {
+            "temporal_constraints": ["1 PM"],
+            "ground_truth_entities": ["Bob"],
+            "actionable_tasks": ["call Bob"],
+        },
+        "Email Alice at 1 PM.": {
+            "temporal_constraints": ["1 PM"],
+            "ground_truth_entities": ["Alice"],
+            "actionable_tasks": ["email Alice"],
+        },
+        "Leave by 5 PM.": {
+            "temporal_constraints": ["Leave by 5 PM"],
+            "ground_truth_entities": [],
+            "actionable_tasks": ["leave"],
+        },
+        "Leave by 6 PM.": {
+            "temporal_constraints": ["Leave by 6 PM"],
+            "ground_truth_entities": [],
+            "actionable_tasks": ["leave"],
+        },
+    }
+    sent: list[str] = []
+
+    class _Completions:
+        @staticmethod
+        async def create(**kwargs: object) -> object:
+            segment = kwargs["messages"][1]["content"].removeprefix("Context:\n")
+            sent.append(segment)
+            message = SimpleNamespace(content=json.dumps(payloads[segment]))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_Completions()))
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+    monkeypatch.setattr(extractor.settings, "EXTRACTION_INCREMENTAL", True)
+
+    first = asyncio.run(
+        extractor.extract_metadata(
+            "Call Bob at 1 PM. Email Alice at 1 PM.\nLeave by 5 PM."
+        )
+    )
+    sent.clear()
+    edited = asyncio.run(
+        extractor.extract_metadata(
+            "Call Bob at 1 PM. Email Alice at 1 PM.\nLeave by 6 PM."
+        )
+    )
+
+    assert sent == ["Leave by 6 PM."]
+    assert first.temporal_constraints == ["1 PM", "1 PM", "Leave by 5 PM"]
+    assert edited.temporal_constraints == ["1 PM", "1 PM", "Leave by 6 PM"]
+    assert edited.actionable_tasks == ["call Bob", "email Alice"]
+    assert edited.ground_truth_entities == ["Bob", "Alice"]
+
+
+def test_split_chunks_keeps_paragraphs_whole() -> None:
+    context = "First para.\n\nSecond para is longer.\n\n\nThird."
+
+    chunks = extractor._split_chunks(context, max_chars=32)
+
+    assert chunks == ["First para.", "Second para is longer.\n\nThird."]
+
+
+def test_chunked_extraction_merges_restated_constraints(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    payloads = {
+        "Call Bob at 1 PM. Leave by 5 PM.": {
+            "temporal_constraints": ["1 PM", "Leave by 5 PM", "Lunch at noon"],
+            "ground_truth_entities": ["Bob"],
+            "actionable_tasks": ["call Bob", "lunch"],
+        },
+        "Email Alice at 1 PM. Remember: leave by 5 PM.": {
+            "temporal_constraints": ["1 PM", "leave by 5 PM", "Lunch at noon"],
+            "ground_truth_entities": ["Alice", "Bob"],
+            "actionable_tasks": ["email Alice", "lunch"],
+        },
+    }
+
+    class _Completions:
+        @staticmethod
+        async def create(**kwargs: object) -> object:
+            chunk = kwargs["messages"][1]["content"].removeprefix("Context:\n")
+            message = SimpleNamespace(content=json.dumps(payloads[chunk]))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_Completions()))
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+    monkeypatch.setattr(extractor.settings, "EXTRACTION_CHUNK_CHARS", 50)
+
+    result = asyncio.run(extractor.extract_metadata("\n\n".join(payloads)))
+
+    assert result.temporal_constraints == [
+        "1 PM",
+        "Leave by 5 PM",
+        "Lunch at noon",
+        "1 PM",
+    ]
+    assert result.actionable_tasks == ["call Bob", "lunch", "email Alice"]
+    assert result.ground_truth_entities == ["Bob", "Alice"]
+
+
+def test_pre_extraction_skips_llm_for_simple_context(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list = []
+    monkeypatch.setattr(llm, "get_client", lambda: _fake_openai({}, calls))
+    monkeypatch.setattr(extractor.settings, "PRE_EXTRACTION", True)
+
+    simple = asyncio.run(extractor.extract_metadata("Call Bob. Leave by 5 PM."))
+    assert calls == []
+    assert simple.temporal_constraints == ["Leave by 5 PM"]
+    assert simple.actionable_tasks == ["Call Bob"]
+
+    asyncio.run(extractor.extract_metadata("Maybe call Bob after lunch."))
+    assert len(calls) == 1
+
+
 def test_extract_metadata_live(run_live: bool) -> None:
     if not run_live:
         pytest.skip("Use --run-live to enable OpenAI calls.")
     if not os.getenv("OPENAI_API_KEY"):
         pytest.skip("OPENAI_API_KEY not set.")
 
-    result = extractor.extract_metadata("Need to call Bob about the Apollo project.")
+    result = asyncio.run(
+        extractor.extract_metadata("Need to call Bob about the Apollo project.")
+    )
 
     assert "Bob" in result.ground_truth_entities
     assert "Apollo" in result.ground_truth_entities
@@ -72,3 +230,37 @@ def test_normalize_entities_variants() -> None:
     assert "project Apollo" in normalized
     assert "Apollo" in normalized
     assert "project" not in normalized
+
+
+def test_rule_results_are_not_served_after_pre_extraction_is_off(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    payload = {
+        "temporal_constraints": ["Leave by 5 PM"],
+        "ground_truth_entities": ["Bob"],
+        "actionable_tasks": ["call Bob"],
+    }
+    calls: list = []
+    monkeypatch.setattr(llm, "get_client", lambda: _fake_openai(payload, calls))
+    monkeypatch.setattr(extractor.settings, "PRE_EXTRACTION", True)
+    asyncio.run(extractor.extract_metadata("Call Bob. Leave by 5 PM."))
+    assert calls == []
+
+    monkeypatch.setattr(extractor.settings, "PRE_EXTRACTION", False)
+    result = asyncio.run(extractor.extract_metadata("Call Bob. Leave by 5 PM."))
+
+    assert len(calls) == 1
+    assert result.actionable_tasks == ["call Bob"]
+
+
+def test_rule_entities_are_normalized(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(llm, "get_client", lambda: _fake_openai({}))
+    monkeypatch.setattr(extractor.settings, "PRE_EXTRACTION", True)
+    monkeypatch.setattr(extractor.settings, "PRE_EXTRACTION_MIN_CONFIDENCE", 0.0)
+
+    result = asyncio.run(
+        extractor.extract_metadata("Review Project Apollo. Call Bob by 5 PM.")
+    )
+
+    assert "Apollo" in result.ground_truth_entities
+    assert "Project" not in result.ground_truth_entities
@@ -2,7 +2,11 @@ from __future__ import annotations
 
 from planproof_api.agent.schemas import PlanItem
 
-from eval.hallucination import check_hallucinations
+from eval.hallucination import (
+    EntityMatcher,
+    check_hallucinations,
+    find_hallucinated_tokens,
+)
 
 
 def _item(task: str, why: str) -> PlanItem:
@@ -76,3 +80,21 @@ def test_check_hallucinations_ai_keyword() -> None:
     items = [_item("AI report", "")]
 
     assert check_hallucinations(items, ground_truth, task_keywords) == 1
+
+
+def test_entity_matcher_finds_substrings() -> None:
+    matcher = EntityMatcher(["Project Apollo", "Sarah Jones", ""])
+
+    assert "apollo" in matcher
+    assert "Sarah" in matcher
+    assert "ah jo" in matcher
+    assert "mike" not in matcher
+    assert "apollosarah" not in matcher
+
+
+def test_find_hallucinated_tokens_stop_at_first() -> None:
+    items = [_item("Alpha Beta", ""), _item("Gamma", "")]
+
+    assert find_hallucinated_tokens(items, ["delta"]) == ["Alpha", "Beta", "Gamma"]
+    assert find_hallucinated_tokens(items, ["delta"], stop_at_first=True) == ["Alpha"]
+    assert check_hallucinations(items, ["delta"], [], stop_at_first=True) == 1
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from planproof_api.agent.llm import LLMClientManager
+from planproof_api.config import Settings
+
+
+def _settings(**overrides: object) -> Settings:
+    values = {"OPENAI_API_KEY": "test-key", **overrides}
+    return Settings(**values)
+
+
+def test_manager_reuses_one_pooled_client() -> None:
+    manager = LLMClientManager(_settings(LLM_MAX_CONNECTIONS=7))
+
+    client = manager.client
+
+    assert manager.client is client
+    pool = client._client._transport._pool
+    assert pool._max_connections == 7
+    asyncio.run(manager.aclose())
+
+
+def test_manager_stage_timeouts() -> None:
+    manager = LLMClientManager(
+        _settings(
+            LLM_EXTRACTION_TIMEOUT_S=3,
+            LLM_GENERATION_TIMEOUT_S=9,
+            LLM_REPAIR_TIMEOUT_S=12,
+        )
+    )
+
+    assert manager.timeout_for("extraction") == 3
+    assert manager.timeout_for("generation") == 9
+    assert manager.timeout_for("repair") == 12
+
+
+def test_manager_aclose_resets_client() -> None:
+    manager = LLMClientManager(_settings())
+    first = manager.client
+
+    asyncio.run(manager.aclose())
+
+    assert first.is_closed()
+    assert manager.client is not first
+
+
+@pytest.mark.parametrize("http2", [True, False])
+def test_manager_http2_flag(http2: bool) -> None:
+    manager = LLMClientManager(_settings(LLM_HTTP2=http2))
+
+    pool = manager.client._client._transport._pool
+
+    expected = http2 and importlib.util.find_spec("h2") is not None
+    assert pool._http2 is expected
+    asyncio.run(manager.aclose())
+
+
+def test_stage_timeout_is_bounded_by_latency_budget() -> None:
+    from planproof_api.agent import llm
+
+    assert llm.remaining_budget() is None
+    with llm.latency_budget(1500):
+        assert llm.stage_timeout("generation") <= 1.5
+        assert llm.budget_allows_call() is False
+    with llm.latency_budget(60_000):
+        assert llm.stage_timeout("extraction") == llm.manager.timeout_for(
+            "extraction"
+        )
+        assert llm.budget_allows_call() is True
+    assert llm.remaining_budget() is None
+
+
+def test_connection_errors_are_retried_outside_a_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from planproof_api.agent import llm
+
+    manager = LLMClientManager(_settings(LLM_MAX_RETRIES=2))
+    monkeypatch.setattr(llm, "manager", manager)
+    attempts: list[int] = []
+
+    class _Completions:
+        @staticmethod
+        async def create(**kwargs: object) -> object:
+            attempts.append(1)
+            raise openai.APIConnectionError(
+                request=httpx.Request("POST", "https://api.openai.com/v1")
+            )
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_Completions()))
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+
+    async def call(budget_ms: int | None) -> None:
+        with llm.latency_budget(budget_ms):
+            await llm.create_completion("generation", messages=[])
+
+    # 429s belong to llm_scheduler, so the SDK never retries on its own.
+    assert manager.client.max_retries == 0
+    with pytest.raises(openai.APIConnectionError):
+        asyncio.run(call(None))
+    assert len(attempts) == 3
+    with pytest.raises(openai.APIConnectionError):
+        asyncio.run(call(5000))
+    assert len(attempts) == 4
+    asyncio.run(manager.aclose())
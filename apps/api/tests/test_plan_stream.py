@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from planproof_api.agent import llm, planner
+from planproof_api.agent.plan_stream import EarlyPlanCheck, PlanItemStream
+from planproof_api.agent.schemas import ExtractedMetadata, PlanItem
+
+_CURRENT_TIME = "2025-01-18T08:00:00-05:00"
+
+
+def _item(task: str, start: str, end: str, minutes: int) -> dict:
+    return {
+        "task": task,
+        "start_time": f"2025-01-18T{start}:00-05:00",
+        "end_time": f"2025-01-18T{end}:00-05:00",
+        "timebox_minutes": minutes,
+        "why": 'Said "{ first ]"',
+    }
+
+
+def _metadata(*constraints: str) -> ExtractedMetadata:
+    return ExtractedMetadata(
+        temporal_constraints=list(constraints),
+        ground_truth_entities=[],
+        actionable_tasks=["alpha", "beta"],
+    )
+
+
+def _fake_stream_client(text: str, closed: list[bool], size: int = 7) -> object:
+    chunks = [text[i : i + size] for i in range(0, len(text), size)]
+
+    class _Stream:
+        def __aiter__(self) -> object:
+            return self._chunks()
+
+        async def _chunks(self) -> object:
+            for chunk in chunks:
+                delta = SimpleNamespace(content=chunk)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+        async def close(self) -> None:
+            closed.append(True)
+
+    class _Completions:
+        @staticmethod
+        async def create(**kwargs: object) -> object:
+            assert kwargs["stream"] is True
+            return _Stream()
+
+    class _Chat:
+        completions = _Completions()
+
+    class _Client:
+        chat = _Chat()
+
+    return _Client()
+
+
+def test_item_stream_yields_items_as_they_close() -> None:
+    payload = {
+        "assumptions": ["plan: [not the array]"],
+        "plan": [
+            _item("Alpha", "09:00", "10:00", 60),
+            _item("Beta", "10:00", "11:00", 60),
+        ],
+        "questions": [],
+    }
+    text = json.dumps(payload)
+    parser = PlanItemStream()
+
+    seen: list[tuple[int, str]] = []
+    for position in range(len(text)):
+        for item in parser.feed(text[position]):
+            seen.append((position, item["task"]))
+
+    assert [task for _, task in seen] == ["Alpha", "Beta"]
+    # Alpha is available long before the completion ends.
+    assert seen[0][0] < text.index("Beta")
+    assert json.loads(parser.text) == payload
+
+
+def test_item_stream_ignores_nested_plan_keys() -> None:
+    parser = PlanItemStream()
+
+    items = parser.feed('{"meta": {"plan": [{"task": "x"}]}, "plan": []}')
+
+    assert items == []
+
+
+def test_early_check_flags_overlap_and_deadline() -> None:
+    check = EarlyPlanCheck(_metadata("Leave by 10:30 AM"), _CURRENT_TIME)
+
+    first = check.add(PlanItem(**_item("Alpha", "09:00", "10:00", 60)))
+    second = check.add(PlanItem(**_item("Beta", "09:30", "11:00", 90)))
+
+    assert first == []
+    assert second == [
+        'Tasks "Alpha" and "Beta" overlap by 30 minutes.',
+        "'Leave by 10:30 AM' constraint not met (Task ends after 10:30 AM -0500).",
+    ]
+
+
+def test_early_check_ignores_sub_minute_overlap() -> None:
+    check = EarlyPlanCheck(_metadata(), _CURRENT_TIME)
+    first = _item("Alpha", "09:00", "10:00", 60)
+    first["end_time"] = "2025-01-18T10:00:30-05:00"
+
+    check.add(PlanItem(**first))
+    errors = check.add(PlanItem(**_item("Beta", "10:00", "11:00", 60)))
+
+    assert errors == []
+
+
+def test_early_check_flags_start_before_gate() -> None:
+    check = EarlyPlanCheck(_metadata("Busy until 10 AM"), _CURRENT_TIME)
+
+    errors = check.add(PlanItem(**_item("Alpha", "09:00", "10:00", 60)))
+
+    assert errors == [
+        "'Busy until 10 AM' constraint not met "
+        "(Task starts before 10:00 AM -0500)."
+    ]
+
+
+def test_streaming_generation_aborts_on_first_violation(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    payload = {
+        "plan": [
+            _item("Alpha", "09:00", "10:00", 60),
+            _item("Beta", "09:30", "10:30", 60),
+            _item("Gamma", "11:00", "12:00", 60),
+        ],
+        "assumptions": [],
+        "questions": [],
+    }
+    closed: list[bool] = []
+    monkeypatch.setattr(
+        llm, "get_client", lambda: _fake_stream_client(json.dumps(payload), closed)
+    )
+    check = EarlyPlanCheck(_metadata(), _CURRENT_TIME)
+
+    with pytest.raises(planner.PlanAborted) as excinfo:
+        asyncio.run(
+            planner.generate_plan_streaming(
+                "Alpha, Beta, Gamma", _metadata(), _CURRENT_TIME, "UTC", check=check.add
+            )
+        )
+
+    assert [item.task for item in excinfo.value.plan] == ["Alpha", "Beta"]
+    assert excinfo.value.errors == ['Tasks "Alpha" and "Beta" overlap by 30 minutes.']
+    assert closed == [True]
+
+
+def test_streaming_generation_returns_full_plan(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    payload = {
+        "plan": [_item("Alpha", "09:00", "10:00", 60)],
+        "assumptions": ["a", "b"],
+        "questions": ["q"],
+    }
+    closed: list[bool] = []
+    monkeypatch.setattr(
+        llm, "get_client", lambda: _fake_stream_client(json.dumps(payload), closed)
+    )
+
+    plan, assumptions, questions = asyncio.run(
+        planner.generate_plan_streaming("Alpha", _metadata(), _CURRENT_TIME, "UTC")
+    )
+
+    assert [item.task for item in plan] == ["Alpha"]
+    assert assumptions == ["a", "b"]
+    assert questions == ["q"]
+    assert closed == [True]
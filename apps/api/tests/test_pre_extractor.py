@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from planproof_api.agent.pre_extractor import pre_extract, supplement_constraints
+from planproof_api.agent.schemas import ExtractedMetadata
+
+
+def test_pre_extract_simple_context_is_confident() -> None:
+    result = pre_extract(
+        "Busy until 10 AM, then call Bob and review the Apollo deck. "
+        "Leave by 5 PM."
+    )
+
+    assert result.confidence == 1.0
+    assert result.metadata.temporal_constraints == [
+        "Busy until 10 AM",
+        "Leave by 5 PM",
+    ]
+    assert result.metadata.actionable_tasks == ["call Bob", "review the Apollo deck"]
+    assert result.metadata.ground_truth_entities == ["Bob", "Apollo"]
+
+
+def test_pre_extract_keeps_one_constraint_per_task() -> None:
+    result = pre_extract("Call Bob at 2 PM and email Alice at 2 PM.")
+
+    assert result.metadata.temporal_constraints == [
+        "Call Bob at 2 PM",
+        "email Alice at 2 PM",
+    ]
+    assert result.metadata.actionable_tasks == ["Call Bob", "email Alice"]
+
+
+def test_pre_extract_window_shares_meridiem() -> None:
+    result = pre_extract("Work from 4 to 6 PM on the Apollo report.")
+
+    assert result.metadata.temporal_constraints == [
+        "Work on the Apollo report from 4 PM to 6 PM"
+    ]
+    assert result.confidence == 1.0
+
+
+def test_pre_extract_ambiguous_context_is_not_confident() -> None:
+    assert pre_extract("Work from 4 to 6.").confidence < 0.8
+    assert pre_extract("Buy milk after lunch.").confidence < 0.8
+    assert pre_extract("Meeting with Sarah at 3pm.").confidence < 0.8
+    assert pre_extract("Call Bob at 2 PM.", max_chars=5).confidence == 0.0
+
+
+def test_supplement_constraints_adds_only_missed_times() -> None:
+    llm_result = ExtractedMetadata(
+        temporal_constraints=["Leave by 5 PM"],
+        actionable_tasks=["call Bob"],
+        ground_truth_entities=["Bob"],
+    )
+    rules = pre_extract("Busy until 10 AM. Call Bob. Leave by 5 PM.").metadata
+
+    merged = supplement_constraints(llm_result, rules)
+
+    assert merged.temporal_constraints == ["Leave by 5 PM", "Busy until 10 AM"]
+    assert merged.actionable_tasks == ["call Bob"]
+
+
+def test_pre_extract_window_start_flips_meridiem_when_needed() -> None:
+    result = pre_extract("Study from 11 to 1 PM.")
+
+    assert result.metadata.temporal_constraints == ["Study from 11 AM to 1 PM"]
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import openai
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from planproof_api.agent import llm, rate_limiter
+from planproof_api.agent.rate_limiter import (
+    LLMScheduler,
+    TokenBucket,
+    retry_after_seconds,
+)
+from planproof_api.agent.schemas import ExtractedMetadata
+from planproof_api.routes import router
+
+
+def _rate_limit_error(**headers: str) -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def test_token_bucket_refills_over_time() -> None:
+    now = [0.0]
+    bucket = TokenBucket(60, clock=lambda: now[0])
+
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    now[0] = 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    now[0] = 1.0
+    assert bucket.wait_time(1) == 0.0
+    assert TokenBucket(0, clock=lambda: 0.0).wait_time(10**9) == 0.0
+
+
+def test_retry_after_headers() -> None:
+    assert retry_after_seconds(_rate_limit_error(**{"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(_rate_limit_error(**{"retry-after": "3"})) == 3.0
+    reset = _rate_limit_error(
+        **{
+            "x-ratelimit-remaining-requests": "12",
+            "x-ratelimit-reset-requests": "1s",
+            "x-ratelimit-remaining-tokens": "0",
+            "x-ratelimit-reset-tokens": "6m0s",
+        }
+    )
+    assert retry_after_seconds(reset) == 360.0
+    assert retry_after_seconds(_rate_limit_error()) is None
+
+
+def test_backoff_then_priority_order() -> None:
+    scheduler = LLMScheduler(
+        requests_per_minute=0, tokens_per_minute=0, max_queue_depth=0
+    )
+    started: list[str] = []
+    failed_once: list[bool] = []
+
+    def job(name: str):
+        async def run() -> str:
+            started.append(name)
+            if name == "first" and not failed_once:
+                failed_once.append(True)
+                raise _rate_limit_error(**{"retry-after-ms": "50"})
+            return name
+
+        return run
+
+    async def submit(name: str, stage: str, lane: str) -> str:
+        with rate_limiter.lane(lane):
+            return await scheduler.call(job(name), stage=stage, tokens=10)
+
+    async def main() -> list[str]:
+        first = asyncio.create_task(submit("first", "generation", "interactive"))
+        await asyncio.sleep(0.01)
+        others = [
+            asyncio.create_task(submit("batch", "generation", "batch")),
+            asyncio.create_task(submit("repair", "repair", "interactive")),
+            asyncio.create_task(submit("second", "generation", "interactive")),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.admission_error() is None
+        assert scheduler.backoff_remaining() > 0
+        return await asyncio.gather(first, *others)
+
+    assert asyncio.run(main()) == ["first", "batch", "repair", "second"]
+    assert started == ["first", "first", "second", "repair", "batch"]
+    stats = scheduler.stats()
+    assert (stats.admitted, stats.rate_limited, stats.queued) == (5, 1, 0)
+
+
+def test_rate_limit_error_raised_after_retries() -> None:
+    scheduler = LLMScheduler(
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        max_queue_depth=0,
+        max_rate_limit_retries=1,
+    )
+    attempts: list[int] = []
+
+    async def always_limited() -> None:
+        attempts.append(1)
+        raise _rate_limit_error(**{"retry-after-ms": "1"})
+
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(scheduler.call(always_limited, stage="generation", tokens=1))
+    assert len(attempts) == 2
+
+
+def test_admission_rejects_when_queue_is_full() -> None:
+    scheduler = LLMScheduler(
+        requests_per_minute=1, tokens_per_minute=0, max_queue_depth=1
+    )
+
+    async def noop() -> str:
+        return "ok"
+
+    async def main() -> tuple[int, float] | None:
+        # The first call spends the only request token; the second waits.
+        await scheduler.call(noop, stage="generation", tokens=1)
+        waiting = asyncio.create_task(
+            scheduler.call(noop, stage="generation", tokens=1)
+        )
+        await asyncio.sleep(0)
+        rejection = scheduler.admission_error()
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        return rejection
+
+    status, retry_after = asyncio.run(main())
+    assert status == 503
+    assert retry_after >= 1.0
+    assert scheduler.queue_depth == 0
+
+
+def test_queue_wait_is_bounded() -> None:
+    scheduler = LLMScheduler(
+        requests_per_minute=1, tokens_per_minute=0, max_queue_depth=0
+    )
+
+    async def noop() -> str:
+        return "ok"
+
+    async def main() -> None:
+        await scheduler.call(noop, stage="generation", tokens=1)
+        await scheduler.call(
+            noop, stage="generation", tokens=1, max_wait=lambda: 0.01
+        )
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+
+
+def test_route_rejects_with_retry_after() -> None:
+    app = FastAPI()
+    app.include_router(router)
+
+    with patch.object(
+        rate_limiter.llm_scheduler, "admission_error", return_value=(429, 2.5)
+    ):
+        response = TestClient(app).post(
+            "/api/plan",
+            json={
+                "context": "Alpha",
+                "current_time": "2025-01-18T08:00:00-05:00",
+                "timezone": "UTC",
+                "variant": "v2_structured",
+            },
+        )
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3"
+
+
+@pytest.mark.parametrize(
+    "variant", ["v2_structured", "v4_fused", "v3_agentic_repair"]
+)
+def test_route_maps_rate_limited_generation_to_429(
+    monkeypatch: pytest.MonkeyPatch, variant: str
+) -> None:
+    scheduler = LLMScheduler(
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        max_queue_depth=0,
+        max_rate_limit_retries=0,
+    )
+
+    class _Completions:
+        @staticmethod
+        async def create(**kwargs: object) -> object:
+            raise _rate_limit_error(**{"retry-after": "7"})
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_Completions()))
+    monkeypatch.setattr(llm, "llm_scheduler", scheduler)
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+    metadata = ExtractedMetadata(
+        temporal_constraints=[], ground_truth_entities=[], actionable_tasks=["alpha"]
+    )
+    app = FastAPI()
+    app.include_router(router)
+
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata):
+        response = TestClient(app).post(
+            "/api/plan",
+            json={
+                "context": f"Alpha, rate limited during generation ({variant}).",
+                "current_time": "2025-01-18T08:00:00-05:00",
+                "timezone": "UTC",
+                "variant": variant,
+            },
+        )
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "7"
+
+
+def test_route_maps_rate_limited_extraction_to_429(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    scheduler = LLMScheduler(
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        max_queue_depth=0,
+        max_rate_limit_retries=0,
+    )
+
+    class _Completions:
+        @staticmethod
+        async def create(**kwargs: object) -> object:
+            raise _rate_limit_error(**{"retry-after": "4"})
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_Completions()))
+    monkeypatch.setattr(llm, "llm_scheduler", scheduler)
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+    app = FastAPI()
+    app.include_router(router)
+
+    response = TestClient(app).post(
+        "/api/plan",
+        json={
+            "context": "Alpha, rate limited during extraction.",
+            "current_time": "2025-01-18T08:00:00-05:00",
+            "timezone": "UTC",
+            "variant": "v2_structured",
+        },
+    )
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "4"
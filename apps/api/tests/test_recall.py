@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import pytest
+from thefuzz import fuzz, process
 
+import eval.recall as recall_module
 from planproof_api.agent.schemas import PlanItem
 
-from eval.recall import calculate_recall
+from eval.recall import calculate_recall, keyword_coverage
+from eval.recall_index import CandidateIndex
 
 
 def _item(task: str, why: str) -> PlanItem:
@@ -57,10 +60,10 @@ def test_calculate_recall_case_insensitive_match() -> None:
 
 
 def test_calculate_recall_threshold_boundary(monkeypatch) -> None:
-    def fake_extract_one(_: str, __: list[str], **___) -> tuple[str, int]:
-        return ("alpha", 74)
+    def fake_score_matrix(_: list[str], __: list[str], *___) -> list[list[int]]:
+        return [[74]]
 
-    monkeypatch.setattr("eval.recall.process.extractOne", fake_extract_one)
+    monkeypatch.setattr("eval.recall._score_matrix", fake_score_matrix)
 
     items = [_item("Alpha", "")]
 
@@ -68,10 +71,10 @@ def test_calculate_recall_threshold_boundary(monkeypatch) -> None:
 
 
 def test_calculate_recall_threshold_above(monkeypatch) -> None:
-    def fake_extract_one(_: str, __: list[str], **___) -> tuple[str, int]:
-        return ("alpha", 75)
+    def fake_score_matrix(_: list[str], __: list[str], *___) -> list[list[int]]:
+        return [[75]]
 
-    monkeypatch.setattr("eval.recall.process.extractOne", fake_extract_one)
+    monkeypatch.setattr("eval.recall._score_matrix", fake_score_matrix)
 
     items = [_item("Alpha", "")]
 
@@ -79,10 +82,10 @@ def test_calculate_recall_threshold_above(monkeypatch) -> None:
 
 
 def test_calculate_recall_synonym_match(monkeypatch) -> None:
-    def fake_extract_one(_: str, __: list[str], **___) -> tuple[str, int]:
-        return ("gym session", 76)
+    def fake_score_matrix(_: list[str], __: list[str], *___) -> list[list[int]]:
+        return [[76]]
 
-    monkeypatch.setattr("eval.recall.process.extractOne", fake_extract_one)
+    monkeypatch.setattr("eval.recall._score_matrix", fake_score_matrix)
 
     items = [_item("Gym session", "")]
 
@@ -100,3 +103,77 @@ def test_calculate_recall_perfect_matches() -> None:
     keywords = ["groceries", "trip"]
 
     assert calculate_recall(items, keywords) == 1.0
+
+
+def test_keyword_coverage_reports_matches_and_missing() -> None:
+    items = [_item("Write report", "draft the weekly report")]
+
+    coverage = keyword_coverage(items, ["report", "", "groceries"])
+
+    assert coverage.score == pytest.approx(0.5)
+    assert [(match.keyword, match.score) for match in coverage.matches] == [
+        ("report", 100)
+    ]
+    assert coverage.missing == ["groceries"]
+
+
+def test_keyword_coverage_without_candidates_marks_all_missing() -> None:
+    coverage = keyword_coverage([_item("", "")], ["report", "groceries"])
+
+    assert coverage.score == 0.0
+    assert coverage.missing == ["report", "groceries"]
+
+
+def test_keyword_coverage_scores_all_keywords_in_one_batch(monkeypatch) -> None:
+    calls: list[tuple[list[str], list[str]]] = []
+
+    def fake_score_matrix(
+        keywords: list[str], candidates: list[str], *_: object
+    ) -> list[list[int]]:
+        calls.append((list(keywords), list(candidates)))
+        return [[90, 10], [10, 80]]
+
+    monkeypatch.setattr("eval.recall._score_matrix", fake_score_matrix)
+
+    coverage = keyword_coverage([_item("Alpha", "Beta")], ["alpha", "beta"])
+
+    assert coverage.score == 1.0
+    assert calls == [(["alpha", "beta"], ["alpha", "beta"])]
+    assert [match.candidate for match in coverage.matches] == ["alpha", "beta"]
+
+
+def test_score_matrix_matches_thefuzz_extract_one() -> None:
+    candidates = ["write report", "draft the weekly report", "gym session"]
+    keywords = ["report", "weekly reports", "exercise", "gym"]
+
+    best = recall_module._best_per_row(
+        recall_module._score_matrix(keywords, candidates)
+    )
+
+    for keyword, (_, score) in zip(keywords, best):
+        expected = process.extractOne(
+            keyword, candidates, scorer=fuzz.token_set_ratio
+        )
+        assert score == expected[1]
+
+
+def test_keyword_coverage_prefilter_matches_full_matrix() -> None:
+    items = [
+        _item("Buy groceries", "pick up milk and eggs"),
+        _item("Write weekly report", "draft the report for Apollo"),
+        _item("Gym session", "short workout"),
+    ]
+    keywords = ["grocery", "reports", "apollo", "gym", "taxes"]
+
+    full = keyword_coverage(items, keywords)
+    filtered = keyword_coverage(items, keywords, prefilter=True)
+
+    assert filtered.score == full.score
+    assert filtered.missing == full.missing
+
+
+def test_candidate_index_skips_unrelated_candidates() -> None:
+    index = CandidateIndex(["buy groceries", "zzz qqq"], str.lower)
+
+    assert index.candidates_for("groceries") == {0}
+    assert index.candidates_for("grocerie") == {0}
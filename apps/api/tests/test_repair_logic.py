@@ -1,9 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+from types import SimpleNamespace
 from unittest.mock import patch
 
+import httpx
+import openai
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from planproof_api.agent import llm
+from planproof_api.agent.planner import PlanAborted
 from planproof_api.agent.schemas import ExtractedMetadata, PlanItem, PlanRequest
-from planproof_api.routes import create_plan
+from planproof_api.config import settings
+from planproof_api.routes import _run_plan_pipeline, create_plan, router
 
 
 def _item(task: str, start_time: str, end_time: str, minutes: int) -> PlanItem:
@@ -39,21 +50,54 @@ def test_repair_loop_success() -> None:
     ]
 
     with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
-        "planproof_api.routes.generate_plan"
-    ) as mock_generate:
+        "planproof_api.routes.solve_locally", return_value=None
+    ), patch("planproof_api.routes.generate_plan") as mock_generate:
         mock_generate.side_effect = [
             (failing_plan, ["assumed focus block"], ["Any other tasks?"]),
             (repaired_plan, ["assumed focus block"], ["Any other tasks?"]),
         ]
 
-        response = create_plan(request)
+        response = asyncio.run(create_plan(request))
 
     assert response.debug.repair_attempted is True
     assert response.debug.repair_success is True
+    assert response.debug.repair_mode == "llm"
     assert mock_generate.call_count == 2
     assert "repair_prompt" in mock_generate.call_args_list[1].kwargs
 
 
+def test_local_repair_skips_llm_round_trip() -> None:
+    request = PlanRequest(
+        context="Busy until 9 AM. Plan Alpha and Beta. Leave by 11 AM.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v3_agentic_repair",
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=["Busy until 9 AM", "Leave by 11 AM"],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+    failing_plan = [
+        _item("Alpha", "2025-01-18T08:30:00-05:00", "2025-01-18T09:30:00-05:00", 60),
+        _item("Beta", "2025-01-18T09:30:00-05:00", "2025-01-18T11:30:00-05:00", 120),
+    ]
+
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
+        "planproof_api.routes.generate_plan", return_value=(failing_plan, [], [])
+    ) as mock_generate:
+        response = asyncio.run(create_plan(request))
+
+    assert mock_generate.call_count == 1
+    assert response.validation.status == "pass"
+    assert response.debug.repair_attempted is True
+    assert response.debug.repair_success is True
+    assert response.debug.repair_mode == "local"
+    assert [item.task for item in response.plan] == ["Alpha", "Beta"]
+    assert response.plan[0].start_time == "2025-01-18T09:00:00-05:00"
+    assert response.plan[-1].end_time <= "2025-01-18T11:00:00-05:00"
+
+
 def test_repair_loop_not_needed() -> None:
     request = PlanRequest(
         context="Plan my day with Alpha.",
@@ -73,7 +117,7 @@ def test_repair_loop_not_needed() -> None:
     with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
         "planproof_api.routes.generate_plan", return_value=(passing_plan, [], [])
     ) as mock_generate:
-        response = create_plan(request)
+        response = asyncio.run(create_plan(request))
 
     assert response.debug.repair_attempted is False
     assert response.debug.repair_success is False
@@ -98,15 +142,389 @@ def test_repair_loop_failure() -> None:
     ]
 
     with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
-        "planproof_api.routes.generate_plan"
-    ) as mock_generate:
+        "planproof_api.routes.solve_locally", return_value=None
+    ), patch("planproof_api.routes.generate_plan") as mock_generate:
         mock_generate.side_effect = [
             (failing_plan, [], []),
             (failing_plan, [], []),
         ]
 
-        response = create_plan(request)
+        response = asyncio.run(create_plan(request))
 
     assert response.debug.repair_attempted is True
     assert response.debug.repair_success is False
     assert mock_generate.call_count == 2
+
+
+def test_plan_requests_run_concurrently() -> None:
+    request = PlanRequest(
+        context="Plan my day with Alpha.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v2_structured",
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=[],
+        ground_truth_entities=["alpha"],
+        actionable_tasks=["alpha"],
+    )
+    passing_plan = [
+        _item("Alpha", "2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00", 60),
+    ]
+
+    async def scenario() -> list:
+        in_flight = 0
+        both_started = asyncio.Event()
+
+        async def slow_generate(*_: object, **__: object):
+            nonlocal in_flight
+            in_flight += 1
+            if in_flight == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return passing_plan, [], []
+
+        with patch(
+            "planproof_api.routes.extract_metadata", return_value=metadata
+        ), patch("planproof_api.routes.generate_plan", side_effect=slow_generate):
+            return await asyncio.gather(create_plan(request), create_plan(request))
+
+    responses = asyncio.run(scenario())
+
+    assert [response.validation.status for response in responses] == ["pass", "pass"]
+
+
+def test_fused_variant_validates_single_call_output() -> None:
+    request = PlanRequest(
+        context="Plan my day with Alpha and Beta.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v4_fused",
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=[],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+    overlapping_plan = [
+        _item("Alpha", "2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00", 60),
+        _item("Beta", "2025-01-18T09:30:00-05:00", "2025-01-18T10:30:00-05:00", 60),
+    ]
+
+    with patch("planproof_api.routes.extract_metadata") as mock_extract, patch(
+        "planproof_api.routes.generate_plan"
+    ) as mock_generate, patch(
+        "planproof_api.routes.generate_fused",
+        return_value=(metadata, overlapping_plan, [], []),
+    ) as mock_fused:
+        response = asyncio.run(create_plan(request))
+
+    mock_extract.assert_not_called()
+    mock_generate.assert_not_called()
+    assert mock_fused.call_count == 1
+    assert response.extracted_metadata == metadata
+    assert response.validation.status == "fail"
+    assert response.validation.metrics.overlap_minutes == 30
+    assert response.debug.variant == "v4_fused"
+    assert response.debug.repair_attempted is False
+
+
+def test_scheduled_variant_skips_generation_call() -> None:
+    request = PlanRequest(
+        context="Alpha, then Beta. Leave by 11 AM.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v5_scheduled",
+        task_durations={"alpha": 60},
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=["Leave by 11 AM"],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
+        "planproof_api.routes.generate_plan"
+    ) as mock_generate:
+        response = asyncio.run(create_plan(request))
+
+    mock_generate.assert_not_called()
+    assert response.validation.status == "pass"
+    assert [item.timebox_minutes for item in response.plan] == [60, 30]
+    assert response.debug.variant == "v5_scheduled"
+
+
+def test_best_of_n_returns_first_passing_candidate() -> None:
+    request = PlanRequest(
+        context="Plan my day with Alpha and Beta.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v2_structured",
+        candidates=3,
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=[],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+    failing_plan = [
+        _item("Alpha", "2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00", 60),
+        _item("Beta", "2025-01-18T09:30:00-05:00", "2025-01-18T10:30:00-05:00", 60),
+    ]
+    passing_plan = [
+        _item("Alpha", "2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00", 60),
+        _item("Beta", "2025-01-18T10:00:00-05:00", "2025-01-18T11:00:00-05:00", 60),
+    ]
+    temperatures: list[float] = []
+    cancelled: list[float] = []
+
+    async def fake_generate(*_: object, temperature: float = 0, **__: object):
+        temperatures.append(temperature)
+        try:
+            if temperature == 0:
+                return failing_plan, [], []
+            if temperature == 0.4:
+                await asyncio.sleep(0.05)
+                return passing_plan, [], []
+            await asyncio.sleep(5)
+            return failing_plan, [], []
+        except asyncio.CancelledError:
+            cancelled.append(temperature)
+            raise
+
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
+        "planproof_api.routes.generate_plan", new=fake_generate
+    ):
+        response = asyncio.run(create_plan(request))
+
+    assert sorted(temperatures) == [0.0, 0.4, 0.7]
+    assert cancelled == [0.7]
+    assert response.validation.status == "pass"
+    assert response.plan[1].start_time == "2025-01-18T10:00:00-05:00"
+    assert response.debug.candidates_evaluated == 2
+
+
+def test_streaming_abort_goes_straight_to_repair(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    request = PlanRequest(
+        context="Plan my day with Alpha and Beta.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v3_agentic_repair",
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=[],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+    partial_plan = [
+        _item("Alpha", "2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00", 60),
+        _item("Beta", "2025-01-18T09:30:00-05:00", "2025-01-18T10:30:00-05:00", 60),
+    ]
+    monkeypatch.setattr(settings, "PLAN_STREAMING", True)
+
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
+        "planproof_api.routes.generate_plan"
+    ) as mock_generate, patch(
+        "planproof_api.routes.generate_plan_streaming",
+        side_effect=PlanAborted(partial_plan, ["overlap"]),
+    ) as mock_streaming:
+        response = asyncio.run(create_plan(request))
+
+    mock_generate.assert_not_called()
+    assert mock_streaming.call_args.kwargs["check"] is not None
+    assert response.debug.generation_aborted is True
+    assert response.debug.repair_mode == "local"
+    assert response.validation.status == "pass"
+
+
+def test_exhausted_budget_falls_back_to_scheduler() -> None:
+    request = PlanRequest(
+        context="Alpha, then Beta.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v2_structured",
+        latency_budget_ms=1,
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=[],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+
+    # Extraction fits in the budget and uses it up.
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
+        "planproof_api.routes.llm.budget_allows_call", side_effect=[True, False]
+    ), patch("planproof_api.routes.generate_plan") as mock_generate:
+        response = asyncio.run(create_plan(request))
+
+    mock_generate.assert_not_called()
+    assert [item.task for item in response.plan] == ["alpha", "beta"]
+    assert response.debug.latency_budget_ms == 1
+    assert response.debug.degraded == ["scheduled_fallback"]
+
+
+def test_llm_repair_skipped_when_budget_runs_out() -> None:
+    request = PlanRequest(
+        context="Plan my day with Alpha and Beta.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v3_agentic_repair",
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=[],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+    failing_plan = [
+        _item("Alpha", "2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00", 60),
+        _item("Beta", "2025-01-18T09:30:00-05:00", "2025-01-18T10:30:00-05:00", 60),
+    ]
+
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
+        "planproof_api.routes.solve_locally", return_value=None
+    ), patch(
+        "planproof_api.routes.llm.budget_allows_call", side_effect=[True, True, False]
+    ), patch(
+        "planproof_api.routes.generate_plan", return_value=(failing_plan, [], [])
+    ) as mock_generate:
+        response = asyncio.run(create_plan(request, x_latency_budget_ms=5000))
+
+    assert mock_generate.call_count == 1
+    assert response.validation.status == "fail"
+    assert response.debug.repair_attempted is True
+    assert response.debug.repair_mode is None
+    assert response.debug.latency_budget_ms == 5000
+    assert response.debug.degraded == ["repair_skipped"]
+
+
+def test_skipped_llm_repair_reports_the_local_attempt() -> None:
+    request = PlanRequest(
+        context="Plan my day with Alpha and Beta.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v3_agentic_repair",
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=[],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+    failing_plan = [
+        _item("Alpha", "2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00", 60),
+        _item("Beta", "2025-01-18T09:30:00-05:00", "2025-01-18T10:30:00-05:00", 60),
+    ]
+    events: list[tuple[str, dict]] = []
+
+    async def emit(event: str, data: dict) -> None:
+        events.append((event, data))
+
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
+        "planproof_api.routes.solve_locally", return_value=None
+    ), patch(
+        "planproof_api.routes.llm.budget_allows_call", side_effect=[True, True, False]
+    ), patch(
+        "planproof_api.routes.generate_plan", return_value=(failing_plan, [], [])
+    ):
+        asyncio.run(_run_plan_pipeline(request, emit, budget_ms=5000))
+
+    repairs = [data for event, data in events if event == "repair"]
+    assert repairs == [
+        {"mode": "local", "status": "started"},
+        {"mode": "local", "status": "fail"},
+    ]
+
+
+def test_extraction_timeout_under_budget_falls_back_to_rules(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[dict] = []
+
+    class _Completions:
+        @staticmethod
+        async def create(**kwargs: object) -> object:
+            calls.append(kwargs)
+            raise openai.APITimeoutError(
+                request=httpx.Request("POST", "https://api.openai.com/v1")
+            )
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_Completions()))
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+    monkeypatch.setattr(settings, "LLM_MIN_CALL_S", 0.05)
+    app = FastAPI()
+    app.include_router(router)
+
+    response = TestClient(app).post(
+        "/api/plan",
+        json={
+            "context": "Call Dana at 10 AM, then write the budget memo (timeout).",
+            "current_time": "2025-01-18T08:00:00-05:00",
+            "timezone": "America/New_York",
+            "variant": "v2_structured",
+        },
+        headers={"X-Latency-Budget-Ms": "300"},
+    )
+
+    assert response.status_code == 200
+    debug = response.json()["debug"]
+    assert debug["degraded"] == ["extraction_timeout", "scheduled_fallback"]
+    assert debug["variant"] == "v2_structured"
+    assert len(calls) == 1
+    assert response.json()["plan"]
+
+
+def test_generation_queue_timeout_falls_back_to_scheduler() -> None:
+    request = PlanRequest(
+        context="Alpha, then Beta.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v2_structured",
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=[],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
+        "planproof_api.routes._initial_planning_step",
+        side_effect=asyncio.TimeoutError(),
+    ):
+        response = asyncio.run(create_plan(request, x_latency_budget_ms=5000))
+
+    assert [item.task for item in response.plan] == ["alpha", "beta"]
+    assert response.debug.degraded == ["generation_timeout"]
+
+
+def test_repair_queue_timeout_keeps_the_unrepaired_plan() -> None:
+    request = PlanRequest(
+        context="Plan my day with Alpha and Beta.",
+        current_time="2025-01-18T08:00:00-05:00",
+        timezone="America/New_York",
+        variant="v3_agentic_repair",
+    )
+    metadata = ExtractedMetadata(
+        temporal_constraints=[],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+    failing_plan = [
+        _item("Alpha", "2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00", 60),
+        _item("Beta", "2025-01-18T09:30:00-05:00", "2025-01-18T10:30:00-05:00", 60),
+    ]
+
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
+        "planproof_api.routes.solve_locally", return_value=None
+    ), patch(
+        "planproof_api.routes._initial_planning_step",
+        return_value=(failing_plan, [], []),
+    ), patch(
+        "planproof_api.routes._repair_plan", side_effect=asyncio.TimeoutError()
+    ):
+        response = asyncio.run(create_plan(request))
+
+    assert response.validation.status == "fail"
+    assert response.debug.repair_mode == "llm"
+    assert response.debug.repair_success is False
+    assert response.debug.degraded == ["repair_timeout"]
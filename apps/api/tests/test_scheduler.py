@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from eval.constraints import check_constraints
+from eval.time_math import find_overlaps
+from planproof_api.agent.scheduler import schedule_plan
+from planproof_api.agent.schemas import ExtractedMetadata
+
+_NOW = "2025-01-18T08:00:00-05:00"
+_TZ = "America/New_York"
+
+
+def _metadata(tasks: list[str], constraints: list[str]) -> ExtractedMetadata:
+    return ExtractedMetadata(
+        temporal_constraints=constraints,
+        ground_truth_entities=[],
+        actionable_tasks=tasks,
+    )
+
+
+def _times(plan: list) -> list[tuple[str, str, str]]:
+    return [(item.task, item.start_time[11:16], item.end_time[11:16]) for item in plan]
+
+
+def test_scheduler_respects_gate_fixed_point_and_priorities() -> None:
+    context = "Busy until 9 AM. Call Bob at 10 AM. Write report, review PRs."
+    metadata = _metadata(
+        ["call Bob", "write report", "review PRs"],
+        ["Busy until 9 AM", "10 AM"],
+    )
+
+    plan, assumptions, questions = schedule_plan(
+        context,
+        metadata,
+        _NOW,
+        _TZ,
+        durations={"Write report": 60, "review prs": 45},
+        priorities={"review PRs": 2},
+    )
+
+    assert _times(plan) == [
+        ("review PRs", "09:00", "09:45"),
+        ("call Bob", "10:00", "10:30"),
+        ("write report", "10:30", "11:30"),
+    ]
+    assert plan[1].why == 'Starts at 10:00 AM as requested ("10 AM").'
+    assert plan[0].why == "Earliest free 45-minute slot (priority 2)."
+    assert questions == []
+    assert assumptions[0] == 'Scheduling starts at 9:00 AM, after "Busy until 9 AM".'
+    violations, _ = check_constraints(plan, metadata.temporal_constraints, _NOW)
+    assert violations == 0
+
+
+def test_scheduler_reports_tasks_past_deadline() -> None:
+    metadata = _metadata(["alpha", "beta"], ["Leave by 9 AM"])
+
+    plan, _, questions = schedule_plan(
+        "alpha, beta", metadata, _NOW, _TZ, durations={"alpha": 45, "beta": 30}
+    )
+
+    assert _times(plan) == [("alpha", "08:00", "08:45")]
+    assert len(questions) == 1
+    assert questions[0].startswith('"beta" (30 min) did not fit before 9:00 AM.')
+
+
+def test_scheduler_handles_many_tasks_without_overlap() -> None:
+    tasks = [f"task {n}" for n in range(300)]
+    metadata = _metadata(tasks, ["Busy until 9 AM", "12 PM", "from 2 PM to 3 PM"])
+
+    plan, _, questions = schedule_plan(
+        " ".join(tasks),
+        metadata,
+        _NOW,
+        _TZ,
+        durations={name: 5 for name in tasks},
+        priorities={"task 299": 10},
+    )
+
+    assert len(plan) == 300
+    assert questions == []
+    assert find_overlaps(plan) == []
+    assert plan[0].task == "task 299"
+
+
+def test_scheduler_keeps_shifted_pins_apart() -> None:
+    context = "Gym at 9 AM, call at 9:30 AM, email at 9:45 AM."
+    metadata = _metadata(["gym", "call", "email"], ["9 AM", "9:30 AM", "9:45 AM"])
+
+    plan, _, questions = schedule_plan(
+        context, metadata, _NOW, _TZ, durations={"gym": 60, "call": 30, "email": 30}
+    )
+
+    # The email pin would have to move 45 minutes, past the shift limit.
+    assert _times(plan) == [
+        ("email", "08:00", "08:30"),
+        ("gym", "09:00", "10:00"),
+        ("call", "10:00", "10:30"),
+    ]
+    assert questions == [
+        '"9:45 AM" could not be kept; should another task move instead?'
+    ]
+    assert find_overlaps(plan) == []
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from planproof_api.agent import extractor, llm
+from planproof_api.agent.cache import extraction_cache
+from planproof_api.agent.singleflight import SingleFlight, llm_flight
+from planproof_api.routes import router
+
+
+def test_concurrent_calls_share_one_upstream_call() -> None:
+    flight = SingleFlight()
+    calls: list[str] = []
+
+    async def fetch() -> str:
+        calls.append("fetch")
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main() -> list[str]:
+        return await asyncio.gather(*(flight.do("key", fetch) for _ in range(3)))
+
+    assert asyncio.run(main()) == ["result"] * 3
+    assert calls == ["fetch"]
+    stats = flight.stats()
+    assert (stats.calls, stats.coalesced, stats.in_flight) == (1, 2, 0)
+
+
+def test_errors_reach_every_waiter_and_are_not_cached() -> None:
+    flight = SingleFlight()
+    attempts: list[int] = []
+
+    async def fetch() -> str:
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "recovered"
+
+    async def main() -> tuple[list[object], str]:
+        failed = await asyncio.gather(
+            flight.do("key", fetch), flight.do("key", fetch), return_exceptions=True
+        )
+        return failed, await flight.do("key", fetch)
+
+    failed, retried = asyncio.run(main())
+
+    assert [str(error) for error in failed] == ["upstream down"] * 2
+    assert retried == "recovered"
+    assert len(attempts) == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call() -> None:
+    flight = SingleFlight()
+
+    async def fetch() -> str:
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def main() -> str:
+        first = asyncio.create_task(flight.do("key", fetch))
+        second = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "result"
+
+
+def test_upstream_call_cancelled_when_every_waiter_leaves() -> None:
+    flight = SingleFlight()
+    cancelled: list[bool] = []
+
+    async def fetch() -> str:
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "result"
+
+    async def main() -> None:
+        waiter = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+
+    assert cancelled == [True]
+    assert flight.stats().in_flight == 0
+
+
+def test_waiter_timeout_only_bounds_that_waiter() -> None:
+    flight = SingleFlight()
+
+    async def fetch() -> str:
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main() -> str:
+        patient = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do("key", fetch, timeout=0.01)
+        return await patient
+
+    assert asyncio.run(main()) == "result"
+    assert flight.stats().coalesced == 1
+
+
+def test_calls_under_different_budgets_are_not_joined() -> None:
+    started: list[float | None] = []
+
+    async def fetch() -> str:
+        started.append(llm.remaining_budget())
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def call(budget_ms: int | None) -> str:
+        with llm.latency_budget(budget_ms):
+            return await llm.coalesced("budget-test", fetch)
+
+    async def main() -> list[str]:
+        return await asyncio.gather(call(None), call(5000), call(60_000))
+
+    assert asyncio.run(main()) == ["result"] * 3
+    # Each call ran under its own deadline, not the first caller's.
+    assert started[0] is None
+    assert sorted(remaining for remaining in started[1:]) == [
+        pytest.approx(5, abs=0.5),
+        pytest.approx(60, abs=0.5),
+    ]
+
+
+def test_identical_extractions_are_coalesced(monkeypatch: pytest.MonkeyPatch) -> None:
+    extraction_cache.clear()
+    calls: list[dict] = []
+    payload = {
+        "temporal_constraints": ["Leave by 5 PM"],
+        "ground_truth_entities": ["Bob"],
+        "actionable_tasks": ["call Bob"],
+    }
+
+    class _Completions:
+        @staticmethod
+        async def create(**kwargs: object) -> object:
+            calls.append(kwargs)
+            await asyncio.sleep(0.01)
+            message = SimpleNamespace(content=json.dumps(payload))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_Completions()))
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+    context = "Call Bob before I leave by 5 PM (single-flight test)."
+
+    async def main() -> list[object]:
+        return await asyncio.gather(
+            extractor.extract_metadata(context), extractor.extract_metadata(context)
+        )
+
+    llm_flight.clear()
+    first, second = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert first == second
+    app = FastAPI()
+    app.include_router(router)
+    stats = TestClient(app).get("/api/llm/stats").json()
+    assert stats["coalescing"] == {"calls": 1, "coalesced": 1, "in_flight": 0}
+    assert stats["scheduler"]["admitted"] >= 1
+    assert stats["extraction_cache"]["misses"] >= 1
+    extraction_cache.clear()
+
+
+def test_caller_after_last_waiter_leaves_starts_a_new_call() -> None:
+    flight = SingleFlight()
+    calls: list[int] = []
+
+    async def fetch() -> str:
+        calls.append(1)
+        try:
+            await asyncio.sleep(0.02)
+        except asyncio.CancelledError:
+            # Wind down slowly so a new caller arrives before the task ends.
+            await asyncio.sleep(0.01)
+            raise
+        return "result"
+
+    async def main() -> str:
+        leaving = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await flight.do("key", fetch)
+
+    assert asyncio.run(main()) == "result"
+    assert len(calls) == 2
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from planproof_api.agent.schemas import ExtractedMetadata, PlanItem
+from planproof_api.agent.solver import solve_locally
+
+_NOW = "2025-01-18T08:00:00-05:00"
+
+
+def _item(task: str, start_time: str, end_time: str, minutes: int) -> PlanItem:
+    return PlanItem(
+        task=task,
+        start_time=start_time,
+        end_time=end_time,
+        timebox_minutes=minutes,
+        why="",
+    )
+
+
+def _metadata(*constraints: str) -> ExtractedMetadata:
+    return ExtractedMetadata(
+        temporal_constraints=list(constraints),
+        ground_truth_entities=[],
+        actionable_tasks=[],
+    )
+
+
+def _times(plan: list[PlanItem]) -> list[tuple[str, str, str]]:
+    return [(item.task, item.start_time[11:16], item.end_time[11:16]) for item in plan]
+
+
+def test_solver_shifts_overlapping_items() -> None:
+    plan = [
+        _item("Alpha", "2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00", 60),
+        _item("Beta", "2025-01-18T09:30:00-05:00", "2025-01-18T10:30:00-05:00", 60),
+    ]
+
+    solved = solve_locally(plan, _metadata(), _NOW)
+
+    assert _times(solved) == [("Alpha", "09:00", "10:00"), ("Beta", "10:00", "11:00")]
+    assert [item.timebox_minutes for item in solved] == [60, 60]
+
+
+def test_solver_keeps_fixed_points_and_shrinks_to_deadline() -> None:
+    plan = [
+        _item("Focus", "2025-01-18T09:00:00-05:00", "2025-01-18T11:00:00-05:00", 120),
+        _item("Call Bob", "2025-01-18T10:00:00-05:00", "2025-01-18T10:30:00-05:00", 30),
+        _item("Email", "2025-01-18T11:00:00-05:00", "2025-01-18T12:00:00-05:00", 60),
+    ]
+
+    solved = solve_locally(
+        plan,
+        _metadata("Busy until 9 AM", "Call Bob at 10 AM", "Leave by 11 AM"),
+        _NOW,
+    )
+
+    times = _times(solved)
+    assert times[1] == ("Call Bob", "10:00", "10:30")
+    assert times[0][1] == "09:00"
+    assert all(end <= "11:00" for _, _, end in times)
+    assert all(item.timebox_minutes >= 5 for item in solved)
+    assert times == [
+        ("Focus", "09:00", "10:00"),
+        ("Call Bob", "10:00", "10:30"),
+        ("Email", "10:30", "11:00"),
+    ]
+
+
+def test_solver_gives_up_when_tasks_cannot_fit() -> None:
+    plan = [
+        _item(f"Task {n}", "2025-01-18T09:00:00-05:00", "2025-01-18T09:30:00-05:00", 30)
+        for n in range(4)
+    ]
+
+    solved = solve_locally(
+        plan, _metadata("Busy until 9 AM", "Leave by 9:15 AM"), _NOW
+    )
+
+    assert solved is None
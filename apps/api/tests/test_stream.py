@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from planproof_api.agent.schemas import ExtractedMetadata, PlanItem
+from planproof_api.routes import router
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_emits_stages_then_final_response() -> None:
+    app = FastAPI()
+    app.include_router(router)
+    metadata = ExtractedMetadata(
+        temporal_constraints=[],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+    failing_plan = [
+        PlanItem(
+            task="Alpha",
+            start_time="2025-01-18T09:00:00-05:00",
+            end_time="2025-01-18T10:00:00-05:00",
+            timebox_minutes=60,
+            why="",
+        ),
+        PlanItem(
+            task="Beta",
+            start_time="2025-01-18T09:30:00-05:00",
+            end_time="2025-01-18T10:30:00-05:00",
+            timebox_minutes=60,
+            why="",
+        ),
+    ]
+
+    with patch("planproof_api.routes.extract_metadata", return_value=metadata), patch(
+        "planproof_api.routes.generate_plan",
+        return_value=(failing_plan, ["assumed"], []),
+    ):
+        response = TestClient(app).post(
+            "/api/plan/stream",
+            json={
+                "context": "Plan my day with Alpha and Beta.",
+                "current_time": "2025-01-18T08:00:00-05:00",
+                "timezone": "America/New_York",
+                "variant": "v3_agentic_repair",
+            },
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    names = [name for name, _ in events]
+    assert names[:3] == ["metadata", "draft", "validation"]
+    assert events[1][1]["plan"][0]["task"] == "Alpha"
+    assert events[2][1]["status"] == "fail"
+    assert ("repair", {"mode": "local", "status": "started"}) in events
+    assert names[-1] == "final"
+    final = events[-1][1]
+    assert final["validation"]["status"] == "pass"
+    assert final["debug"]["repair_mode"] == "local"
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from dateutil.parser import isoparse
+
 from planproof_api.agent.schemas import PlanItem
 
-from eval.time_math import calculate_overlaps
+from eval.time_math import calculate_overlaps, find_overlaps
 
 
 def _item(start_time: str, end_time: str) -> PlanItem:
@@ -69,3 +71,50 @@ def test_calculate_overlaps_different_timezones() -> None:
     ]
 
     assert calculate_overlaps(items) == 30
+
+
+def test_calculate_overlaps_union_counts_shared_minutes_once() -> None:
+    items = [
+        _item("2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00"),
+        _item("2025-01-18T09:30:00-05:00", "2025-01-18T10:30:00-05:00"),
+        _item("2025-01-18T09:45:00-05:00", "2025-01-18T10:15:00-05:00"),
+    ]
+
+    assert calculate_overlaps(items, mode="union") == 45
+
+
+def test_find_overlaps_lists_colliding_pairs() -> None:
+    items = [
+        _item("2025-01-18T11:00:00-05:00", "2025-01-18T12:00:00-05:00"),
+        _item("2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00"),
+        _item("2025-01-18T09:30:00-05:00", "2025-01-18T11:30:00-05:00"),
+    ]
+
+    pairs = find_overlaps(items)
+
+    assert [(pair.first, pair.second, pair.minutes) for pair in pairs] == [
+        (1, 2, 30),
+        (2, 0, 30),
+    ]
+
+
+def test_calculate_overlaps_matches_pairwise_reference() -> None:
+    items = [
+        _item(
+            f"2025-01-18T{9 + offset % 5:02d}:{(offset * 7) % 60:02d}:30-05:00",
+            f"2025-01-18T{10 + offset % 4:02d}:{(offset * 11) % 60:02d}:00-05:00",
+        )
+        for offset in range(40)
+    ]
+
+    intervals = [(isoparse(item.start_time), isoparse(item.end_time)) for item in items]
+    intervals = [(start, end) for start, end in intervals if start < end]
+    expected = 0
+    for i, (first_start, first_end) in enumerate(intervals):
+        for second_start, second_end in intervals[i + 1 :]:
+            start = max(first_start, second_start)
+            end = min(first_end, second_end)
+            if start < end:
+                expected += (end - start).total_seconds() // 60
+
+    assert calculate_overlaps(items) == expected
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from dateutil import tz
+
+from planproof_api.agent.schemas import ExtractedMetadata, PlanItem
+from planproof_api.routes import _validate_plan
+
+import eval.timeline as timeline
+from eval.constraints import check_constraints
+from eval.feasibility import check_feasibility
+from eval.time_math import calculate_overlaps
+from eval.timeline import parse_plan
+
+
+def _item(start_time: str, end_time: str, task: str = "Test task") -> PlanItem:
+    return PlanItem(
+        task=task,
+        start_time=start_time,
+        end_time=end_time,
+        timebox_minutes=60,
+        why="Test",
+    )
+
+
+def test_parse_plan_keeps_order_and_epoch_minutes() -> None:
+    items = [
+        _item("2025-01-18T10:00:00-05:00", "2025-01-18T11:00:00-05:00"),
+        _item("2025-01-18T09:00:00-05:00", "2025-01-18T09:30:00-05:00"),
+    ]
+
+    parsed = parse_plan(items)
+
+    assert [entry.index for entry in parsed] == [0, 1]
+    assert parsed[0].duration_minutes == 60
+    assert parsed[1].start_minute < parsed[0].start_minute
+
+
+def test_parse_plan_localizes_naive_timestamps() -> None:
+    local_tz = tz.gettz("America/New_York")
+    parsed = parse_plan(
+        [_item("2025-01-18T09:00:00", "2025-01-18T10:00:00")], local_tz
+    )
+
+    assert parsed[0].start.tzinfo is local_tz
+    assert parsed[0].start.utcoffset().total_seconds() == -5 * 3600
+
+
+def test_validators_accept_parsed_plan() -> None:
+    items = [
+        _item("2025-01-18T09:00:00-05:00", "2025-01-18T13:30:00-05:00"),
+        _item("2025-01-18T09:30:00-05:00", "2025-01-18T10:30:00-05:00"),
+    ]
+    parsed = parse_plan(items)
+    constraints = ["Busy until 10 AM"]
+    now = "2025-01-18T08:00:00-05:00"
+
+    assert calculate_overlaps(parsed) == calculate_overlaps(items)
+    assert check_feasibility(parsed) == check_feasibility(items)
+    assert check_constraints(parsed, constraints, now) == check_constraints(
+        items, constraints, now
+    )
+
+
+def test_validate_plan_parses_each_timestamp_once(monkeypatch) -> None:
+    calls: list[str] = []
+    original = timeline.isoparse
+
+    def counting_isoparse(value: str):
+        calls.append(value)
+        return original(value)
+
+    monkeypatch.setattr(timeline, "isoparse", counting_isoparse)
+    items = [
+        _item("2025-01-18T09:00:00-05:00", "2025-01-18T10:00:00-05:00", "Alpha"),
+        _item("2025-01-18T10:00:00-05:00", "2025-01-18T11:00:00-05:00", "Beta"),
+    ]
+    metadata = ExtractedMetadata(
+        temporal_constraints=["Busy until 9 AM", "Leave by 5 PM"],
+        ground_truth_entities=["alpha", "beta"],
+        actionable_tasks=["alpha", "beta"],
+    )
+
+    validation = _validate_plan(
+        parse_plan(items), metadata, "2025-01-18T08:00:00-05:00"
+    )
+
+    assert validation.status == "pass"
+    assert len(calls) == 4
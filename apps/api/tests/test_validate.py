@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from planproof_api import routes
+from planproof_api.routes import router
+
+
+def _item(task: str, start: str, end: str, minutes: int) -> dict:
+    return {
+        "task": task,
+        "start_time": f"2025-01-18T{start}:00-05:00",
+        "end_time": f"2025-01-18T{end}:00-05:00",
+        "timebox_minutes": minutes,
+        "why": "",
+    }
+
+
+def _body(*plan: dict) -> dict:
+    return {
+        "plan": list(plan),
+        "extracted_metadata": {
+            "temporal_constraints": ["Meeting at 9 AM"],
+            "ground_truth_entities": ["Meeting", "Email"],
+            "actionable_tasks": ["meeting", "email"],
+        },
+        "current_time": "2025-01-18T08:00:00-05:00",
+        "timezone": "America/New_York",
+    }
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_validate_passes_clean_plan_without_debug_output(
+    client: TestClient, capsys: pytest.CaptureFixture[str]
+) -> None:
+    response = client.post(
+        "/api/validate",
+        json=_body(
+            _item("Meeting", "09:00", "10:00", 60),
+            # timebox_minutes is recomputed from the times.
+            _item("Email", "10:00", "10:30", 15),
+        ),
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["validation"]["status"] == "pass"
+    assert data["confidence"] == "high"
+    assert [item["timebox_minutes"] for item in data["plan"]] == [60, 30]
+    assert "DEBUG" not in capsys.readouterr().out
+
+
+def test_validate_reports_missing_keyword_without_debug_output(
+    client: TestClient, capsys: pytest.CaptureFixture[str]
+) -> None:
+    body = _body(_item("Meeting", "09:00", "10:00", 60))
+    body["extracted_metadata"]["actionable_tasks"] = ["meeting", "write report"]
+
+    response = client.post("/api/validate", json=body)
+
+    assert response.status_code == 200
+    assert "Missing keywords: write report" in response.json()["validation"]["errors"]
+    assert "DEBUG" not in capsys.readouterr().out
+
+
+def test_validate_lists_only_whole_minute_overlaps(client: TestClient) -> None:
+    meeting = _item("Meeting", "09:00", "10:00", 60)
+    meeting["end_time"] = "2025-01-18T10:00:30-05:00"
+    body = _body(
+        meeting,
+        _item("Email", "10:00", "10:30", 30),
+        _item("Email", "10:20", "10:40", 20),
+    )
+
+    response = client.post("/api/validate", json=body)
+
+    errors = response.json()["validation"]["errors"]
+    assert "overlap_minutes > 0" in errors
+    assert [error for error in errors if "overlap by" in error] == [
+        'Tasks "Email" and "Email" overlap by 10 minutes.'
+    ]
+
+
+def test_validate_reads_naive_times_as_utc_for_unknown_timezone(
+    client: TestClient,
+) -> None:
+    body = _body(_item("Meeting", "09:00", "10:00", 60))
+    body["current_time"] = "2025-01-18T13:00:00"
+    body["timezone"] = "Mars/Olympus_Mons"
+
+    response = client.post("/api/validate", json=body)
+
+    assert response.status_code == 200
+    assert response.json()["validation"]["metrics"]["constraint_violation_count"] == 0
+
+
+def test_validate_reports_overlap(client: TestClient) -> None:
+    response = client.post(
+        "/api/validate",
+        json=_body(
+            _item("Meeting", "09:00", "10:00", 60),
+            _item("Email", "09:30", "10:30", 60),
+        ),
+    )
+
+    validation = response.json()["validation"]
+    assert validation["status"] == "fail"
+    assert validation["metrics"]["overlap_minutes"] == 30
+
+
+def test_validate_bulk_streams_results_in_order(client: TestClient) -> None:
+    lines = [
+        json.dumps(_body(_item("Meeting", "09:00", "10:00", 60))),
+        "{not json",
+        json.dumps(_body(_item("Meeting", "11:00", "12:00", 60))),
+    ]
+
+    response = client.post("/api/validate/bulk", content="\n".join(lines))
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert results[0]["result"]["validation"]["status"] == "fail"
+    assert results[1]["result"] is None
+    assert results[1]["error"]
+    assert results[2]["result"]["validation"]["metrics"][
+        "constraint_violation_count"
+    ] == 1
+
+
+def test_validate_bulk_keeps_going_after_a_failing_line(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    run_checks = routes._run_checks
+    calls = 0
+
+    def flaky_checks(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise TypeError("can't compare offset-naive and offset-aware datetimes")
+        return run_checks(*args, **kwargs)
+
+    monkeypatch.setattr(routes, "_run_checks", flaky_checks)
+    line = json.dumps(_body(_item("Meeting", "09:00", "10:00", 60)))
+
+    response = client.post("/api/validate/bulk", content=f"{line}\n{line}")
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["index"] for result in results] == [0, 1]
+    assert results[0]["error"].startswith("can't compare")
+    assert results[1]["error"] is None
+    assert results[1]["result"]["plan"][0]["task"] == "Meeting"
+
+
+def test_validate_rejects_times_the_checks_cannot_parse(client: TestClient) -> None:
+    body = _body(_item("Meeting", "09:00", "10:00", 60))
+    body["plan"][0]["start_time"] = "2025-01-18T09:00:00 -05:00"
+
+    response = client.post("/api/validate", json=body)
+
+    assert response.status_code == 422
+
+
+def test_validate_bulk_reads_lines_split_across_chunks(client: TestClient) -> None:
+    payload = "\n".join(
+        json.dumps(_body(_item("Meeting", start, end, 60)))
+        for start, end in (("09:00", "10:00"), ("11:00", "12:00"))
+    ).encode()
+
+    def chunks():
+        for offset in range(0, len(payload), 97):
+            yield payload[offset : offset + 97]
+
+    response = client.post("/api/validate/bulk", content=chunks())
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["index"] for result in results] == [0, 1]
+    assert all(result["error"] is None for result in results)
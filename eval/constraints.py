@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import re
-from datetime import datetime
-from typing import List, TYPE_CHECKING
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+from typing import List, Literal, NamedTuple, Sequence, Union
 
-from dateutil.parser import isoparse
+from eval.timeline import PlanLike, ensure_parsed, parse_time
 
-if TYPE_CHECKING:
-    from planproof_api.agent.schemas import PlanItem
+ConstraintKind = Literal["deadline", "start_gate", "fixed_point", "window"]
 
-_TIME_PATTERN = re.compile(
+_MATCH_TOLERANCE = timedelta(minutes=5)
+
+# Any fixed date works: compiled constraints only keep the time of day.
+CLOCK_BASE = datetime(2000, 1, 1)
+
+TIME_PATTERN = re.compile(
     r"\b(?:[01]?\d|2[0-3])(?::[0-5]\d)?\s?(?:am|pm)\b"
     r"|\b(?:[01]?\d|2[0-3]):[0-5]\d\b",
     re.IGNORECASE,
@@ -17,14 +22,14 @@ _TIME_PATTERN = re.compile(
 
 
 def _extract_times(text: str) -> list[str]:
-    return [match.group(0) for match in _TIME_PATTERN.finditer(text)]
+    return [match.group(0) for match in TIME_PATTERN.finditer(text)]
 
 
 def _default_date(reference: datetime) -> datetime:
     return reference.replace(hour=0, minute=0, second=0, microsecond=0)
 
 
-def _parse_time_token(token: str, default_dt: datetime) -> datetime | None:
+def parse_time_token(token: str, default_dt: datetime) -> datetime | None:
     cleaned = token.strip().lower()
     if not cleaned:
         return None
@@ -53,13 +58,13 @@ def _parse_time_token(token: str, default_dt: datetime) -> datetime | None:
     return None
 
 
-def _format_time(value: datetime) -> str:
+def format_time(value: datetime) -> str:
     time_value = value.strftime("%I:%M %p").lstrip("0")
     tz_label = value.tzname() or value.strftime("%z")
     return f"{time_value} {tz_label}".strip()
 
 
-def _align_timezone(value: datetime, reference: datetime) -> datetime:
+def align_timezone(value: datetime, reference: datetime) -> datetime:
     if reference.tzinfo is None:
         return value
     if value.tzinfo is None:
@@ -67,7 +72,7 @@ def _align_timezone(value: datetime, reference: datetime) -> datetime:
     return value.astimezone(reference.tzinfo)
 
 
-def _categorize_constraint(text: str) -> str:
+def categorize_constraint(text: str) -> ConstraintKind:
     lowered = text.lower()
     if any(token in lowered for token in ["by", "before", "no later than"]):
         return "deadline"
@@ -78,11 +83,215 @@ def _categorize_constraint(text: str) -> str:
     return "fixed_point"
 
 
+class TemporalConstraint(NamedTuple):
+    """A constraint string compiled once into its kind and times of day.
+
+    ``category`` is the keyword classification used for the earliest
+    deadline / latest start gate; ``kind`` additionally promotes
+    "from X to Y" phrasing to a window. ``at`` is the first parseable time
+    token. A window whose bounds did not parse keeps ``kind="window"`` with
+    empty bounds and is skipped by ``check_constraints``.
+    """
+
+    text: str
+    category: ConstraintKind
+    kind: ConstraintKind
+    has_times: bool
+    token: str | None
+    at: time | None
+    window_start: time | None
+    window_end: time | None
+
+
+class ResolvedConstraint(NamedTuple):
+    constraint: TemporalConstraint
+    at: datetime | None
+    window_start: datetime | None
+    window_end: datetime | None
+
+
+def _clock_time(token: str) -> time | None:
+    try:
+        parsed = parse_time_token(token, CLOCK_BASE)
+    except (ValueError, TypeError):
+        return None
+    return parsed.time() if parsed is not None else None
+
+
+def compile_constraint(text: str | None) -> TemporalConstraint:
+    constraint_text = text or ""
+    times = _extract_times(constraint_text)
+    category = categorize_constraint(constraint_text)
+    lowered = constraint_text.lower()
+    kind: ConstraintKind = category
+    if "from" in lowered and "to" in lowered and len(times) >= 2:
+        kind = "window"
+
+    token = None
+    at = None
+    for time_token in times:
+        parsed = _clock_time(time_token)
+        if parsed is None:
+            continue
+        token = time_token
+        at = parsed
+        break
+
+    window_start = None
+    window_end = None
+    if kind == "window":
+        window_start = _clock_time(times[0])
+        window_end = _clock_time(times[1])
+        if window_start is None or window_end is None:
+            window_start = window_end = None
+
+    return TemporalConstraint(
+        text=constraint_text,
+        category=category,
+        kind=kind,
+        has_times=bool(times),
+        token=token,
+        at=at,
+        window_start=window_start,
+        window_end=window_end,
+    )
+
+
+def compile_constraints(temporal_constraints: Sequence[str]) -> list[TemporalConstraint]:
+    return [compile_constraint(text) for text in temporal_constraints]
+
+
+ConstraintsLike = Union[Sequence[str], Sequence[TemporalConstraint]]
+
+
+def _ensure_compiled(temporal_constraints: ConstraintsLike) -> list[TemporalConstraint]:
+    return [
+        value if isinstance(value, TemporalConstraint) else compile_constraint(value)
+        for value in temporal_constraints
+    ]
+
+
+def _on_day(
+    value: time | None, default_dt: datetime, reference: datetime | None
+) -> datetime | None:
+    if value is None:
+        return None
+    resolved = default_dt.replace(
+        hour=value.hour, minute=value.minute, second=0, microsecond=0
+    )
+    if reference is None:
+        return resolved
+    return align_timezone(resolved, reference)
+
+
+def resolve_constraints(
+    temporal_constraints: ConstraintsLike,
+    current_time: str | datetime,
+    reference: datetime | None = None,
+) -> list[ResolvedConstraint]:
+    """Anchor compiled constraints to the local day of ``current_time``.
+
+    ``reference`` (normally the first plan item's start) supplies the
+    timezone the times are expressed in, matching ``check_constraints``.
+    """
+    if isinstance(current_time, str):
+        current_time = parse_time(current_time)
+    if reference is not None:
+        current_time = align_timezone(current_time, reference)
+    default_dt = _default_date(current_time)
+    return [
+        ResolvedConstraint(
+            constraint=constraint,
+            at=_on_day(constraint.at, default_dt, reference),
+            window_start=_on_day(constraint.window_start, default_dt, reference),
+            window_end=_on_day(constraint.window_end, default_dt, reference),
+        )
+        for constraint in _ensure_compiled(temporal_constraints)
+    ]
+
+
+class _StartIndex:
+    """Plan items sorted by start time for bisect lookups.
+
+    Lookups return the lowest original index among the candidates so that
+    fixed points claim the same items as a front-to-back scan would.
+    Claimed items are skipped through a path-compressed "next unclaimed"
+    table, so a lookup costs O(log N + k) for the k unclaimed items that
+    start inside its window. That is O((C + N) log N) overall when windows
+    hold few items, but C fixed points over N items all starting in one
+    window still cost O(C * N).
+    """
+
+    def __init__(self, starts: list[datetime], ends: list[datetime]) -> None:
+        self._order = sorted(range(len(starts)), key=starts.__getitem__)
+        self._position = {idx: position for position, idx in enumerate(self._order)}
+        self._starts = [starts[idx] for idx in self._order]
+        self._durations = [
+            abs((ends[idx] - starts[idx]).total_seconds() / 60) for idx in self._order
+        ]
+        self._max_shift = max([30.0, *self._durations])
+        # _next[p] is p while unclaimed, otherwise a later position to try.
+        self._next = list(range(len(starts) + 1))
+
+    def _unclaimed_from(self, position: int) -> int:
+        root = position
+        while self._next[root] != root:
+            root = self._next[root]
+        while self._next[position] != root:
+            self._next[position], position = root, self._next[position]
+        return root
+
+    def claim(self, idx: int) -> None:
+        """Mark the item with original index ``idx`` as matched."""
+        position = self._position[idx]
+        self._next[position] = position + 1
+
+    def _first_unmatched(
+        self, low: datetime, high: datetime, accept=None
+    ) -> int | None:
+        best: int | None = None
+        hi = bisect_right(self._starts, high)
+        position = self._unclaimed_from(bisect_left(self._starts, low))
+        while position < hi:
+            idx = self._order[position]
+            if (best is None or idx < best) and (
+                accept is None or accept(position)
+            ):
+                best = idx
+            position = self._unclaimed_from(position + 1)
+        return best
+
+    def first_near(self, target: datetime) -> int | None:
+        """First unmatched item starting within 5 minutes of ``target``."""
+        return self._first_unmatched(
+            target - _MATCH_TOLERANCE, target + _MATCH_TOLERANCE
+        )
+
+    def first_shifted(self, target: datetime) -> int | None:
+        """First unmatched item pushed back from ``target`` by at most
+        max(30 minutes, its own duration)."""
+
+        def within_shift(position: int) -> bool:
+            shift_minutes = (self._starts[position] - target).total_seconds() / 60
+            return shift_minutes <= max(30, self._durations[position])
+
+        return self._first_unmatched(
+            target,
+            target + timedelta(minutes=self._max_shift),
+            within_shift,
+        )
+
+    def any_between(self, low: datetime, high: datetime) -> bool:
+        position = bisect_left(self._starts, low)
+        return position < len(self._starts) and self._starts[position] <= high
+
+
 def check_constraints(
-    plan_items: List["PlanItem"],
-    temporal_constraints: List[str],
-    current_time: str,
+    plan_items: PlanLike,
+    temporal_constraints: ConstraintsLike,
+    current_time: str | datetime,
     overlap_minutes: int = 0,
+    verbose: bool = True,
 ) -> tuple[int, list[str]]:
     # NOTE: This implementation treats all constraints as positive "must-do at time X"
     # checks. It does not yet handle blocked/avoid windows (negative constraints).
@@ -90,67 +299,52 @@ def check_constraints(
     if not plan_items or not temporal_constraints:
         return 0, []
 
-    reference_start = isoparse(plan_items[0].start_time)
-    current_dt = _align_timezone(isoparse(current_time), reference_start)
-    default_dt = _default_date(current_dt)
-
-    deadline_times: list[datetime] = []
-    start_gate_times: list[datetime] = []
-    for constraint in temporal_constraints:
-        constraint_text = constraint or ""
-        constraint_type = _categorize_constraint(constraint_text)
-        times = _extract_times(constraint_text)
-        for time_token in times:
-            parsed = _parse_time_token(time_token, default_dt)
-            if parsed is None:
-                continue
-            parsed_time = _align_timezone(parsed, reference_start)
-            if constraint_type == "deadline":
-                deadline_times.append(parsed_time)
-            elif constraint_type == "start_gate":
-                start_gate_times.append(parsed_time)
-            break
+    parsed = ensure_parsed(plan_items)
+    reference_start = parsed[0].start
+    if isinstance(current_time, str):
+        current_time = parse_time(current_time)
+    current_dt = align_timezone(current_time, reference_start)
+    resolved = resolve_constraints(temporal_constraints, current_dt, reference_start)
+    item_starts = [align_timezone(entry.start, reference_start) for entry in parsed]
+    item_ends = [align_timezone(entry.end, reference_start) for entry in parsed]
+    start_index = _StartIndex(item_starts, item_ends)
+    earliest_start = min(item_starts)
+    latest_end = max(item_ends)
+
+    deadline_times = [
+        entry.at
+        for entry in resolved
+        if entry.at is not None and entry.constraint.category == "deadline"
+    ]
+    start_gate_times = [
+        entry.at
+        for entry in resolved
+        if entry.at is not None and entry.constraint.category == "start_gate"
+    ]
 
     earliest_deadline = min(deadline_times) if deadline_times else None
     latest_start_gate = max(start_gate_times) if start_gate_times else None
     violations = 0
     error_messages: list[str] = []
-    matched_indices: set[int] = set()
-    for constraint in temporal_constraints:
-        constraint_text = constraint or ""
-        times = _extract_times(constraint_text)
-        if not times:
+    for entry in resolved:
+        constraint = entry.constraint
+        if not constraint.has_times:
             continue
 
-        constraint_type = _categorize_constraint(constraint_text)
-        lowered_constraint = constraint_text.lower()
-        if "from" in lowered_constraint and "to" in lowered_constraint and len(times) >= 2:
-            constraint_type = "window"
-        target_time = None
-        time_token_used = None
+        constraint_text = constraint.text
+        constraint_type = constraint.kind
+        target_time = entry.at
+        time_token_used = constraint.token
         window_start = None
         window_end = None
-        for time_token in times:
-            try:
-                parsed = _parse_time_token(time_token, default_dt)
-            except (ValueError, TypeError):
-                parsed = None
-            if parsed is None:
-                continue
-            target_time = _align_timezone(parsed, reference_start)
-            time_token_used = time_token
-            break
 
         if constraint_type == "window":
-            parsed_start = _parse_time_token(times[0], default_dt)
-            parsed_end = _parse_time_token(times[1], default_dt)
-            if parsed_start is not None and parsed_end is not None:
-                window_start = _align_timezone(parsed_start, reference_start)
-                window_end = _align_timezone(parsed_end, reference_start)
-                if earliest_deadline and window_end > earliest_deadline:
-                    window_end = earliest_deadline
-            else:
+            if entry.window_start is None or entry.window_end is None:
                 continue
+            window_start = entry.window_start
+            window_end = entry.window_end
+            if earliest_deadline and window_end > earliest_deadline:
+                window_end = earliest_deadline
 
         if target_time is None and constraint_type != "window":
             continue
@@ -163,7 +357,7 @@ def check_constraints(
         ):
             continue
 
-        if constraint_type != "window":
+        if verbose and constraint_type != "window":
             print(f"DEBUG: Parsed Constraint (Local): {target_time}")
             print(f"DEBUG: Current Time (Local): {current_dt}")
         if constraint_type == "window" and window_end is not None:
@@ -188,68 +382,22 @@ def check_constraints(
             if latest_start_gate and target_time < latest_start_gate:
                 matched = True
             else:
-                for idx, item in enumerate(plan_items):
-                    if idx in matched_indices:
-                        continue
-                    start_time = _align_timezone(
-                        isoparse(item.start_time), reference_start
-                    )
-                    delta_minutes = abs((start_time - target_time).total_seconds()) / 60
-                    if delta_minutes <= 5:
-                        matched = True
-                        matched_indices.add(idx)
-                        break
-                if not matched and overlap_minutes == 0:
-                    for idx, item in enumerate(plan_items):
-                        if idx in matched_indices:
-                            continue
-                        start_time = _align_timezone(
-                            isoparse(item.start_time), reference_start
-                        )
-                        if start_time < target_time:
-                            continue
-                        end_time = _align_timezone(
-                            isoparse(item.end_time), reference_start
-                        )
-                        duration_minutes = abs(
-                            (end_time - start_time).total_seconds() / 60
-                        )
-                        allowed_shift = max(30, duration_minutes)
-                        shift_minutes = (start_time - target_time).total_seconds() / 60
-                        if 0 <= shift_minutes <= allowed_shift:
-                            matched = True
-                            matched_indices.add(idx)
-                            break
+                idx = start_index.first_near(target_time)
+                if idx is None and overlap_minutes == 0:
+                    idx = start_index.first_shifted(target_time)
+                if idx is not None:
+                    matched = True
+                    start_index.claim(idx)
         elif constraint_type == "deadline":
-            for item in plan_items:
-                end_time = _align_timezone(isoparse(item.end_time), reference_start)
-                if end_time > target_time:
-                    matched = False
-                    break
-            else:
-                matched = True
+            matched = not latest_end > target_time
         elif constraint_type == "start_gate":
-            for item in plan_items:
-                start_time = _align_timezone(
-                    isoparse(item.start_time), reference_start
-                )
-                if start_time < target_time:
-                    matched = False
-                    break
-            else:
-                matched = True
+            matched = not earliest_start < target_time
         elif constraint_type == "window" and window_start and window_end:
-            for item in plan_items:
-                start_time = _align_timezone(
-                    isoparse(item.start_time), reference_start
-                )
-                if window_start <= start_time <= window_end:
-                    matched = True
-                    break
+            matched = start_index.any_between(window_start, window_end)
 
         if not matched:
             violations += 1
-            time_label = _format_time(target_time) if target_time else ""
+            time_label = format_time(target_time) if target_time else ""
             if constraint_type == "fixed_point" and time_token_used:
                 error_messages.append(
                     f"'{time_token_used}' constraint not met "
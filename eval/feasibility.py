@@ -1,25 +1,21 @@
 from __future__ import annotations
 
-from typing import List, TYPE_CHECKING
+from eval.timeline import PlanLike, ensure_parsed
 
-from dateutil.parser import isoparse
 
-if TYPE_CHECKING:
-    from planproof_api.agent.schemas import PlanItem
-
-
-def check_feasibility(plan_items: List["PlanItem"]) -> int:
-    if not plan_items:
+def check_feasibility(plan_items: PlanLike) -> int:
+    parsed = ensure_parsed(plan_items)
+    if not parsed:
         return 0
 
-    items = sorted(plan_items, key=lambda item: isoparse(item.start_time))
-    block_start = isoparse(items[0].start_time)
-    block_end = isoparse(items[0].end_time)
+    entries = sorted(parsed, key=lambda entry: entry.start)
+    block_start = entries[0].start
+    block_end = entries[0].end
     flags = 0
 
-    for item in items[1:]:
-        start_time = isoparse(item.start_time)
-        end_time = isoparse(item.end_time)
+    for entry in entries[1:]:
+        start_time = entry.start
+        end_time = entry.end
         gap_minutes = (start_time - block_end).total_seconds() / 60
 
         if gap_minutes >= 15:
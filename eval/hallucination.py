@@ -1,11 +1,9 @@
 from __future__ import annotations
 
 import re
-from typing import List, TYPE_CHECKING
+from typing import List
 
-
-if TYPE_CHECKING:
-    from planproof_api.agent.schemas import PlanItem
+from eval.timeline import PlanLike, plan_items_of
 
 _WORD_PATTERN = re.compile(r"\b[a-zA-Z0-9\-\.]{2,}\b")
 _TIME_PATTERN = re.compile(
@@ -160,6 +158,10 @@ _REPAIR_META_WORDS = {
     "specified",
 }
 
+# Precomputed unions so per-token checks do not allocate new sets.
+_SIGNIFICANT_SKIP_WORDS = frozenset(_COMMON_VERBS | _STOP_WORDS)
+_NON_ENTITY_WORDS = frozenset(_COMMON_VERBS | _STOP_WORDS | _PRODUCTIVITY_WHITELIST)
+
 
 def _is_high_entropy(token: str) -> bool:
     if any(char.isdigit() for char in token):
@@ -174,7 +176,7 @@ def _extract_significant_tokens(text: str) -> set[str]:
     for match in _WORD_PATTERN.finditer(text):
         token = match.group(0)
         token_lower = token.lower()
-        if token_lower in _COMMON_VERBS | _STOP_WORDS:
+        if token_lower in _SIGNIFICANT_SKIP_WORDS:
             continue
         if token_lower in _PRODUCTIVITY_WHITELIST:
             continue
@@ -191,43 +193,116 @@ def _extract_significant_tokens(text: str) -> set[str]:
 _PROPER_NOUN_PATTERN = re.compile(r"\b[A-Z][a-zA-Z0-9\-\.]*\b")
 
 
-def check_hallucinations(
-    plan_items: List["PlanItem"],
-    ground_truth_entities: List[str],
-    _task_keywords: List[str],
-    _match_threshold: int = 80,
-    _variant: str | None = None,
-    _detected_constraints: List[str] | None = None,
-    **_: object,
-) -> int:
+class EntityMatcher:
+    """Substring index over lower-cased ground-truth entities.
+
+    Built once per request as a suffix automaton over the entities joined
+    by a separator, so ``token in matcher`` answers "is this token part of
+    any entity" in O(len(token)) instead of scanning every entity.
+    """
+
+    _SEPARATOR = "\x00"
+
+    def __init__(self, entities: List[str]) -> None:
+        self._next: list[dict[str, int]] = [{}]
+        self._link: list[int] = [-1]
+        self._length: list[int] = [0]
+        last = 0
+        text = self._SEPARATOR.join(entity.lower() for entity in entities if entity)
+        for char in text:
+            last = self._extend(last, char)
+
+    def _extend(self, last: int, char: str) -> int:
+        current = len(self._next)
+        self._next.append({})
+        self._link.append(0)
+        self._length.append(self._length[last] + 1)
+        state = last
+        while state != -1 and char not in self._next[state]:
+            self._next[state][char] = current
+            state = self._link[state]
+        if state == -1:
+            return current
+        target = self._next[state][char]
+        if self._length[state] + 1 == self._length[target]:
+            self._link[current] = target
+            return current
+        clone = len(self._next)
+        self._next.append(dict(self._next[target]))
+        self._link.append(self._link[target])
+        self._length.append(self._length[state] + 1)
+        while state != -1 and self._next[state].get(char) == target:
+            self._next[state][char] = clone
+            state = self._link[state]
+        self._link[target] = clone
+        self._link[current] = clone
+        return current
+
+    def __contains__(self, token: str) -> bool:
+        state = 0
+        for char in token.lower():
+            state = self._next[state].get(char, -1)
+            if state == -1:
+                return False
+        return True
+
+
+def _plan_proper_nouns(plan_items: PlanLike) -> set[str]:
     tokens: set[str] = set()
-    for item in plan_items:
+    for item in plan_items_of(plan_items):
         if not item.task:
             continue
         for token in _PROPER_NOUN_PATTERN.findall(item.task):
-            token_lower = token.lower()
-            if token_lower in _COMMON_VERBS | _STOP_WORDS | _PRODUCTIVITY_WHITELIST:
+            if token.lower() in _NON_ENTITY_WORDS:
                 continue
             tokens.add(token)
+    return tokens
 
+
+def find_hallucinated_tokens(
+    plan_items: PlanLike,
+    ground_truth_entities: List[str],
+    stop_at_first: bool = False,
+) -> list[str]:
+    """Proper-noun task tokens not found inside any ground-truth entity.
+
+    One pass over the plan against an ``EntityMatcher``. With
+    ``stop_at_first`` the scan returns as soon as one token is flagged,
+    which is enough when only "any hallucination?" matters.
+    """
+    tokens = _plan_proper_nouns(plan_items)
     if not tokens:
-        return 0
+        return []
 
-    if not ground_truth_entities:
-        return len(tokens)
+    matcher = EntityMatcher(ground_truth_entities or [])
+    flagged: list[str] = []
+    for token in sorted(tokens):
+        if token in matcher:
+            continue
+        flagged.append(token)
+        if stop_at_first:
+            break
+    return flagged
 
-    entities = [entity.lower() for entity in ground_truth_entities if entity]
-    hallucination_count = 0
-    for token in tokens:
-        token_lower = token.lower()
-        if not any(token_lower in entity for entity in entities):
-            hallucination_count += 1
 
-    return hallucination_count
+def check_hallucinations(
+    plan_items: PlanLike,
+    ground_truth_entities: List[str],
+    _task_keywords: List[str],
+    _match_threshold: int = 80,
+    _variant: str | None = None,
+    _detected_constraints: List[str] | None = None,
+    stop_at_first: bool = False,
+    **_: object,
+) -> int:
+    """Count hallucinated tokens; with ``stop_at_first`` the result is 0 or 1."""
+    return len(
+        find_hallucinated_tokens(plan_items, ground_truth_entities, stop_at_first)
+    )
 
 
 def get_hallucinated_tokens(
-    plan_items: List["PlanItem"],
+    plan_items: PlanLike,
     ground_truth_entities: List[str],
     _task_keywords: List[str],
     _match_threshold: int = 80,
@@ -235,28 +310,8 @@ def get_hallucinated_tokens(
     _detected_constraints: List[str] | None = None,
     **_: object,
 ) -> list[str]:
-    tokens: set[str] = set()
-    for item in plan_items:
-        if not item.task:
-            continue
-        for token in _PROPER_NOUN_PATTERN.findall(item.task):
-            token_lower = token.lower()
-            if token_lower in _COMMON_VERBS | _STOP_WORDS | _PRODUCTIVITY_WHITELIST:
-                continue
-            tokens.add(token)
-
-    if not tokens:
-        return []
-
-    if not ground_truth_entities:
-        return sorted(tokens)
-
-    entities = [entity.lower() for entity in ground_truth_entities if entity]
-    flagged: list[str] = []
-    for token in tokens:
-        token_lower = token.lower()
-        if not any(token_lower in entity for entity in entities):
+    flagged = find_hallucinated_tokens(plan_items, ground_truth_entities)
+    if ground_truth_entities:
+        for token in flagged:
             print(f"DEBUG HALLUCINATION: Word '{token}' flagged (No ground truth)")
-            flagged.append(token)
-
-    return sorted(flagged)
+    return flagged
@@ -1,53 +1,170 @@
 from __future__ import annotations
 
 import re
-from typing import List, TYPE_CHECKING
+from functools import partial
+from typing import Any, List, NamedTuple, Sequence
 
-from thefuzz import process
-from thefuzz import fuzz
+from rapidfuzz import fuzz as rf_fuzz
+from rapidfuzz import process as rf_process
+from thefuzz import utils as fuzz_utils
 
-if TYPE_CHECKING:
-    from planproof_api.agent.schemas import PlanItem
+from eval.recall_index import CandidateIndex
+from eval.timeline import PlanLike, plan_items_of
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional vectorized scoring
+    np = None
+
+RECALL_MATCH_THRESHOLD = 75
+
+# thefuzz.process.extractOne(scorer=fuzz.token_set_ratio) runs full_process on
+# the query, then the ASCII-forcing full_process on query and choices before
+# calling rapidfuzz. Mirror that so matrix scores equal the per-keyword ones.
+_ascii_process = partial(fuzz_utils.full_process, force_ascii=True)
+
+
+class KeywordMatch(NamedTuple):
+    keyword: str
+    candidate: str
+    score: int
 
-def calculate_recall(
-    plan_items: List["PlanItem"],
-    actionable_tasks: List[str],
-) -> float:
-    keywords = [keyword for keyword in actionable_tasks if keyword]
-    if not keywords:
-        return 0.0
 
+class KeywordCoverage(NamedTuple):
+    """Recall score, matched keywords and missing keywords from one pass."""
+
+    score: float
+    matches: list[KeywordMatch]
+    missing: list[str]
+
+
+def _normalize(text: str) -> str:
+    lowered = text.lower()
+    stripped = re.sub(r"[^\w\s]", "", lowered)
+    return re.sub(r"\s+", " ", stripped).strip()
+
+
+def _normalized_candidates(plan_items: PlanLike) -> list[str]:
     candidates: list[str] = []
-    for item in plan_items:
+    for item in plan_items_of(plan_items):
         if item.task:
             candidates.append(item.task)
         if item.why:
             candidates.append(item.why)
+    return [_normalize(text) for text in candidates]
+
 
-    if not candidates:
-        return 0.0
+def _score_matrix(
+    keywords: Sequence[str], candidates: Sequence[str], workers: int = 1
+) -> Any:
+    """Keyword x candidate ``token_set_ratio`` scores (unrounded).
+
+    Uses one ``rapidfuzz.process.cdist`` call into a float64 NumPy array when
+    NumPy is installed (``workers=-1`` uses every core); otherwise falls back
+    to nested lists with the same values.
+    """
+    queries = [fuzz_utils.full_process(keyword) for keyword in keywords]
+    if np is not None:
+        return rf_process.cdist(
+            queries,
+            candidates,
+            scorer=rf_fuzz.token_set_ratio,
+            processor=_ascii_process,
+            dtype=np.float64,
+            workers=workers,
+        )
+    processed = [_ascii_process(candidate) for candidate in candidates]
+    return [
+        [rf_fuzz.token_set_ratio(_ascii_process(query), choice) for choice in processed]
+        for query in queries
+    ]
 
-    def _normalize(text: str) -> str:
-        lowered = text.lower()
-        stripped = re.sub(r"[^\w\s]", "", lowered)
-        return re.sub(r"\s+", " ", stripped).strip()
 
-    normalized_candidates = [_normalize(text) for text in candidates]
-    matched = 0
+def _best_per_row(matrix: Any) -> list[tuple[int, int]]:
+    """(candidate index, rounded score) of each row's first maximum."""
+    if np is not None and isinstance(matrix, np.ndarray):
+        best = matrix.argmax(axis=1)
+        scores = matrix[np.arange(len(best)), best]
+        return [
+            (int(index), int(round(float(score))))
+            for index, score in zip(best, scores)
+        ]
+    best_matches: list[tuple[int, int]] = []
+    for row in matrix:
+        index = max(range(len(row)), key=row.__getitem__)
+        best_matches.append((index, int(round(row[index]))))
+    return best_matches
+
+
+def _best_prefiltered(
+    keywords: Sequence[str], candidates: Sequence[str]
+) -> list[tuple[int, int]]:
+    """Like ``_best_per_row`` but only scores pairs the index links."""
+    index = CandidateIndex(candidates, _ascii_process)
+    processed = [_ascii_process(candidate) for candidate in candidates]
+    best_matches: list[tuple[int, int]] = []
     for keyword in keywords:
-        normalized_keyword = _normalize(keyword)
-        match = process.extractOne(
-            normalized_keyword,
-            normalized_candidates,
-            scorer=fuzz.token_set_ratio,
+        query = _ascii_process(fuzz_utils.full_process(keyword))
+        best_index, best_score = 0, 0.0
+        for candidate_index in sorted(index.candidates_for(query)):
+            score = rf_fuzz.token_set_ratio(query, processed[candidate_index])
+            if score > best_score:
+                best_index, best_score = candidate_index, score
+        best_matches.append((best_index, int(round(best_score))))
+    return best_matches
+
+
+def keyword_coverage(
+    plan_items: PlanLike,
+    actionable_tasks: List[str],
+    workers: int = 1,
+    prefilter: bool = False,
+    verbose: bool = True,
+) -> KeywordCoverage:
+    """Score every keyword against the plan's task/why text in one batch.
+
+    A keyword is covered when its best ``token_set_ratio`` match reaches
+    ``RECALL_MATCH_THRESHOLD``; scores are rounded like thefuzz's
+    ``extractOne``. With no candidates every keyword is missing.
+
+    ``prefilter`` skips pairs that share no token, plural-stripped token or
+    character n-gram LSH bucket, so cost grows roughly linearly with the
+    number of tasks. Pairs sharing a token are always scored exactly.
+    ``verbose=False`` skips the debug line printed per missing keyword.
+    """
+    keywords = [keyword for keyword in actionable_tasks or [] if keyword]
+    if not keywords:
+        return KeywordCoverage(0.0, [], [])
+
+    normalized_candidates = _normalized_candidates(plan_items)
+    if not normalized_candidates:
+        return KeywordCoverage(0.0, [], list(keywords))
+
+    normalized_keywords = [_normalize(keyword) for keyword in keywords]
+    if prefilter:
+        best_matches = _best_prefiltered(normalized_keywords, normalized_candidates)
+    else:
+        best_matches = _best_per_row(
+            _score_matrix(normalized_keywords, normalized_candidates, workers)
         )
-        if match is not None and match[1] >= 75:
-            matched += 1
+    matches: list[KeywordMatch] = []
+    missing: list[str] = []
+    for keyword, (index, score) in zip(keywords, best_matches):
+        if score >= RECALL_MATCH_THRESHOLD:
+            matches.append(KeywordMatch(keyword, normalized_candidates[index], score))
         else:
-            print(
-                f"DEBUG RECALL: Keyword '{keyword}' not found in plan tokens "
-                f"{normalized_candidates}"
-            )
+            missing.append(keyword)
+            if verbose:
+                print(
+                    f"DEBUG RECALL: Keyword '{keyword}' not found in plan tokens "
+                    f"{normalized_candidates}"
+                )
+
+    return KeywordCoverage(len(matches) / len(keywords), matches, missing)
+
 
-    return matched / len(keywords)
+def calculate_recall(
+    plan_items: PlanLike,
+    actionable_tasks: List[str],
+) -> float:
+    return keyword_coverage(plan_items, actionable_tasks).score
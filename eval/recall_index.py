@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import zlib
+from collections import defaultdict
+from typing import Callable, Sequence
+
+_NGRAM = 3
+_BANDS = 8
+_ROWS = 2
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed (a, b) pairs keep signatures stable across processes.
+_PERMUTATIONS = [
+    (
+        1 + (0x9E3779B97F4A7C15 * (i + 1)) % (_MERSENNE_PRIME - 1),
+        (0x7F4A7C15 * i) % _MERSENNE_PRIME,
+    )
+    for i in range(_BANDS * _ROWS)
+]
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("es"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s"):
+        return token[:-1]
+    return token
+
+
+def _ngrams(token: str) -> set[bytes]:
+    padded = f"^{token}$"
+    return {
+        padded[i : i + _NGRAM].encode("utf-8")
+        for i in range(max(1, len(padded) - _NGRAM + 1))
+    }
+
+
+def _lsh_buckets(token: str) -> list[tuple[int, tuple[int, ...]]]:
+    hashes = [zlib.crc32(gram) for gram in _ngrams(token)]
+    signature = [
+        min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+    return [
+        (band, tuple(signature[band * _ROWS : (band + 1) * _ROWS]))
+        for band in range(_BANDS)
+    ]
+
+
+class CandidateIndex:
+    """Token and character n-gram index over processed recall candidates.
+
+    Three lookups feed ``candidates_for``:
+
+    * exact tokens (inverted index) and a plural-stripped key, which always
+      surface candidates sharing a token or a near-exact token;
+    * MinHash/LSH buckets over each token's character trigrams, which
+      surface likely typo/inflection matches.
+
+    Pairs that share nothing are never scored. That is an approximation of
+    the full matrix, so the index is opt-in.
+    """
+
+    def __init__(
+        self, candidates: Sequence[str], process: Callable[[str], str]
+    ) -> None:
+        self._process = process
+        self._tokens: dict[str, set[int]] = defaultdict(set)
+        self._buckets: dict[tuple[int, tuple[int, ...]], set[int]] = defaultdict(set)
+        self._signatures: dict[str, list[tuple[int, tuple[int, ...]]]] = {}
+        for index, candidate in enumerate(candidates):
+            for token in set(process(candidate).split()):
+                self._tokens[token].add(index)
+                self._tokens[_stem(token)].add(index)
+                for bucket in self._buckets_for(token):
+                    self._buckets[bucket].add(index)
+
+    def _buckets_for(self, token: str) -> list[tuple[int, tuple[int, ...]]]:
+        if token not in self._signatures:
+            self._signatures[token] = _lsh_buckets(token)
+        return self._signatures[token]
+
+    def candidates_for(self, keyword: str) -> set[int]:
+        found: set[int] = set()
+        for token in set(self._process(keyword).split()):
+            found |= self._tokens.get(token, set())
+            found |= self._tokens.get(_stem(token), set())
+            for bucket in self._buckets_for(token):
+                found |= self._buckets.get(bucket, set())
+        return found
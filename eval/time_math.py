@@ -1,33 +1,93 @@
 from __future__ import annotations
 
+import heapq
 from datetime import datetime
-from typing import List, TYPE_CHECKING
+from typing import Literal, NamedTuple
 
-from dateutil.parser import isoparse
+from eval.timeline import PlanLike, ensure_parsed
 
-if TYPE_CHECKING:
-    from planproof_api.agent.schemas import PlanItem
+OverlapMode = Literal["pairwise", "union"]
 
 
-def _parse_time(value: str) -> datetime:
-    return isoparse(value)
+class OverlapPair(NamedTuple):
+    """Two plan items whose time ranges collide.
 
+    ``first`` and ``second`` are indices into the original item list, with
+    ``first`` always the item that starts earlier (ties keep list order).
+    """
 
-def calculate_overlaps(items: List["PlanItem"]) -> int:
-    intervals: list[tuple[datetime, datetime]] = []
-    for item in items:
-        start = _parse_time(item.start_time)
-        end = _parse_time(item.end_time)
-        if end <= start:
+    first: int
+    second: int
+    start: datetime
+    end: datetime
+    minutes: int
+
+
+def _sorted_intervals(items: PlanLike) -> list[tuple[datetime, datetime, int]]:
+    intervals: list[tuple[datetime, datetime, int]] = []
+    for entry in ensure_parsed(items):
+        if entry.end <= entry.start:
             continue
-        intervals.append((start, end))
+        intervals.append((entry.start, entry.end, entry.index))
+    intervals.sort(key=lambda interval: (interval[0], interval[2]))
+    return intervals
+
+
+def find_overlaps(items: PlanLike) -> list[OverlapPair]:
+    """List every colliding pair of plan items using a sort-and-sweep.
+
+    Intervals are visited in start order while a min-heap keeps the ones
+    still running. Runs in O(n log n + k) for k colliding pairs; ``minutes``
+    is the per-pair ``total_seconds() // 60`` used by ``calculate_overlaps``.
+    """
+    active: list[tuple[datetime, int]] = []
+    pairs: list[OverlapPair] = []
+    for start, end, index in _sorted_intervals(items):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for other_end, other_index in active:
+            overlap_end = min(end, other_end)
+            minutes = int((overlap_end - start).total_seconds() // 60)
+            pairs.append(OverlapPair(other_index, index, start, overlap_end, minutes))
+        heapq.heappush(active, (end, index))
+
+    pairs.sort(key=lambda pair: (pair.start, pair.first, pair.second))
+    return pairs
+
+
+def _union_overlap_minutes(items: PlanLike) -> int:
+    # Minutes covered by two or more items at once, each instant counted once.
+    events: list[tuple[datetime, int]] = []
+    for start, end, _ in _sorted_intervals(items):
+        events.append((start, 1))
+        events.append((end, -1))
+    # Ends sort before starts at the same instant so touching blocks don't count.
+    events.sort(key=lambda event: (event[0], event[1]))
+
+    depth = 0
+    covered_seconds = 0.0
+    overlap_start: datetime | None = None
+    for moment, delta in events:
+        depth += delta
+        if depth >= 2 and overlap_start is None:
+            overlap_start = moment
+        elif depth < 2 and overlap_start is not None:
+            covered_seconds += (moment - overlap_start).total_seconds()
+            overlap_start = None
+
+    return int(covered_seconds // 60)
+
 
-    overlap_minutes = 0
-    for i in range(len(intervals)):
-        for j in range(i + 1, len(intervals)):
-            overlap_start = max(intervals[i][0], intervals[j][0])
-            overlap_end = min(intervals[i][1], intervals[j][1])
-            if overlap_start < overlap_end:
-                overlap_minutes += (overlap_end - overlap_start).total_seconds() // 60
+def calculate_overlaps(items: PlanLike, mode: OverlapMode = "pairwise") -> int:
+    """Return overlapping minutes across the plan.
 
-    return overlap_minutes
+    ``pairwise`` (the contract metric) sums the floored minutes of every
+    colliding pair, so three stacked blocks count their shared time more
+    than once. ``union`` counts each minute with two or more concurrent
+    blocks only once.
+    """
+    if mode == "union":
+        return _union_overlap_minutes(items)
+    if mode != "pairwise":
+        raise ValueError(f"Unknown overlap mode: {mode!r}")
+    return sum(pair.minutes for pair in find_overlaps(items))
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone, tzinfo
+from typing import Iterator, NamedTuple, Sequence, TYPE_CHECKING, Union
+
+from dateutil.parser import isoparse
+
+if TYPE_CHECKING:
+    from planproof_api.agent.schemas import PlanItem
+
+_EPOCH_AWARE = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+
+
+class ParsedItem(NamedTuple):
+    index: int
+    item: "PlanItem"
+    start: datetime
+    end: datetime
+    start_minute: float
+    end_minute: float
+
+    @property
+    def duration_minutes(self) -> float:
+        return self.end_minute - self.start_minute
+
+
+def _epoch_minutes(value: datetime) -> float:
+    epoch = _EPOCH_AWARE if value.tzinfo is not None else _EPOCH_NAIVE
+    return (value - epoch).total_seconds() / 60
+
+
+def parse_time(value: str, default_tz: tzinfo | None = None) -> datetime:
+    parsed = isoparse(value)
+    if parsed.tzinfo is None and default_tz is not None:
+        parsed = parsed.replace(tzinfo=default_tz)
+    return parsed
+
+
+@dataclass(frozen=True)
+class ParsedPlan:
+    """A plan whose ``start_time``/``end_time`` strings were parsed once.
+
+    Entries keep the original list order. Naive timestamps are localized to
+    ``default_tz`` when one is given, otherwise they stay naive.
+    """
+
+    entries: tuple[ParsedItem, ...]
+
+    @property
+    def items(self) -> list["PlanItem"]:
+        return [entry.item for entry in self.entries]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[ParsedItem]:
+        return iter(self.entries)
+
+    def __getitem__(self, index: int) -> ParsedItem:
+        return self.entries[index]
+
+    def with_items(self, items: Sequence["PlanItem"]) -> "ParsedPlan":
+        """Swap in updated ``PlanItem``s whose times are unchanged."""
+        if len(items) != len(self.entries):
+            raise ValueError("Replacement items must match the parsed plan length.")
+        return ParsedPlan(
+            tuple(
+                entry._replace(item=item) for entry, item in zip(self.entries, items)
+            )
+        )
+
+
+PlanLike = Union[Sequence["PlanItem"], ParsedPlan]
+
+
+def parse_plan(
+    plan_items: Sequence["PlanItem"], default_tz: tzinfo | None = None
+) -> ParsedPlan:
+    entries: list[ParsedItem] = []
+    for index, item in enumerate(plan_items):
+        start = parse_time(item.start_time, default_tz)
+        end = parse_time(item.end_time, default_tz)
+        entries.append(
+            ParsedItem(
+                index=index,
+                item=item,
+                start=start,
+                end=end,
+                start_minute=_epoch_minutes(start),
+                end_minute=_epoch_minutes(end),
+            )
+        )
+    return ParsedPlan(tuple(entries))
+
+
+def ensure_parsed(plan: PlanLike) -> ParsedPlan:
+    if isinstance(plan, ParsedPlan):
+        return plan
+    return parse_plan(plan)
+
+
+def plan_items_of(plan: PlanLike) -> Sequence["PlanItem"]:
+    if isinstance(plan, ParsedPlan):
+        return plan.items
+    return plan
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import sys
@@ -24,7 +25,7 @@ def main() -> None:
         raise RuntimeError("OPENAI_API_KEY is not set.")
 
     context = "Need to call Bob about the Apollo project."
-    metadata = extract_metadata(context)
+    metadata = asyncio.run(extract_metadata(context))
     payload = metadata.model_dump()
 
     if "Bob" not in payload["ground_truth_entities"]: